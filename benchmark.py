@@ -0,0 +1,457 @@
+# ===============================================
+#  OneCode PRO - Benchmarki
+#  Pomiary gorących ścieżek edytora bez okna
+#
+#  QT_QPA_PLATFORM=offscreen python benchmark.py --lines 20000 -o wyniki.json
+# ===============================================
+
+import os, sys
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse, hashlib, json, platform, random, shutil, statistics, subprocess, tempfile, time
+from pathlib import Path
+from main import *
+import main as onecode
+
+# ================== KORPUSY ==================
+
+TEMPLATES = {
+    ".py": [
+        "class {Name}{i}(Base):",
+        "    \"\"\"Klasa {i} - wygenerowana do testów\"\"\"",
+        "    def {name}_{i}(self, value, *args, **kwargs):",
+        "        result = [x * {i} for x in range(value) if x % 3]  # komentarz",
+        "        return {{'key': result, \"other\": 0x{i:x}, 'f': {i}.5}}",
+        "",
+    ],
+    ".cpp": [
+        "// Funkcja {i} - komentarz",
+        "template <typename T> class {Name}{i} {{",
+        "public:",
+        "    int {name}_{i}(const std::vector<T>& items) {{ return items.size() * {i}; }}",
+        "    /* blok */ std::string s = \"tekst {i}\";",
+        "}};",
+    ],
+    ".js": [
+        "// moduł {i}",
+        "export class {Name}{i} extends Base {{",
+        "  {name}_{i}(value) {{ return value.map(x => x * {i}).filter(Boolean); }}",
+        "}}",
+        "const cfg{i} = {{ key: 'tekst', other: \"{i}\", n: {i}.25 }};",
+        "",
+    ],
+    ".java": [
+        "/** Klasa {i} */",
+        "public class {Name}{i} implements Runnable {{",
+        "    private final int value = {i};",
+        "    public void run() {{ System.out.println(\"{name} \" + value); }}",
+        "}}",
+        "",
+    ],
+    ".html": [
+        "<div class=\"row-{i}\" id=\"{name}{i}\">",
+        "  <!-- komentarz {i} -->",
+        "  <a href=\"/strona/{i}\">{Name} {i}</a>",
+        "</div>",
+    ],
+    ".css": [
+        ".{name}-{i} {{",
+        "  color: #{i:06x};",
+        "  margin: {i}px 0; /* komentarz */",
+        "}}",
+    ],
+}
+NAMES = ["parse", "render", "compute", "update", "handle", "load", "store", "build"]
+
+def generate_source(ext, lines, seed=0):
+    """Plik o zadanej liczbie linii złożony z szablonów języka"""
+    rnd = random.Random(seed)
+    template = TEMPLATES.get(ext, TEMPLATES[".py"])
+    out = []
+    i = 0
+    while len(out) < lines:
+        name = rnd.choice(NAMES)
+        for line in template:
+            out.append(line.format(i=i, name=name, Name=name.capitalize()))
+        i += 1
+    return "\n".join(out[:lines]) + "\n"
+
+def generate_terminal_output(lines, seed=0):
+    """Wyjście kompilatora: zwykłe linie przeplatane komunikatami o błędach"""
+    rnd = random.Random(seed)
+    out = []
+    for i in range(lines):
+        r = rnd.random()
+        if r < 0.05:
+            out.append(f"/tmp/projekt/src/plik{i % 50}.cpp:{i % 900 + 1}:{i % 40 + 1}: error: expected ';' before '}}' token")
+        elif r < 0.08:
+            out.append(f"  File \"/tmp/projekt/modul{i % 20}.py\", line {i % 500 + 1}, in funkcja_{i}")
+        else:
+            out.append(f"[{i:06d}] build step {i}: compiling object {rnd.randrange(10 ** 6)} ... ok")
+    return "\n".join(out) + "\n"
+
+# ================== POMOCNICZE ==================
+
+def summarize(samples):
+    """Statystyki czasów (ms)"""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.5) * 1000, 3),
+        "p90_ms": round(pick(0.9) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+def settle(app, rounds=3):
+    """Przetwórz zdarzenia w kolejce (np. opóźnione kolorowanie)"""
+    for _ in range(rounds):
+        app.processEvents()
+
+def make_window(workdir, minimap):
+    """Okno edytora z konfiguracją odizolowaną od ustawień użytkownika"""
+    os.chdir(workdir)
+    # Konfiguracja, motywy i pamięć podręczna z katalogu roboczego, nie użytkownika
+    os.environ["HOME"] = os.environ["USERPROFILE"] = str(workdir)
+    window = OneCodePro()
+    window.config.set("show_minimap", minimap)
+    window.config.set("recent_files", [])
+    # Procesy sprawdzania składni w tle zaburzałyby pomiary
+    window.config.set("background_lint", False)
+    window.auto_save_timer.stop()
+    return window
+
+def close_window(app, window):
+    window.terminal_process.kill()
+    window.terminal_process.waitForFinished(1000)
+    for indexer in list(window._indexers):
+        indexer.requestInterruption()
+        indexer.wait()
+    window.project_symbols.cancel()
+    QThreadPool.globalInstance().waitForDone(5000)
+    window.deleteLater()
+    settle(app)
+
+def close_all_tabs(window):
+    while window.tabs.count():
+        editor = window._get_current_editor()
+        if editor:
+            editor.is_modified = False
+        window._close_tab(window.tabs.count() - 1)
+
+def send_key(editor, text, key=Qt.Key.Key_A):
+    QApplication.sendEvent(editor, QKeyEvent(QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier, text))
+
+# ================== BENCHMARKI ==================
+
+def bench_open(app, window, files, repeat):
+    """Otwarcie pliku: wczytanie, edytor, pierwsze kolorowanie"""
+    results = {}
+    for ext, path in files.items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            window._open_file(str(path))
+            settle(app)
+            samples.append(time.perf_counter() - start)
+            close_all_tabs(window)
+        results[ext] = summarize(samples)
+    return results
+
+def bench_highlight(app, window, files, repeat):
+    """Pełne kolorowanie dokumentu dla każdego leksera"""
+    results = {}
+    for ext, path in files.items():
+        lexer = window._get_lexer(str(path))
+        if not lexer:
+            continue
+        doc = QTextDocument()
+        doc.setDocumentLayout(QPlainTextDocumentLayout(doc))
+        doc.setPlainText(path.read_text(encoding="utf-8"))
+        highlighter = AdvancedHighlighter(doc, lexer, Theme.DARK)
+        settle(app)
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            highlighter.rehighlight()
+            samples.append(time.perf_counter() - start)
+        results[ext] = dict(summarize(samples), lexer=type(lexer).__name__, blocks=doc.blockCount())
+    return results
+
+def bench_keystrokes(app, workdir, path, keys, minimap):
+    """Opóźnienie klawisza: zdarzenie + synchroniczne odmalowanie widoku"""
+    window = make_window(workdir, minimap)
+    window.show()
+    window._open_file(str(path))
+    settle(app)
+    editor = window._get_current_editor()
+    cursor = editor.textCursor()
+    cursor.setPosition(editor.document().characterCount() // 2)
+    editor.setTextCursor(cursor)
+    
+    samples = []
+    text = "value = compute(x) + 1 "
+    for i in range(keys):
+        start = time.perf_counter()
+        send_key(editor, text[i % len(text)])
+        editor.viewport().repaint()
+        app.processEvents()
+        samples.append(time.perf_counter() - start)
+    editor.is_modified = False
+    close_window(app, window)
+    return summarize(samples)
+
+def bench_search(app, window, path, repeat):
+    """Wyszukiwanie i zamiana w dużym dokumencie"""
+    window._open_file(str(path))
+    settle(app)
+    editor = window._get_current_editor()
+    size_mb = len(editor.toPlainText().encode("utf-8")) / 1024 / 1024
+    
+    search = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        editor.search("value")
+        search.append(time.perf_counter() - start)
+    matches = len(editor.search_matches)
+    editor.search("")
+    
+    replace = []
+    for i in range(repeat):
+        old, new = ("value", "VALUE") if i % 2 == 0 else ("VALUE", "value")
+        start = time.perf_counter()
+        editor.replace_text_minimal(editor.toPlainText().replace(old, new))
+        settle(app, 1)
+        replace.append(time.perf_counter() - start)
+    close_all_tabs(window)
+    return {
+        "size_mb": round(size_mb, 3),
+        "matches": matches,
+        "search": dict(summarize(search), mb_per_s=round(size_mb / statistics.median(search), 1)),
+        "replace_all": dict(summarize(replace), mb_per_s=round(size_mb / statistics.median(replace), 1)),
+    }
+
+def bench_autosave(app, window, workdir, tabs, lines, repeat):
+    """Koszt auto-zapisu przy N zmodyfikowanych kartach"""
+    folder = Path(workdir) / "autosave"
+    folder.mkdir(exist_ok=True)
+    for i in range(tabs):
+        path = folder / f"plik_{i}.py"
+        path.write_text(generate_source(".py", lines, seed=i), encoding="utf-8")
+        window._open_file(str(path))
+    settle(app)
+    
+    samples = []
+    for _ in range(repeat):
+        for i in range(window.tabs.count()):
+            editor = window.tabs.widget(i).findChild(AdvancedCodeEditor)
+            editor.insertPlainText("#")
+        start = time.perf_counter()
+        window._auto_save()
+        samples.append(time.perf_counter() - start)
+    settle(app)
+    close_all_tabs(window)
+    return dict(summarize(samples), tabs=tabs, lines_per_tab=lines)
+
+def bench_terminal(app, window, lines, chunk_size=4096):
+    """Przepustowość terminala (wstawianie + parsowanie błędów)"""
+    data = generate_terminal_output(lines)
+    window._clear_diagnostics()
+    start = time.perf_counter()
+    for i in range(0, len(data), chunk_size):
+        window._append_terminal(data[i:i + chunk_size])
+    settle(app, 1)
+    elapsed = time.perf_counter() - start
+    size_mb = len(data.encode("utf-8")) / 1024 / 1024
+    return {
+        "lines": lines,
+        "size_mb": round(size_mb, 3),
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "mb_per_s": round(size_mb / elapsed, 2),
+        "lines_per_s": int(lines / elapsed),
+        "diagnostics": len(window.diagnostics.items),
+    }
+
+# ================== ODTWARZANIE SESJI ==================
+
+def key_kind(event):
+    """Gałąź keyPressEvent, przez którą przejdzie klawisz"""
+    key, text = event["key"], event["text"]
+    ctrl = event["modifiers"] & Qt.KeyboardModifier.ControlModifier.value
+    if ctrl and key == Qt.Key.Key_Slash:
+        return "comment"
+    if ctrl and key == Qt.Key.Key_Space:
+        return "completion"
+    if ctrl:
+        return "ctrl"
+    if key == Qt.Key.Key_Return:
+        return "smart_indent"
+    if key == Qt.Key.Key_Tab:
+        return "tab"
+    if key == Qt.Key.Key_Backspace:
+        return "backspace"
+    if text and text in "([{'\"`":
+        return "auto_pair"
+    if text and text.isprintable():
+        return "char"
+    return "navigation"
+
+def bench_replay(app, workdir, session_path, realtime):
+    """Odtwórz nagraną sesję i zmierz czas od klawisza do odmalowania"""
+    with open(session_path, encoding="utf-8") as f:
+        session = json.load(f)
+    initial = session["initial"]
+    path = Path(workdir) / f"sesja{initial['suffix']}"
+    path.write_text(initial["text"], encoding="utf-8", newline="")
+    
+    window = make_window(workdir, initial.get("minimap", True))
+    window.show()
+    window._open_file(str(path))
+    settle(app)
+    editor = window._get_current_editor()
+    editor.tab_size = initial.get("tab_size", editor.tab_size)
+    cursor = editor.textCursor()
+    cursor.setPosition(initial["anchor"])
+    cursor.setPosition(initial["cursor"], QTextCursor.MoveMode.KeepAnchor)
+    editor.setTextCursor(cursor)
+    editor.setFocus()
+    settle(app)
+    
+    samples = []
+    by_kind = {}
+    recorded = [e["paint_ms"] / 1000 for e in session["events"] if "paint_ms" in e]
+    start = time.perf_counter()
+    for event in session["events"]:
+        if realtime:
+            # Zachowaj odstępy z nagrania - timery (kolorowanie, indeksy, lint) działają jak na żywo
+            while time.perf_counter() - start < event["t"]:
+                app.processEvents()
+                time.sleep(0.001)
+        kind = QEvent.Type.KeyPress if event["type"] == "press" else QEvent.Type.KeyRelease
+        qevent = QKeyEvent(kind, event["key"], Qt.KeyboardModifier(event["modifiers"]),
+                           event["text"], event["auto_repeat"])
+        # Przy otwartej liście podpowiedzi klawisze trafiają najpierw do niej (jak w Qt)
+        target = QApplication.activePopupWidget() or editor
+        t0 = time.perf_counter()
+        QApplication.sendEvent(target, qevent)
+        if kind != QEvent.Type.KeyPress:
+            continue
+        editor.viewport().repaint()
+        elapsed = time.perf_counter() - t0
+        samples.append(elapsed)
+        by_kind.setdefault(key_kind(event), []).append(elapsed)
+        if not realtime:
+            app.processEvents()
+    final_text = editor.toPlainText()
+    editor.is_modified = False
+    close_window(app, window)
+    
+    result = {
+        "session": os.path.basename(session_path),
+        "realtime": realtime,
+        "keys": len(samples),
+        "input_to_paint": summarize(samples) if samples else None,
+        "by_kind": {kind: summarize(values) for kind, values in sorted(by_kind.items())},
+        "final_text_sha1": hashlib.sha1(final_text.encode("utf-8")).hexdigest()
+    }
+    if recorded:
+        result["recorded_input_to_paint"] = summarize(recorded)
+    return result
+
+# ================== MAIN ==================
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarki OneCode (bez okna, wynik w JSON)")
+    parser.add_argument("--lines", type=int, default=20000, help="linie w wygenerowanych plikach")
+    parser.add_argument("--tabs", type=int, default=10, help="karty w teście auto-zapisu")
+    parser.add_argument("--keys", type=int, default=200, help="liczba klawiszy w teście opóźnień")
+    parser.add_argument("--terminal-lines", type=int, default=100000, help="linie wyjścia w teście terminala")
+    parser.add_argument("--repeat", type=int, default=3, help="powtórzenia pomiarów")
+    parser.add_argument("--languages", default=",".join(TEMPLATES), help="rozszerzenia, np. .py,.cpp")
+    parser.add_argument("--only", default="", help="tylko wybrane testy (open,highlight,keys,search,autosave,terminal,replay)")
+    parser.add_argument("--replay", help="sesja klawiatury nagrana w edytorze (Widok → Nagrywaj sesję klawiatury)")
+    parser.add_argument("--fast", action="store_true", help="odtwarzaj bez zachowania odstępów z nagrania")
+    parser.add_argument("-o", "--output", help="plik wynikowy JSON (domyślnie stdout)")
+    args = parser.parse_args()
+    
+    selected = set(filter(None, args.only.split(",")))
+    if not selected:
+        selected = {"replay"} if args.replay else {"open", "highlight", "keys", "search", "autosave", "terminal"}
+    if "replay" in selected and not args.replay:
+        parser.error("--only replay wymaga --replay SESJA.json")
+    app = QApplication.instance() or QApplication(sys.argv)
+    cwd = os.getcwd()
+    # make_window podmienia katalog domowy - przywracany razem z katalogiem roboczym
+    home = {name: os.environ.get(name) for name in ("HOME", "USERPROFILE")}
+    workdir = tempfile.mkdtemp(prefix="onecode_bench_")
+    try:
+        files = {}
+        for ext in filter(None, args.languages.split(",")):
+            path = Path(workdir) / f"korpus{ext}"
+            path.write_text(generate_source(ext, args.lines), encoding="utf-8")
+            files[ext] = path
+        
+        results = {}
+        if "replay" in selected:
+            results["replay"] = bench_replay(app, workdir, os.path.abspath(os.path.join(cwd, args.replay)), not args.fast)
+            selected.discard("replay")
+        
+        window = make_window(workdir, minimap=True)
+        if "open" in selected:
+            results["open_file"] = bench_open(app, window, files, args.repeat)
+        if "highlight" in selected:
+            results["highlight"] = bench_highlight(app, window, files, args.repeat)
+        if "search" in selected:
+            results["search_replace"] = bench_search(app, window, files.get(".py", next(iter(files.values()))), args.repeat)
+        if "autosave" in selected:
+            results["autosave"] = bench_autosave(app, window, workdir, args.tabs, args.lines // 10, args.repeat)
+        if "terminal" in selected:
+            results["terminal"] = bench_terminal(app, window, args.terminal_lines)
+        close_window(app, window)
+        
+        if "keys" in selected:
+            path = files.get(".py", next(iter(files.values())))
+            results["keystroke"] = {
+                "minimap": bench_keystrokes(app, workdir, path, args.keys, True),
+                "no_minimap": bench_keystrokes(app, workdir, path, args.keys, False),
+            }
+    finally:
+        os.chdir(cwd)
+        for name, value in home.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "qt": qVersion(),
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "lines": args.lines,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
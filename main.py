@@ -3,7 +3,13 @@
 #  Polski edytor kodu z zaawansowanymi funkcjami
 # ===============================================
 
-import sys, os, re, subprocess, json
+import sys, os, re, subprocess, json, time, heapq, difflib, ast, hashlib, math, functools, codecs, mmap, argparse, zlib, base64, threading
+from bisect import bisect_left, bisect_right, insort
+from collections import deque, Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from importlib.util import find_spec
+from itertools import chain
 from pathlib import Path
 from PySide6.QtWidgets import *
 from PySide6.QtGui import *
@@ -12,13 +18,161 @@ from pygments.lexers import *
 from pygments.token import Token
 from pygments import lex
 
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
 # ================== KONFIGURACJA ==================
 
-class Config:
-    """Zarządzanie konfiguracją edytora"""
+def _read_json(path):
+    """Zawartość pliku JSON (słownik) albo None, gdy pliku nie ma"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    if not isinstance(data, dict):
+        raise ValueError("oczekiwano obiektu JSON")
+    return data
+
+@contextmanager
+def _file_lock(path):
+    """Blokada międzyprocesowa na pliku obok konfiguracji (kilka okien edytora)"""
+    with open(path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        elif msvcrt:
+            f.seek(0)
+            for _ in range(50):
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.02)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            elif msvcrt:
+                f.seek(0)
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+                except OSError:
+                    pass
+
+def merge_settings(ours, base, disk, limits=None):
+    """Połącz nasze zmiany (względem base) z tym, co inny proces zapisał na dysku.
+    
+    Klucze zmienione u nas wygrywają, pozostałe bierzemy z dysku. Listy zmienione
+    po obu stronach (ostatnie pliki) są sumowane - nasze elementy pierwsze.
+    """
+    if disk is None:
+        return dict(ours)
+    limits = limits or {}
+    merged = dict(disk)
+    for key, value in ours.items():
+        old = base.get(key)
+        if value == old and key in disk:
+            continue
+        theirs = disk.get(key)
+        if isinstance(value, list) and isinstance(theirs, list) and theirs != old:
+            old = old if isinstance(old, list) else []
+            value = value + [v for v in theirs if v not in value and v not in old]
+            if key in limits:
+                value = value[:limits[key]]
+        merged[key] = value
+    return merged
+
+def write_config(path, ours, base, limits=None):
+    """Zapis pod blokadą: wczytaj aktualny plik, połącz zmiany, podmień atomowo"""
+    path = Path(path)
+    with _file_lock(path.with_name(path.name + ".lock")):
+        try:
+            disk = _read_json(path)
+        except ValueError:
+            disk = None
+        merged = merge_settings(ours, base, disk, limits)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+    return merged
+
+class ConfigSignals(QObject):
+    done = Signal(object, object)
+
+class ConfigWriter(QRunnable):
+    """Zapis konfiguracji w puli wątków"""
+    def __init__(self, path, ours, base, limits, signals):
+        super().__init__()
+        self.path = path
+        self.ours = ours
+        self.base = base
+        self.limits = limits
+        self.signals = signals
+        # Ustawiane po wysłaniu wyniku - Config.flush(wait=True) czeka tylko na ten zapis
+        self.finished = threading.Event()
+        # Config trzyma referencję (tryTake/czekanie) - pula nie może go usunąć
+        self.setAutoDelete(False)
+    
+    def run(self):
+        try:
+            merged, error = write_config(self.path, self.ours, self.base, self.limits), None
+        except (OSError, ValueError) as e:
+            merged, error = None, str(e)
+        self.signals.done.emit(merged, error)
+        self.finished.set()
+
+class Config(QObject):
+    """Zarządzanie konfiguracją edytora.
+    
+    Zmiany są zbierane i zapisywane w tle (SAVE_DELAY po ostatniej), atomowo i pod
+    blokadą pliku - kilka okien edytora łączy swoje zmiany zamiast je nadpisywać.
+    Plik .onecode.json w otwartym folderze nadpisuje ustawienia użytkownika.
+    """
+    SAVE_DELAY = 1000
+    PROJECT_FILE = ".onecode.json"
+    RECENT_LIMITS = {"recent_files": 20, "recent_folders": 10}
+    
+    save_failed = Signal(str)
+    
     def __init__(self):
+        super().__init__()
         self.config_path = Path.home() / ".onecode_config.json"
+        self.error = None
+        self.project = {}
+        self.project_path = None
+        self.writes = 0
         self.settings = self.load()
+        # Stan pliku po ostatnim odczycie/zapisie - różnice to nasze zmiany
+        self._base = json.loads(json.dumps(self.settings))
+        self._inflight = None
+        self._writer = None
+        self._pending = False
+        self.signals = ConfigSignals()
+        self.signals.done.connect(self._on_written)
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.SAVE_DELAY)
+        self.timer.timeout.connect(self.flush)
     
     def load(self):
         defaults = {
@@ -31,24 +185,109 @@ class Config:
             "show_line_numbers": True,
             "tab_size": 4,
             "word_wrap": False,
+            "perf_monitor": False,
+            "background_lint": True,
+            "format_on_save": False,
+            "undo_memory_mb": 32,
+            "undo_total_memory_mb": 256,
+            "persistent_undo": True,
             "recent_files": [],
             "recent_folders": []
         }
-        if self.config_path.exists():
+        try:
+            loaded = _read_json(self.config_path)
+        except (OSError, ValueError) as e:
+            # Uszkodzony plik zostaje obok - następny zapis go nie nadpisze po cichu
+            backup = self.config_path.with_name(self.config_path.name + ".corrupt")
+            self.error = f"Uszkodzona konfiguracja ({e}), kopia: {backup}"
             try:
-                with open(self.config_path, 'r') as f:
-                    loaded = json.load(f)
-                    defaults.update(loaded)
-            except:
+                os.replace(self.config_path, backup)
+            except OSError:
                 pass
+            loaded = None
+        if loaded:
+            defaults.update(loaded)
         return defaults
     
+    def load_project(self, folder):
+        """Nadpisania z .onecode.json w folderze projektu (tylko do odczytu)"""
+        self.project_path = Path(folder) / self.PROJECT_FILE
+        try:
+            self.project = _read_json(self.project_path) or {}
+        except (OSError, ValueError) as e:
+            self.project = {}
+            self.error = f"Błędny {self.PROJECT_FILE}: {e}"
+        return self.project
+    
+    def get(self, key, default=None):
+        if key in self.project:
+            return self.project[key]
+        return self.settings.get(key, default)
+    
+    def set(self, key, value):
+        # Zmiana wprost od użytkownika wygrywa z nadpisaniem projektu w tej sesji
+        self.project.pop(key, None)
+        self.settings[key] = value
+        self.save()
+    
+    def add_recent(self, key, item):
+        items = [i for i in self.settings.get(key, []) if i != item]
+        items.insert(0, item)
+        self.set(key, items[:self.RECENT_LIMITS.get(key, 20)])
+    
     def save(self):
+        """Zaplanuj zapis - kolejne zmiany w ciągu SAVE_DELAY dają jeden zapis"""
+        self.timer.start()
+    
+    def flush(self, wait=False):
+        """Zapisz zebrane zmiany (w tle albo od razu, np. przy zamykaniu)"""
+        self.timer.stop()
+        if self._inflight is not None:
+            if not wait:
+                self._pending = True
+                return
+            # Dokończ zapis z tła, żeby nie łączyć zmian dwa razy. Jeszcze
+            # nieuruchomiony (pula zajęta innymi zadaniami) - wykonaj go tutaj
+            writer = self._writer
+            if QThreadPool.globalInstance().tryTake(writer):
+                writer.run()
+            else:
+                writer.finished.wait(2)
+            # Wynik (_on_written) czeka w kolejce zdarzeń tego obiektu
+            QCoreApplication.sendPostedEvents(self)
+            self._pending = False
+        if self.settings == self._base:
+            return
+        ours = json.loads(json.dumps(self.settings))
+        base = self._base
+        self._inflight = ours
+        self.writes += 1
+        if not wait:
+            self._writer = ConfigWriter(self.config_path, ours, base, self.RECENT_LIMITS, self.signals)
+            QThreadPool.globalInstance().start(self._writer)
+            return
         try:
-            with open(self.config_path, 'w') as f:
-                json.dump(self.settings, f, indent=2)
-        except:
-            pass
+            merged, error = write_config(self.config_path, ours, base, self.RECENT_LIMITS), None
+        except (OSError, ValueError) as e:
+            merged, error = None, str(e)
+        self._on_written(merged, error)
+    
+    def _on_written(self, merged, error):
+        ours, self._inflight = self._inflight, None
+        if ours is None:
+            return
+        if error:
+            self.error = f"Nie udało się zapisać konfiguracji: {error}"
+            self.save_failed.emit(self.error)
+        else:
+            # Przejmij zmiany innych okien tam, gdzie od wysłania nic się nie zmieniło
+            for key, value in merged.items():
+                if self.settings.get(key) == ours.get(key):
+                    self.settings[key] = value
+            self._base = merged
+        if self._pending:
+            self._pending = False
+            self.timer.start()
 
 # ================== THEMES ==================
 
@@ -58,6 +297,7 @@ class Theme:
         "fg": "#D4D4D4",
         "selection": "#264F78",
         "current_line": "#2A2A2A",
+        "bracket_match": "#3B514D",
         "sidebar": "#252526",
         "border": "#333333",
         "keyword": "#C586C0",
@@ -67,7 +307,14 @@ class Theme:
         "number": "#B5CEA8",
         "operator": "#D4D4D4",
         "error": "#F48771",
-        "warning": "#CCA700"
+        "warning": "#CCA700",
+        "diff_added": "#373D29",
+        "diff_removed": "#4B1E1E",
+        "diff_added_text": "#4F6B2C",
+        "diff_removed_text": "#7A2E2E",
+        "git_added": "#487E02",
+        "git_modified": "#1B81A8",
+        "git_deleted": "#F14C4C"
     }
     
     LIGHT = {
@@ -75,6 +322,7 @@ class Theme:
         "fg": "#000000",
         "selection": "#ADD6FF",
         "current_line": "#F0F0F0",
+        "bracket_match": "#B9E3D8",
         "sidebar": "#F3F3F3",
         "border": "#E0E0E0",
         "keyword": "#0000FF",
@@ -84,17 +332,746 @@ class Theme:
         "number": "#098658",
         "operator": "#000000",
         "error": "#E51400",
-        "warning": "#BF8803"
+        "warning": "#BF8803",
+        "diff_added": "#E6F4D7",
+        "diff_removed": "#FADBDB",
+        "diff_added_text": "#BFE3A0",
+        "diff_removed_text": "#F2A8A8",
+        "git_added": "#48985D",
+        "git_modified": "#2090D3",
+        "git_deleted": "#E51400"
     }
+    
+    USER_DIR = Path.home() / ".onecode_themes"
+    
+    @classmethod
+    def available(cls):
+        """Motywy wbudowane i użytkownika (~/.onecode_themes/*.json).
+        
+        Plik motywu zawiera klucze jak DARK (np. "keyword": "#C586C0"), opcjonalnie
+        "name" i "base" ("dark"/"light") - brakujące kolory pochodzą z bazowego.
+        """
+        themes = {"dark": cls.DARK, "light": cls.LIGHT}
+        try:
+            files = sorted(cls.USER_DIR.glob("*.json"))
+        except OSError:
+            files = []
+        for path in files:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(data, dict):
+                continue
+            theme = dict(cls.LIGHT if data.get("base") == "light" else cls.DARK)
+            theme.update({k: v for k, v in data.items() if k in theme and isinstance(v, str)})
+            themes[str(data.get("name") or path.stem)] = theme
+        return themes
+    
+    @classmethod
+    def get(cls, name):
+        return cls.available().get(name, cls.DARK)
+
+# ================== JĘZYKI ==================
+
+class Language:
+    """Profil języka: komentarze, wcięcia, polecenie uruchomienia i lexer.
+    
+    Edytor rozwiązuje profil raz, przy ustawieniu ścieżki - komentowanie,
+    wcięcia i uruchamianie nie sprawdzają już rozszerzenia przy każdym użyciu.
+    Polecenie uruchomienia to szablon z polami {path}, {name} (nazwa bez
+    rozszerzenia), {out} / {exec} (plik wynikowy kompilacji) i {open}.
+    Polecenie sprawdzania składni (lint) to lista argumentów z polami {file}
+    (kopia treści bufora) i {dir} (katalog oryginalnego pliku). Formatery
+    podawane są w kolejności preferencji (pierwszy dostępny).
+    """
+    
+    def __init__(self, name, extensions, lexer=None, line_comment=None, block_comment=None,
+                 indent_after=(), dedent_after=(), run=None, lint=None, formatter=()):
+        self.name = name
+        self.extensions = extensions
+        self.lexer_name = lexer
+        self.line_comment = line_comment
+        self.block_comment = block_comment
+        self.indent_after = indent_after
+        self.dedent_after = dedent_after
+        self.run = run
+        self.lint = lint
+        self.formatter = formatter
+        self._lexer = None
+    
+    def lexer(self):
+        """Lexer tworzony raz i współdzielony przez wszystkie edytory"""
+        if self._lexer is None and self.lexer_name:
+            self._lexer = get_lexer_by_name(self.lexer_name)
+        return self._lexer
+    
+    def comment_tokens(self):
+        """(prefiks, sufiks) komentarza linii; None gdy język nie ma komentarzy"""
+        if self.line_comment:
+            return self.line_comment, ""
+        return self.block_comment
+    
+    def newline_indent(self, line, tab_size):
+        """Wcięcie nowej linii po Enter na końcu podanej linii"""
+        indent = line[:len(line) - len(line.lstrip())]
+        stripped = line.rstrip()
+        for opener in self.indent_after:
+            if not stripped.endswith(opener):
+                continue
+            before = stripped[:-len(opener)][-1:]
+            # Słowo (do, then) tylko jako całe słowo - nie koniec "undo" czy "todo"
+            if opener[0].isalpha() and (before.isalnum() or before == "_"):
+                continue
+            return indent + " " * tab_size
+        if self.dedent_after and stripped.lstrip().split(" ", 1)[0] in self.dedent_after:
+            return indent[:max(0, len(indent) - tab_size)]
+        return indent
+    
+    def run_command(self, path):
+        if not self.run:
+            return None
+        exe = os.name == "nt"
+        return self.run.format(
+            path=path,
+            name=os.path.splitext(os.path.basename(path))[0],
+            out="temp.exe" if exe else "temp.out",
+            exec="temp.exe" if exe else "./temp.out",
+            open="start" if exe else "xdg-open",
+        )
+
+C_STYLE_INDENT = ("{", "(", "[")
+
+# pyflakes zgłasza też nieużywane importy i nazwy; bez niego tylko składnia
+PYTHON_LINT = [sys.executable, "-m", "pyflakes" if find_spec("pyflakes") else "py_compile", "{file}"]
+
+LANGUAGES = [
+    Language("Python", (".py", ".pyw"), "python", "#", None, (":", "(", "[", "{"),
+             ("return", "pass", "break", "continue", "raise"), 'python "{path}"', PYTHON_LINT,
+             ("black", "ruff")),
+    Language("C++", (".cpp", ".cc", ".cxx", ".h", ".hpp"), "cpp", "//", ("/*", "*/"), C_STYLE_INDENT,
+             run='g++ "{path}" -o {out} && {exec}', lint=["g++", "-fsyntax-only", "-I{dir}", "{file}"],
+             formatter=("clang-format",)),
+    Language("C", (".c",), "c", "//", ("/*", "*/"), C_STYLE_INDENT,
+             run='gcc "{path}" -o {out} && {exec}', lint=["gcc", "-fsyntax-only", "-I{dir}", "{file}"],
+             formatter=("clang-format",)),
+    Language("JavaScript", (".js", ".mjs"), "javascript", "//", ("/*", "*/"), C_STYLE_INDENT,
+             run='node "{path}"', lint=["node", "--check", "{file}"]),
+    Language("TypeScript", (".ts",), "typescript", "//", ("/*", "*/"), C_STYLE_INDENT),
+    Language("JSON", (".json",), "javascript", None, None, C_STYLE_INDENT),
+    Language("Java", (".java",), "java", "//", ("/*", "*/"), C_STYLE_INDENT,
+             run='javac "{path}" && java {name}'),
+    Language("Go", (".go",), "go", "//", ("/*", "*/"), C_STYLE_INDENT,
+             run='go run "{path}"'),
+    Language("Rust", (".rs",), "rust", "//", ("/*", "*/"), C_STYLE_INDENT),
+    Language("PHP", (".php",), "php", "//", ("/*", "*/"), C_STYLE_INDENT,
+             run='php "{path}"'),
+    Language("Ruby", (".rb",), "ruby", "#", None, ("do", "|", "{", "(", "[")),
+    Language("HTML", (".html", ".htm"), "html", None, ("<!--", "-->"),
+             run='{open} "{path}"'),
+    Language("XML", (".xml",), "xml", None, ("<!--", "-->")),
+    Language("CSS", (".css",), "css", None, ("/*", "*/"), ("{",)),
+    Language("SQL", (".sql",), "sql", "--", ("/*", "*/"), ("(",)),
+    Language("Bash", (".sh",), "bash", "#", None, ("{", "(", "then", "do"),
+             run='bash "{path}"'),
+    Language("Batch", (".bat", ".cmd"), "batch", "REM", None, ("(",)),
+    Language("YAML", (".yaml", ".yml"), "yaml", "#", None, (":",)),
+    Language("Markdown", (".md",), "markdown", None, ("<!--", "-->")),
+]
+
+# Dokumenty bez ścieżki lub z nieznanym rozszerzeniem
+PLAIN_TEXT = Language("Plain Text", (), line_comment="#", indent_after=(":", "{"))
+
+LANGUAGE_BY_EXT = {ext: language for language in LANGUAGES for ext in language.extensions}
+
+def language_for(path):
+    """Profil języka dla ścieżki (PLAIN_TEXT gdy nieznany)"""
+    if not path:
+        return PLAIN_TEXT
+    return LANGUAGE_BY_EXT.get(os.path.splitext(path)[1].lower(), PLAIN_TEXT)
+
+# ================== WYDAJNOŚĆ ==================
+
+class PerfMonitor:
+    """Pomiary czasu gorących ścieżek i zawieszeń pętli zdarzeń.
+    
+    Gdy pomiary są wyłączone, opakowane funkcje kosztują jedno sprawdzenie
+    flagi - można je zostawić na stałe w kodzie.
+    """
+    STALL_THRESHOLD = 0.1
+    
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+    
+    def reset(self):
+        # nazwa -> [liczba wywołań, suma, maksimum, ostatni]
+        self.stats = {}
+        self.stalls = deque(maxlen=200)
+        self.frames = deque(maxlen=240)
+        self._since_tick = {}
+    
+    def record(self, name, elapsed):
+        entry = self.stats.get(name)
+        if entry is None:
+            entry = self.stats[name] = [0, 0.0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+        entry[3] = elapsed
+        self._since_tick[name] = self._since_tick.get(name, 0.0) + elapsed
+    
+    def tick(self, interval, elapsed):
+        """Takt pętli zdarzeń: elapsed to faktyczny odstęp od poprzedniego"""
+        self.frames.append(elapsed)
+        if elapsed - interval > self.STALL_THRESHOLD:
+            culprits = heapq.nlargest(3, self._since_tick.items(), key=lambda x: x[1])
+            self.stalls.append({
+                "time": time.time(),
+                "duration_ms": round((elapsed - interval) * 1000, 1),
+                "handlers": {name: round(t * 1000, 1) for name, t in culprits}
+            })
+        self._since_tick = {}
+    
+    def slowest(self, n=8):
+        return heapq.nlargest(n, self.stats.items(), key=lambda x: x[1][2])
+    
+    def frame_summary(self):
+        if not self.frames:
+            return {"avg_ms": 0, "max_ms": 0, "p99_ms": 0}
+        ordered = sorted(self.frames)
+        return {
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+            "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2)
+        }
+    
+    def report(self):
+        return {
+            "timestamp": time.time(),
+            "handlers": {
+                name: {
+                    "count": count,
+                    "total_ms": round(total * 1000, 3),
+                    "avg_ms": round(total / count * 1000, 3),
+                    "max_ms": round(peak * 1000, 3),
+                    "last_ms": round(last * 1000, 3)
+                }
+                for name, (count, total, peak, last) in self.stats.items()
+            },
+            "frames": self.frame_summary(),
+            "stalls": list(self.stalls),
+            "rss_kb": current_rss_kb(),
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+        }
+
+PERF = PerfMonitor()
+
+def current_rss_kb():
+    """Bieżąca pamięć procesu (KB) z /proc; None, gdy system jej tak nie podaje"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def perf_timed(name):
+    """Dekorator: mierz czas funkcji pod podaną nazwą (gdy PERF.enabled)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PERF.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PERF.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+class StallDetector(QObject):
+    """Takt ~60 Hz; opóźnienie taktu = czas, przez który pętla zdarzeń była zajęta"""
+    INTERVAL = 16
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+        self._last = None
+    
+    def start(self):
+        self._last = time.perf_counter()
+        self.timer.start(self.INTERVAL)
+    
+    def stop(self):
+        self.timer.stop()
+    
+    def _tick(self):
+        now = time.perf_counter()
+        PERF.tick(self.INTERVAL / 1000, now - self._last)
+        self._last = now
+
+def editor_memory_estimate(editor):
+    """Przybliżony koszt pamięci karty (tekst UTF-16, bloki, minimapa, indeksy, historia cofania)"""
+    doc = editor.document()
+    size = doc.characterCount() * 2 + doc.blockCount() * 120
+    if editor.minimap:
+        size *= 2
+    index = editor.word_index
+    if index.values is not None:
+        size += len(index.keys) * 80 + len(index.values) * 64
+    return size + editor.undo_history.size()
+
+class PerfHUD(QLabel):
+    """Półprzezroczysty panel z czasem klatki, najwolniejszymi handlerami i pamięcią kart"""
+    def __init__(self, window):
+        super().__init__(window)
+        self.main_window = window
+        self.setTextFormat(Qt.TextFormat.PlainText)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background: rgba(0, 0, 0, 190); color: #9CDCFE; "
+                           "font-family: Consolas, monospace; font-size: 9pt; padding: 6px;")
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+    
+    def toggle(self):
+        if self.isVisible():
+            self.hide()
+            self.timer.stop()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start(500)
+    
+    def refresh(self):
+        frames = PERF.frame_summary()
+        lines = [
+            f"klatka: śr {frames['avg_ms']:.1f} ms  max {frames['max_ms']:.1f} ms  p99 {frames['p99_ms']:.1f} ms",
+            f"zawieszenia (>{int(PerfMonitor.STALL_THRESHOLD * 1000)} ms): {len(PERF.stalls)}",
+            "",
+            "najwolniejsze (max / śr / liczba):"
+        ]
+        for name, (count, total, peak, _) in PERF.slowest():
+            lines.append(f"  {name:<28} {peak * 1000:7.2f} {total / count * 1000:7.3f} {count:7d}")
+        lines.append("")
+        rss = current_rss_kb()
+        if rss is not None:
+            lines.append(f"pamięć procesu: {rss / 1024:.1f} MB")
+        lines.append("pamięć kart (~):")
+        for title, size in self.main_window._tab_memory():
+            lines.append(f"  {title:<28} {size / 1024 / 1024:7.2f} MB")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.move(self.main_window.width() - self.width() - 20, 70)
+
+class KeystrokeRecorder(QObject):
+    """Nagrywanie sesji klawiatury jednego edytora do odtworzenia w benchmark.py --replay.
+    
+    Sesja zawiera stan startowy edytora (tekst, kursor, rozszerzenie), więc
+    odtworzenie przechodzi przez te same gałęzie keyPressEvent. Przy okazji
+    mierzony jest czas od klawisza do najbliższego odmalowania widoku.
+    """
+    VERSION = 1
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.editor = None
+        self.initial = None
+        self.events = []
+        self._start = 0.0
+        self._pending = None
+    
+    @property
+    def recording(self):
+        return self.editor is not None
+    
+    def start(self, editor):
+        cursor = editor.textCursor()
+        self.editor = editor
+        self.events = []
+        self._pending = None
+        self.initial = {
+            "suffix": Path(editor.path).suffix if editor.path else ".txt",
+            "text": editor.toPlainText(),
+            "cursor": cursor.position(),
+            "anchor": cursor.anchor(),
+            "tab_size": editor.tab_size,
+            "minimap": editor.minimap is not None
+        }
+        self._start = time.perf_counter()
+        editor.destroyed.connect(self._detach)
+        QApplication.instance().installEventFilter(self)
+    
+    def stop(self):
+        if self.editor is not None:
+            self.editor.destroyed.disconnect(self._detach)
+        self._detach()
+        return self.session()
+    
+    def _detach(self):
+        # Zamknięcie karty kończy nagrywanie, zebrane zdarzenia zostają
+        QApplication.instance().removeEventFilter(self)
+        self.editor = None
+        self._pending = None
+    
+    def session(self):
+        return {
+            "version": self.VERSION,
+            "recorded": time.time(),
+            "initial": self.initial,
+            "events": self.events
+        }
+    
+    def eventFilter(self, obj, event):
+        kind = event.type()
+        # Przy otwartej liście podpowiedzi klawisze idą do niej, a QCompleter
+        # przekazuje je edytorowi z pominięciem filtrów zdarzeń
+        if kind in (QEvent.Type.KeyPress, QEvent.Type.KeyRelease) and self.editor and \
+                (obj is self.editor or obj is self.editor.completer.popup()):
+            now = time.perf_counter()
+            self.events.append({
+                "t": round(now - self._start, 4),
+                "type": "press" if kind == QEvent.Type.KeyPress else "release",
+                "key": event.key(),
+                "modifiers": event.modifiers().value,
+                "text": event.text(),
+                "auto_repeat": event.isAutoRepeat()
+            })
+            if kind == QEvent.Type.KeyPress:
+                self._pending = (len(self.events) - 1, now)
+        elif kind == QEvent.Type.Paint and self._pending and self.editor and obj is self.editor.viewport():
+            index, pressed = self._pending
+            self.events[index]["paint_ms"] = round((time.perf_counter() - pressed) * 1000, 2)
+            self._pending = None
+        return False
+
+# ================== DIAGNOSTYKA ==================
+
+def _norm_path(path):
+    """Znormalizowana ścieżka do porównań (abs + wielkość liter na Windows)"""
+    return os.path.normcase(os.path.abspath(path))
+
+class Diagnostic:
+    """Pojedyncza lokalizacja błędu: plik, linia, kolumna i opis"""
+    __slots__ = ("path", "line", "col", "severity", "message")
+    
+    def __init__(self, path, line, col=1, severity="error", message=""):
+        self.path = path
+        self.line = line
+        self.col = col
+        self.severity = severity
+        self.message = message
+    
+    def key(self):
+        return (_norm_path(self.path), self.line, self.col, self.message)
+
+class OutputParser:
+    """Strumieniowy parser wyjścia kompilatorów (gcc, javac, Python, node).
+    
+    Dane są podawane kawałkami przez feed(); parsowane są tylko nowe,
+    kompletne linie, więc koszt nie zależy od rozmiaru terminala.
+    """
+    PATTERNS = [
+        # gcc/g++/clang: plik.c:12:5: error: opis
+        re.compile(r"^(?P<path>(?:[A-Za-z]:)?[^:\n]+?):(?P<line>\d+):(?P<col>\d+): "
+                   r"(?:fatal )?(?P<sev>error|warning|note)[^:]*: (?P<msg>.*)$"),
+        # javac: Main.java:12: error: opis
+        re.compile(r"^(?P<path>(?:[A-Za-z]:)?[^:\n]+?\.java):(?P<line>\d+): "
+                   r"(?P<sev>error|warning): (?P<msg>.*)$"),
+        # Python: File "plik.py", line 3, in funkcja
+        re.compile(r'^\s*File "(?P<path>[^"<]+)", line (?P<line>\d+)(?:, in (?P<msg>.*))?$'),
+        # node: at funkcja (/plik.js:10:5) / at /plik.js:10:5
+        re.compile(r"^\s+at (?:.*? \()?(?P<path>(?:[A-Za-z]:)?[^\s():]+?):(?P<line>\d+):(?P<col>\d+)\)?$"),
+        # node (SyntaxError): /plik.js:3
+        re.compile(r"^(?P<path>(?:[A-Za-z]:)?[^\s:]+?\.(?:js|mjs|cjs|ts)):(?P<line>\d+)$"),
+        # pyflakes: plik.py:3:1: 'os' imported but unused
+        re.compile(r"^(?P<path>(?:[A-Za-z]:)?[^:\n]+?\.pyw?):(?P<line>\d+):(?:(?P<col>\d+):?)? (?P<msg>.*)$"),
+    ]
+    # Nagłówek błędu node - opis przychodzi kilka linii dalej ("SyntaxError: ...")
+    NODE_HEADER = PATTERNS[4]
+    ERROR_LINE_RE = re.compile(r"^\w*Error\b")
+    
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir
+        self._pending = ""
+        self._traceback = []
+        self._node_header = None
+    
+    def reset(self, base_dir=None):
+        self.base_dir = base_dir
+        self._pending = ""
+        self._traceback = []
+        self._node_header = None
+    
+    @classmethod
+    def parse_line(cls, line, base_dir=None):
+        """Zwraca Diagnostic dla pojedynczej linii lub None"""
+        if ":" not in line and "line " not in line:
+            return None
+        for pattern in cls.PATTERNS:
+            m = pattern.match(line)
+            if not m:
+                continue
+            groups = m.groupdict()
+            path = groups["path"].strip()
+            if base_dir and not os.path.isabs(path):
+                path = os.path.join(base_dir, path)
+            return Diagnostic(
+                path,
+                int(groups["line"]),
+                int(groups.get("col") or 1),
+                groups.get("sev") or "error",
+                (groups.get("msg") or "").strip()
+            )
+        return None
+    
+    def feed(self, data):
+        """Przetwórz kolejny fragment wyjścia, zwróć nowe diagnostyki"""
+        data = self._pending + data
+        lines = data.split("\n")
+        self._pending = lines.pop()
+        
+        found = []
+        for line in lines:
+            line = line.rstrip("\r")
+            diag = self.parse_line(line, self.base_dir)
+            # Ramki tracebacku i nagłówek node czekają na opis - klucz
+            # deduplikacji w DiagnosticIndex zawiera treść komunikatu
+            if diag:
+                if line.lstrip().startswith('File "'):
+                    self._traceback.append(diag)
+                elif self.NODE_HEADER.match(line):
+                    if self._node_header:
+                        found.append(self._node_header)
+                    self._node_header = diag
+                else:
+                    found.append(diag)
+            elif self._node_header and self.ERROR_LINE_RE.match(line):
+                self._node_header.message = line.strip()
+                found.append(self._node_header)
+                self._node_header = None
+            elif self._traceback and line and not line[0].isspace() \
+                    and not line.startswith("Traceback"):
+                # Linia z wyjątkiem kończy traceback Pythona
+                for frame in self._traceback:
+                    frame.message = line.strip()
+                found.extend(self._traceback)
+                self._traceback = []
+        return found
+
+class DiagnosticIndex:
+    """Indeks diagnostyk: plik -> linia -> lista, plus kolejność nawigacji"""
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        self.items = []
+        self.by_path = {}
+        self.position = -1
+        self._keys = set()
+    
+    def add(self, diag):
+        key = diag.key()
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self.items.append(diag)
+        self.by_path.setdefault(key[0], []).append(diag)
+        return True
+    
+    def for_path(self, path):
+        return self.by_path.get(_norm_path(path), []) if path else []
+    
+    def step(self, delta):
+        """Następna/poprzednia diagnostyka (zawija się)"""
+        if not self.items:
+            return None
+        self.position = (self.position + delta) % len(self.items)
+        return self.items[self.position]
+
+class Linter(QObject):
+    """Sprawdzanie składni otwartych dokumentów w tle (pyflakes/py_compile, gcc, node).
+    
+    Po ustaniu edycji treść bufora trafia do pliku tymczasowego i do kolejki
+    ograniczonej puli procesów. Nowa wersja dokumentu przerywa sprawdzanie
+    poprzedniej, a wyniki są zapamiętywane po skrócie treści - przełączenie
+    karty czy cofnięcie do sprawdzonej już wersji nie uruchamia procesu.
+    """
+    MAX_PROCESSES = max(1, min(4, (os.cpu_count() or 2) // 2))
+    CACHE_LIMIT = 256
+    TIMEOUT = 10000
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.editors = {}
+        self.cache = {}
+        self.unavailable = set()
+        self.runs = 0
+        self._dirty = set()
+        self._queue = {}
+        self._running = {}
+        self._tmp = QTemporaryDir()
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(600)
+        self.timer.timeout.connect(self._flush)
+    
+    def register(self, editor):
+        self.editors[id(editor)] = editor
+        editor.lint_digest = None
+        editor.textChanged.connect(lambda: self.schedule(editor))
+        self._dirty.add(id(editor))
+        self.timer.start(0)
+    
+    def unregister(self, editor):
+        key = id(editor)
+        self.editors.pop(key, None)
+        self._dirty.discard(key)
+        self._queue.pop(key, None)
+        self._cancel(key)
+    
+    def schedule(self, editor):
+        if id(editor) in self.editors:
+            self._dirty.add(id(editor))
+            self.timer.start()
+    
+    def _command(self, editor):
+        command = editor.language.lint
+        if not command or command[0] in self.unavailable or not self._tmp.isValid():
+            return None
+        return command
+    
+    def _flush(self):
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            editor = self.editors.get(key)
+            command = self._command(editor) if editor else None
+            if command is None:
+                continue
+            text = editor.toPlainText()
+            digest = hashlib.sha1("\0".join(command + [text]).encode("utf-8", "replace")).hexdigest()
+            if digest == editor.lint_digest:
+                continue
+            editor.lint_digest = digest
+            running = self._running.get(key)
+            if running and running[1] == digest:
+                continue
+            # Starsza wersja w toku lub w kolejce jest już nieaktualna
+            self._cancel(key)
+            self._queue.pop(key, None)
+            if digest in self.cache:
+                self._apply(editor, self.cache[digest])
+            else:
+                self._queue[key] = (digest, text)
+        self._start_next()
+    
+    def _start_next(self):
+        while self._queue and len(self._running) < self.MAX_PROCESSES:
+            key = next(iter(self._queue))
+            digest, text = self._queue.pop(key)
+            editor = self.editors.get(key)
+            command = self._command(editor) if editor else None
+            if command is None:
+                continue
+            ext = os.path.splitext(editor.path or "")[1] or editor.language.extensions[0]
+            self.runs += 1
+            file = os.path.join(self._tmp.path(), f"lint{self.runs}{ext}")
+            try:
+                with open(file, "w", encoding="utf-8", newline="\n") as f:
+                    f.write(text)
+            except OSError:
+                continue
+            fields = {"file": file, "dir": os.path.dirname(editor.path or file)}
+            process = QProcess(self)
+            process.finished.connect(lambda code, status, key=key, process=process, file=file:
+                                     self._on_finished(key, process, file))
+            process.errorOccurred.connect(lambda error, key=key, process=process, file=file:
+                                          self._on_error(key, process, file, error))
+            self._running[key] = (process, digest)
+            process.start(command[0], [arg.format(**fields) for arg in command[1:]])
+            QTimer.singleShot(self.TIMEOUT, process, process.kill)
+    
+    def _cancel(self, key):
+        running = self._running.pop(key, None)
+        if running:
+            running[0].kill()
+    
+    def _on_error(self, key, process, file, error):
+        if error != QProcess.ProcessError.FailedToStart:
+            return
+        # Brak narzędzia (np. gcc) - nie próbuj ponownie w tej sesji
+        self.unavailable.add(process.program())
+        self._finish(key, process, file)
+    
+    def _on_finished(self, key, process, file):
+        running = self._running.get(key)
+        # Przerwany (nowsza wersja, limit czasu) - wynik niepełny
+        if running and running[0] is process and process.exitStatus() == QProcess.ExitStatus.NormalExit:
+            digest = running[1]
+            found = OutputParser(os.path.dirname(file)).feed(
+                process.readAllStandardError().data().decode(errors="ignore") + "\n")
+            # pyflakes: błędy składni na stderr, pozostałe uwagi na stdout
+            for diag in OutputParser(os.path.dirname(file)).feed(
+                    process.readAllStandardOutput().data().decode(errors="ignore") + "\n"):
+                diag.severity = "warning"
+                found.append(diag)
+            target = _norm_path(file)
+            result = [(d.line, d.col, d.severity, d.message) for d in found if _norm_path(d.path) == target]
+            self.cache[digest] = result
+            if len(self.cache) > self.CACHE_LIMIT:
+                del self.cache[next(iter(self.cache))]
+            editor = self.editors.get(key)
+            if editor is not None and editor.lint_digest == digest:
+                self._apply(editor, result)
+        self._finish(key, process, file)
+    
+    def _finish(self, key, process, file):
+        running = self._running.get(key)
+        if running and running[0] is process:
+            del self._running[key]
+        try:
+            os.remove(file)
+        except OSError:
+            pass
+        process.deleteLater()
+        self._start_next()
+    
+    def _apply(self, editor, result):
+        editor.set_diagnostics([Diagnostic(editor.path or "", line, col, severity, message)
+                                for line, col, severity, message in result], source="lint")
 
 # ================== SYNTAX HIGHLIGHTER ==================
 
+class BlockData(QTextBlockUserData):
+    """Dane kolorowania przypięte do bloku (przesuwają się razem z nim)"""
+    def __init__(self):
+        super().__init__()
+        self.skipped = False
+        # Wersja tabeli formatów (motywu), z którą blok był ostatnio kolorowany
+        self.generation = 0
+
+# Klasa tokena zapisana w formacie - zmiana motywu podmienia kolory bez ponownego lexowania
+TOKEN_PROPERTY = QTextFormat.Property.UserProperty + 1
+
 class AdvancedHighlighter(QSyntaxHighlighter):
     def __init__(self, document, lexer, theme):
         super().__init__(document)
         self.lexer = lexer
         self.theme = theme
         self.formats = {}
+        self.bracket_index = None
+        # (pierwsza, ostatnia) linia kolorowana od razu w trakcie edycji zbiorczej
+        self.deferred_range = None
+        # Zwiększana przy zmianie motywu; remapping - przekolorowanie z zapisanych klas tokenów
+        self.generation = 0
+        self.remapping = False
         self._init_formats()
     
     def _format(self, color, bold=False, italic=False):
@@ -104,6 +1081,19 @@ class AdvancedHighlighter(QSyntaxHighlighter):
         if italic: f.setFontItalic(True)
         return f
     
+    def set_theme(self, theme):
+        """Nowa tabela formatów; bloki przekolorowuje edytor (widoczne od razu, reszta leniwie)"""
+        self.theme = theme
+        self._init_formats()
+        self.generation += 1
+    
+    def _remap_block(self):
+        """Podmień formaty bloku według klas tokenów zapisanych w obecnych formatach"""
+        for fmt_range in self.currentBlock().layout().formats():
+            fmt = self._formats_by_name.get(fmt_range.format.property(TOKEN_PROPERTY))
+            if fmt is not None:
+                self.setFormat(fmt_range.start, fmt_range.length, fmt)
+    
     def _init_formats(self):
         self.formats[Token.Keyword] = self._format(self.theme["keyword"], True)
         self.formats[Token.Keyword.Namespace] = self._format(self.theme["keyword"], True)
@@ -119,11 +1109,52 @@ class AdvancedHighlighter(QSyntaxHighlighter):
         self.formats[Token.Number.Integer] = self._format(self.theme["number"])
         self.formats[Token.Number.Float] = self._format(self.theme["number"])
         self.formats[Token.Operator] = self._format(self.theme["operator"])
+        for token, fmt in self.formats.items():
+            fmt.setProperty(TOKEN_PROPERTY, str(token))
+        self._formats_by_name = {str(token): fmt for token, fmt in self.formats.items()}
     
+    @perf_timed("highlightBlock")
     def highlightBlock(self, text):
         if not self.lexer:
             return
+        data = self.currentBlockUserData()
+        block = self.currentBlock()
+        deferred = self.deferred_range
+        if not block.isVisible() or (deferred and not deferred[0] <= block.blockNumber() <= deferred[1]):
+            # Zwinięty blok albo poza ekranem przy edycji zbiorczej - pokolorowany po odsłonięciu
+            if data is None:
+                data = BlockData()
+                self.setCurrentBlockUserData(data)
+            data.skipped = True
+            return
+        if data is None and self.generation:
+            # Po zmianie motywu każdy blok pamięta wersję formatów
+            data = BlockData()
+            self.setCurrentBlockUserData(data)
+        if self.remapping and not data.skipped:
+            self._remap_block()
+            data.generation = self.generation
+            return
+        if data is not None:
+            data.skipped = False
+            data.generation = self.generation
+        brackets = []
+        for start, length, fmt in self._token_formats(text, brackets):
+            self.setFormat(start, length, fmt)
+        if self.bracket_index is not None:
+            self.bracket_index.refine(self.currentBlock().blockNumber(), text, tuple(brackets))
+    
+    def _token_formats(self, text, brackets):
+        """(początek, długość, format) tokenów linii; nawiasy kodu dopisywane do brackets"""
+        pos = 0
         for token, content in lex(text, self.lexer):
+            # Nawiasy poza napisami i komentarzami - dla indeksu par nawiasów
+            start = pos
+            if token not in Token.String and token not in Token.Comment:
+                for i, ch in enumerate(content):
+                    if ch in "()[]{}":
+                        brackets.append((pos + i, ch))
+            pos += len(content)
             fmt = self.formats.get(token)
             if not fmt:
                 # Sprawdź rodzica tokena
@@ -134,9 +1165,24 @@ class AdvancedHighlighter(QSyntaxHighlighter):
                         fmt = self.formats[parent]
                         break
             if fmt:
-                start = text.find(content)
-                if start >= 0:
-                    self.setFormat(start, len(content), fmt)
+                yield start, len(content), fmt
+    
+    def format_block(self, block):
+        """Pokoloruj blok dokumentu, do którego highlighter nie jest podpięty.
+        
+        Dla dużych dokumentów tylko do odczytu (porównanie): podpięcie wymusza
+        pokolorowanie i ponowny układ całego tekstu, a tu koloruje się tylko to,
+        co jest na ekranie.
+        """
+        ranges = []
+        for start, length, fmt in self._token_formats(block.text(), []):
+            fmt_range = QTextLayout.FormatRange()
+            fmt_range.start = start
+            fmt_range.length = length
+            fmt_range.format = fmt
+            ranges.append(fmt_range)
+        block.layout().setFormats(ranges)
+        block.document().markContentsDirty(block.position(), block.length())
 
 # ================== LINE NUMBERS ==================
 
@@ -150,105 +1196,1343 @@ class LineNumberArea(QWidget):
     
     def paintEvent(self, event):
         self.editor.line_number_area_paint_event(event)
+    
+    def mousePressEvent(self, event):
+        if not self.editor.gutter_click(event.pos()):
+            super().mousePressEvent(event)
+    
+    def event(self, event):
+        if event.type() == QEvent.Type.ToolTip:
+            text = self.editor.gutter_tooltip(event.pos())
+            if text:
+                QToolTip.showText(event.globalPos(), text, self)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().event(event)
+
+class GutterLane:
+    """Pas znaczników na marginesie obok numerów linii.
+    
+    paint() dostaje raz na odświeżenie listę widocznych linii z brudnego
+    obszaru ([(numer linii, y)]), więc powinno jedynie czytać gotowe dane
+    (np. słownik linia -> stan). Po zmianie danych wystarczy
+    editor.update_gutter_lines(od, do).
+    """
+    width = 10
+    side = "left"
+    
+    def __init__(self, editor):
+        self.editor = editor
+    
+    def paint(self, painter, x, rows, line_height):
+        pass
+    
+    def tooltip(self, line):
+        return ""
+    
+    def clicked(self, line):
+        return False
+
+class FoldLane(GutterLane):
+    """Trójkąty zwijania regionów (po prawej stronie numerów)"""
+    width = 12
+    side = "right"
+    
+    def paint(self, painter, x, rows, line_height):
+        index = self.editor.fold_index
+        if index.values is None:
+            return
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#858585"))
+        half = min(4, line_height // 3)
+        for line, y in rows:
+            cx, cy = x + self.width // 2, y + line_height // 2
+            if line in index.collapsed:
+                painter.drawPolygon(QPolygon([QPoint(cx - half // 2, cy - half), QPoint(cx + half // 2 + 1, cy),
+                                              QPoint(cx - half // 2, cy + half)]))
+            elif index.is_start(line):
+                painter.drawPolygon(QPolygon([QPoint(cx - half, cy - half // 2), QPoint(cx + half, cy - half // 2),
+                                              QPoint(cx, cy + half // 2 + 1)]))
+    
+    def tooltip(self, line):
+        end = self.editor.fold_index.collapsed.get(line)
+        return f"Zwinięte linie: {end - line}" if end is not None else ""
+    
+    def clicked(self, line):
+        return self.editor.toggle_fold(line)
+
+class DiagnosticLane(GutterLane):
+    """Kropka błędu/ostrzeżenia z parsera wyjścia"""
+    def paint(self, painter, x, rows, line_height):
+        diagnostics = self.editor.diagnostics
+        if not diagnostics:
+            return
+        size = min(8, line_height - 4)
+        painter.setPen(Qt.PenStyle.NoPen)
+        for line, y in rows:
+            diags = diagnostics.get(line)
+            if diags:
+                severity = "error" if any(d.severity == "error" for d in diags) else "warning"
+                painter.setBrush(QColor(self.editor.theme[severity]))
+                painter.drawEllipse(x + 2, y + (line_height - size) // 2, size, size)
+    
+    def tooltip(self, line):
+        diags = self.editor.diagnostics.get(line)
+        if not diags:
+            return ""
+        return "\n".join(f"{d.severity}: {d.message}" if d.message else d.severity for d in diags)
+
+class VcsLane(GutterLane):
+    """Pasek zmian względem HEAD (git): dodane, zmienione i usunięte linie"""
+    width = 4
+    side = "right"
+    TOOLTIPS = {"added": "Dodana linia", "modified": "Zmieniona linia", "deleted": "Usunięte linie powyżej"}
+    
+    def paint(self, painter, x, rows, line_height):
+        marks = self.editor.primary.vcs_marks
+        if not marks:
+            return
+        theme = self.editor.theme
+        painter.setPen(Qt.PenStyle.NoPen)
+        for line, y in rows:
+            kind = marks.get(line)
+            if kind == "deleted":
+                painter.setBrush(QColor(theme["git_deleted"]))
+                painter.drawPolygon(QPolygon([QPoint(x, y - 3), QPoint(x + self.width, y), QPoint(x, y + 3)]))
+            elif kind:
+                painter.fillRect(x, y, self.width - 1, line_height, QColor(theme["git_" + kind]))
+    
+    def tooltip(self, line):
+        return self.TOOLTIPS.get(self.editor.primary.vcs_marks.get(line), "")
 
 # ================== MINIMAP ==================
 
 class MiniMap(QPlainTextEdit):
+    """Pomniejszona kopia tekstu edytora.
+    
+    Każda zmiana dokumentu (contentsChange) jest powtarzana w kopii, więc
+    edycja kosztuje tyle, ile zmieniony fragment, a kolorowanie (nie zmienia
+    tekstu) niczego nie przepisuje. Całość kopiowana jest tylko wtedy, gdy
+    kopia rozjedzie się z dokumentem.
+    """
     def __init__(self, editor):
         super().__init__()
         self.editor = editor
         self.setReadOnly(True)
+        # Kopia tylko do podglądu - historia cofania trzymałaby drugi bufor tekstu
+        self.setUndoRedoEnabled(False)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setMaximumWidth(120)
         self.setFont(QFont("Consolas", 2))
         self.viewport().setCursor(Qt.CursorShape.ArrowCursor)
+        editor.document().contentsChange.connect(self._on_change)
         
+    @perf_timed("MiniMap.update_minimap")
     def update_minimap(self):
         self.setPlainText(self.editor.toPlainText())
-        # Synchronizuj przewijanie
+        self._sync_scroll()
+    
+    @perf_timed("MiniMap._on_change")
+    def _on_change(self, position, removed, added):
+        source = self.editor.document()
+        doc = self.document()
+        # Po setPlainText Qt wlicza do zmiany końcowy separator - przytnij do długości tekstu
+        end = doc.characterCount() - 1
+        cursor = QTextCursor(doc)
+        cursor.setPosition(min(position, end))
+        cursor.setPosition(min(position + removed, end), QTextCursor.MoveMode.KeepAnchor)
+        if added:
+            end = source.characterCount() - 1
+            fragment = QTextCursor(source)
+            fragment.setPosition(min(position, end))
+            fragment.setPosition(min(position + added, end), QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(fragment.selectedText().replace("\u2029", "\n"))
+        else:
+            cursor.removeSelectedText()
+        if doc.characterCount() != source.characterCount():
+            self.update_minimap()
+        else:
+            self._sync_scroll()
+    
+    def _sync_scroll(self):
         ratio = self.editor.verticalScrollBar().value() / max(1, self.editor.verticalScrollBar().maximum())
         self.verticalScrollBar().setValue(int(ratio * self.verticalScrollBar().maximum()))
 
-# ================== ADVANCED CODE EDITOR ==================
+# ================== INDEKSY LINII ==================
 
-class AdvancedCodeEditor(QPlainTextEdit):
-    def __init__(self, path=None, config=None, theme=None):
-        super().__init__()
-        self.path = path
-        self.config = config or Config()
-        self.theme = theme or Theme.DARK
-        self.is_modified = False
-        self.last_save_time = None
-        
-        # Setup
-        self._setup_appearance()
-        self._setup_line_numbers()
-        self._init_autoclose()
-        self._init_indentation()
-        
-        # Podświetlanie
-        self.highlighter = None
-        
-        # Minimap
-        self.minimap = None
-        if self.config.settings.get("show_minimap", True):
-            self.minimap = MiniMap(self)
-        
-        # Sygnały
-        self.textChanged.connect(self._on_text_changed)
-        self.cursorPositionChanged.connect(self._highlight_current_line)
-        self.blockCountChanged.connect(self.update_line_number_area_width)
-        self.updateRequest.connect(self.update_line_number_area)
-        
-        # Search
-        self.search_text = ""
-        self.search_matches = []
-        
-    def _setup_appearance(self):
-        font = QFont(
-            self.config.settings.get("font_family", "Consolas"),
-            self.config.settings.get("font_size", 11)
-        )
-        self.setFont(font)
-        
-        self.setStyleSheet(f"""
-            QPlainTextEdit {{
-                background-color: {self.theme['bg']};
-                color: {self.theme['fg']};
-                border: none;
-                selection-background-color: {self.theme['selection']};
-            }}
-        """)
-        
-        if self.config.settings.get("word_wrap", False):
-            self.setLineWrapMode(QPlainTextEdit.LineWrapMode.WidgetWidth)
-        else:
-            self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+class BlockIndex:
+    """Wartości liczone osobno dla każdej linii dokumentu.
     
-    def _setup_line_numbers(self):
-        self.line_number_area = LineNumberArea(self)
-        self.update_line_number_area_width(0)
+    Po zmianie (sygnał contentsChange) przeliczane są tylko dotknięte linie,
+    a lista jest przesuwana o różnicę liczby bloków. Duże zmiany (wczytanie
+    pliku, pełne kolorowanie) oznaczają indeks jako nieaktualny - jest wtedy
+    odbudowywany w tle porcjami, a ensure() dokańcza to od razu, gdy trzeba.
+    """
+    LAZY_THRESHOLD = 1000
+    REBUILD_CHUNK = 5000
     
-    def _init_autoclose(self):
-        self.auto_pairs = {
-            "(": ")", "[": "]", "{": "}", "'": "'", '"': '"',
-            "`": "`"
-        }
+    def __init__(self, document):
+        self.document = document
+        self.values = None
+        self._block_count = document.blockCount()
+        self._lines = None
+        self._partial = []
+        self._rebuild_timer = QTimer()
+        self._rebuild_timer.setSingleShot(True)
+        self._rebuild_timer.timeout.connect(lambda: self._rebuild_step(self.REBUILD_CHUNK))
+        document.contentsChange.connect(self._on_change)
+        self._invalidate()
     
-    def _init_indentation(self):
-        self.tab_size = self.config.settings.get("tab_size", 4)
-        self.setTabStopDistance(QFontMetrics(self.font()).horizontalAdvance(' ') * self.tab_size)
+    def compute(self, text):
+        raise NotImplementedError
     
-    def _on_text_changed(self):
-        self.is_modified = True
-        if self.minimap:
-            QTimer.singleShot(100, self.minimap.update_minimap)
+    def replaced(self, first, old_values, new_values):
+        """Wywoływane po podmianie wartości linii [first, first + len(old))"""
     
-    def _highlight_current_line(self):
-        extra_selections = []
+    def reset(self, values):
+        """Wywoływane po pełnej odbudowie"""
+    
+    def _invalidate(self):
+        self.values = None
+        self._lines = None
+        # Odczekaj - po wczytaniu pliku zwykle zaraz przychodzi pełne kolorowanie
+        self._rebuild_timer.start(200)
+    
+    def _rebuild_step(self, chunk=None):
+        if self._lines is None:
+            self._lines = self.document.toPlainText().split("\n")
+            self._partial = []
+        done = len(self._partial)
+        end = len(self._lines) if chunk is None else done + chunk
+        self._partial.extend(self.compute(line) for line in self._lines[done:end])
+        if len(self._partial) < len(self._lines):
+            self._rebuild_timer.start(0)
+            return
+        self._rebuild_timer.stop()
+        self.values = self._partial
+        self._lines = None
+        self._partial = []
+        self._block_count = len(self.values)
+        self.reset(self.values)
+    
+    def ensure(self):
+        if self.values is None:
+            self._rebuild_step()
+        return self.values
+    
+    @perf_timed("BlockIndex.update")
+    def _on_change(self, position, removed, added):
+        doc = self.document
+        new_count = doc.blockCount()
+        delta = new_count - self._block_count
+        self._block_count = new_count
+        if self.values is None:
+            self._invalidate()
+            return
         
-        if not self.isReadOnly():
+        first = doc.findBlock(position).blockNumber()
+        end = min(position + added, doc.characterCount() - 1)
+        last = doc.findBlock(end).blockNumber()
+        new_span = last - first + 1
+        old_span = new_span - delta
+        if new_span > self.LAZY_THRESHOLD or old_span < 1 or first < 0:
+            self._invalidate()
+            return
+        
+        old_values = self.values[first:first + old_span]
+        new_values = []
+        block = doc.findBlockByNumber(first)
+        for _ in range(new_span):
+            new_values.append(self.compute(block.text()))
+            block = block.next()
+        self.values[first:first + old_span] = new_values
+        self.replaced(first, old_values, new_values)
+
+IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+
+class IdentifierIndex(BlockIndex):
+    """Identyfikatory dokumentu z licznikami i posortowaną listą do wyszukiwania prefiksów"""
+    recent = {}
+    _tick = 0
+    
+    def __init__(self, document):
+        self.counts = {}
+        # Klucze "małe\0Oryginał" - bisect daje dopasowania bez względu na wielkość liter
+        self.keys = []
+        super().__init__(document)
+    
+    @classmethod
+    def touch(cls, word):
+        """Zapamiętaj słowo jako ostatnio użyte (ranking)"""
+        cls._tick += 1
+        cls.recent[word] = cls._tick
+        if len(cls.recent) > 2000:
+            for old in sorted(cls.recent, key=cls.recent.get)[:500]:
+                del cls.recent[old]
+    
+    def compute(self, text):
+        return IDENTIFIER_RE.findall(text)
+    
+    def reset(self, values):
+        self.counts = counts = dict(Counter(chain.from_iterable(values)))
+        self.keys = sorted(f"{word.lower()}\0{word}" for word in counts)
+    
+    def replaced(self, first, old_values, new_values):
+        counts = self.counts
+        for words in old_values:
+            for word in words:
+                n = counts[word] - 1
+                if n:
+                    counts[word] = n
+                else:
+                    del counts[word]
+                    key = f"{word.lower()}\0{word}"
+                    i = bisect_left(self.keys, key)
+                    if i < len(self.keys) and self.keys[i] == key:
+                        del self.keys[i]
+        for words in new_values:
+            for word in words:
+                n = counts.get(word, 0)
+                counts[word] = n + 1
+                if not n:
+                    insort(self.keys, f"{word.lower()}\0{word}")
+    
+    def matches(self, prefix):
+        """Słowa zaczynające się od prefiksu (bez względu na wielkość liter) z licznikami"""
+        self.ensure()
+        low = prefix.lower()
+        start = bisect_left(self.keys, low)
+        end = bisect_left(self.keys, low + "\uffff", start)
+        counts = self.counts
+        for key in self.keys[start:end]:
+            word = key[key.index("\0") + 1:]
+            yield word, counts[word]
+    
+    @staticmethod
+    def rank(prefix, indexes, limit=30):
+        """Połącz podpowiedzi z wielu dokumentów: częstość + świeżość + wielkość liter"""
+        totals = {}
+        for index in indexes:
+            for word, count in index.matches(prefix):
+                totals[word] = totals.get(word, 0) + count
+        # Sam wpisywany prefiks występujący raz to nie podpowiedź
+        if totals.get(prefix) == 1:
+            del totals[prefix]
+        recent = IdentifierIndex.recent
+        tick = IdentifierIndex._tick
+        
+        def score(word):
+            value = math.log1p(totals[word])
+            if word in recent:
+                value += 3.0 / (1 + (tick - recent[word]) / 20)
+            if word.startswith(prefix):
+                value += 0.5
+            return value
+        
+        return heapq.nlargest(limit, totals, key=score)
+
+BRACKET_RE = re.compile(r"[\[\](){}]")
+
+class FoldIndex(BlockIndex):
+    """Regiony zwijania z wcięć i nawiasów.
+    
+    Dla linii pamiętane jest (wcięcie, niedomknięte nawiasy na końcu,
+    nadmiarowe zamknięcia na początku); pusta linia ma wcięcie -1. Zakres
+    regionu liczony jest dopiero przy zwijaniu. Zwinięte regiony
+    (pierwsza linia -> ostatnia ukryta) przesuwają się razem z edycją,
+    a edycja wewnątrz zwiniętego regionu go rozwija.
+    """
+    START_SCAN = 50
+    
+    def __init__(self, document):
+        self.collapsed = {}
+        super().__init__(document)
+    
+    def compute(self, text):
+        stripped = text.lstrip()
+        if not stripped:
+            return (-1, 0, 0)
+        indent = len(text) - len(stripped)
+        if "\t" in text[:indent]:
+            indent = len(text[:indent].expandtabs(4))
+        opened = closed = 0
+        for ch in BRACKET_RE.findall(stripped):
+            if ch in "([{":
+                opened += 1
+            elif opened:
+                opened -= 1
+            else:
+                closed += 1
+        return (indent, opened, closed)
+    
+    def reset(self, values):
+        # Po pełnej odbudowie numery zwiniętych linii są nieznane - pokaż wszystko
+        self.collapsed = {}
+        self._show_all()
+    
+    def replaced(self, first, old_values, new_values):
+        if not self.collapsed:
+            return
+        delta = len(new_values) - len(old_values)
+        last = first + len(old_values) - 1
+        collapsed = {}
+        reopen = []
+        for start, end in self.collapsed.items():
+            if end < first:
+                collapsed[start] = end
+            elif start > last:
+                collapsed[start + delta] = end + delta
+            elif start == first == last and not delta and self.is_start(start):
+                # Zmiana w samej linii nagłówka - region zostaje zwinięty
+                collapsed[start] = end
+            else:
+                reopen.append((min(start, first), max(end + delta, first + len(new_values) - 1)))
+        self.collapsed = collapsed
+        if reopen:
+            # Nie zmieniaj układu w trakcie contentsChange
+            # Edycja mogła zaczynać się w nagłówku - pierwsza linia też może być ukryta
+            QTimer.singleShot(0, lambda: [self._show(start, end, inclusive=True) for start, end in reopen])
+    
+    def is_start(self, line):
+        """Szybki test dla marginesu: czy linia otwiera region"""
+        values = self.values
+        if values is None or line >= len(values):
+            return False
+        indent, opened, _ = values[line]
+        if indent < 0:
+            return False
+        if opened:
+            return True
+        for i in range(line + 1, min(len(values), line + self.START_SCAN)):
+            next_indent = values[i][0]
+            if next_indent >= 0:
+                return next_indent > indent
+        return False
+    
+    def region(self, line):
+        """(pierwsza, ostatnia ukrywana linia) regionu zaczynającego się w line albo None"""
+        values = self.ensure()
+        if line >= len(values):
+            return None
+        indent, opened, _ = values[line]
+        if indent < 0:
+            return None
+        if opened:
+            # Region nawiasowy - linia z zamknięciem zostaje widoczna
+            depth = opened
+            for i in range(line + 1, len(values)):
+                _, opens, closes = values[i]
+                depth -= closes
+                if depth <= 0:
+                    return (line, i - 1) if i - 1 > line else None
+                depth += opens
+            return None
+        end = line
+        for i in range(line + 1, len(values)):
+            next_indent = values[i][0]
+            if next_indent < 0:
+                continue
+            if next_indent <= indent:
+                break
+            end = i
+        return (line, end) if end > line else None
+    
+    def fold(self, line):
+        if line in self.collapsed:
+            return False
+        region = self.region(line)
+        if not region:
+            return False
+        self.collapsed[line] = region[1]
+        self._hide(line + 1, region[1])
+        self._mark_dirty(line, region[1])
+        return True
+    
+    def unfold(self, line):
+        end = self.collapsed.pop(line, None)
+        if end is None:
+            return False
+        self._show(line, end)
+        return True
+    
+    def fold_all(self):
+        """Zwiń wszystkie regiony najwyższego poziomu (jedno przejście po indeksie)"""
+        values = self.ensure()
+        folded = 0
+        i = 0
+        while i < len(values):
+            end = self.collapsed.get(i)
+            if end is None:
+                region = self.region(i)
+                if region:
+                    end = region[1]
+                    self.collapsed[i] = end
+                    self._hide(i + 1, end)
+                    folded += 1
+            i = (end if end is not None else i) + 1
+        if folded:
+            self._mark_dirty(0, len(values) - 1)
+        return folded
+    
+    def unfold_all(self):
+        self.collapsed = {}
+        self._show_all()
+    
+    def _show_all(self):
+        """Pokaż każdy ukryty blok - także taki, którego nie obejmuje żaden znany region"""
+        block = self.document.firstBlock()
+        first = None
+        while block.isValid():
+            if not block.isVisible():
+                block.setVisible(True)
+                if first is None:
+                    first = block.blockNumber()
+                last = block.blockNumber()
+            block = block.next()
+        if first is not None:
+            self._mark_dirty(first, last)
+    
+    def _hide(self, first, last):
+        self._set_visible(first, last, False)
+    
+    def _show(self, first, last, inclusive=False):
+        """Pokaż linie (first, last] (z inclusive - także first), z pominięciem
+        wciąż zwiniętych regionów wewnątrz"""
+        line = first if inclusive else first + 1
+        nested = sorted((s, e) for s, e in self.collapsed.items() if first < s <= last)
+        for start, end in nested:
+            if start < line:
+                continue
+            self._set_visible(line, start, True)
+            line = end + 1
+        self._set_visible(line, last, True)
+        self._mark_dirty(first, last)
+    
+    def _set_visible(self, first, last, visible):
+        block = self.document.findBlockByNumber(first)
+        for _ in range(last - first + 1):
+            if not block.isValid():
+                break
+            block.setVisible(visible)
+            block = block.next()
+    
+    def _mark_dirty(self, first, last):
+        doc = self.document
+        start = doc.findBlockByNumber(first)
+        end = doc.findBlockByNumber(last)
+        if not start.isValid():
+            return
+        if not end.isValid():
+            end = doc.lastBlock()
+        doc.markContentsDirty(start.position(), end.position() + end.length() - start.position())
+
+# Zapasowe wykrywanie nawiasów (linia nie przeszła jeszcze przez kolorowanie):
+# napisy i komentarze jednoliniowe są pomijane
+BRACKET_SCAN_RE = re.compile(r"""("(?:\\.|[^"\\])*"?|'(?:\\.|[^'\\])*'?|`[^`]*`?)|(#.*|//.*|/\*.*?(?:\*/|$))|([()\[\]{}])""")
+STRING_OR_COMMENT_RE = re.compile(r"[\"'`#/]")
+BRACKET_PAIRS = {"(": ")", "[": "]", "{": "}", ")": "(", "]": "[", "}": "{"}
+
+def _bracket_summary(brackets):
+    """(bilans, minimum sumy od lewej, minimum sumy od prawej) dla linii lub porcji.
+    
+    Od lewej otwierający to +1, od prawej zamykający to +1 - pozwala to
+    przeskakiwać całe linie/porcje, w których szukany nawias na pewno się nie zamyka.
+    """
+    depth = low = 0
+    for _, ch in brackets:
+        depth += 1 if ch in "([{" else -1
+        if depth < low:
+            low = depth
+    back = back_low = 0
+    for _, ch in reversed(brackets):
+        back += 1 if ch in ")]}" else -1
+        if back < back_low:
+            back_low = back
+    return (depth, low, back_low)
+
+class BracketIndex(BlockIndex):
+    """Nawiasy każdej linii (poza napisami/komentarzami) do szukania par.
+    
+    Wartością linii jest krotka (kolumna, znak). Kolorowanie podmienia ją na
+    wynik z tokenów leksera (refine), a do tego czasu używany jest
+    BRACKET_SCAN_RE. Linie są pogrupowane w porcje z zapamiętanym
+    podsumowaniem (_bracket_summary), więc szukanie pary przegląda najwyżej
+    dwie porcje linia po linii, a resztę dokumentu - po jednym podsumowaniu na porcję.
+    """
+    CHUNK = 256
+    REBUILD_CHUNK = 2000
+    TOKEN_CACHE_LIMIT = 50000
+    
+    def __init__(self, document):
+        self.sums = []
+        self.starts = []
+        self.chunk_sums = []
+        # Tekst linii -> nawiasy z tokenów (wypełniane przez kolorowanie)
+        self.token_brackets = {}
+        super().__init__(document)
+    
+    def compute(self, text):
+        cached = self.token_brackets.get(text)
+        if cached is not None:
+            return cached
+        if STRING_OR_COMMENT_RE.search(text) is None:
+            return tuple((m.start(), m.group()) for m in BRACKET_RE.finditer(text))
+        return tuple((m.start(3), m.group(3)) for m in BRACKET_SCAN_RE.finditer(text) if m.group(3))
+    
+    def reset(self, values):
+        self.sums = [_bracket_summary(v) for v in values]
+        self.starts = list(range(0, len(values), self.CHUNK)) or [0]
+        self.chunk_sums = [None] * len(self.starts)
+    
+    def replaced(self, first, old_values, new_values):
+        self.sums[first:first + len(old_values)] = [_bracket_summary(v) for v in new_values]
+        starts = self.starts
+        c = bisect_left(starts, first + 1) - 1
+        delta = len(new_values) - len(old_values)
+        # Zmienione linie mogą sięgać kolejnych porcji (kilka zmian w jednym bloku edycji)
+        last = bisect_left(starts, first + len(new_values)) - 1
+        for i in range(c, max(c, last) + 1):
+            self.chunk_sums[i] = None
+        if delta:
+            # Porcje zaczynające się w usuniętych liniach dołączają do porcji c
+            end = bisect_left(starts, first + len(old_values), c + 1)
+            del starts[c + 1:end]
+            del self.chunk_sums[c + 1:end]
+            for i in range(c + 1, len(starts)):
+                starts[i] += delta
+            size = (starts[c + 1] if c + 1 < len(starts) else len(self.sums)) - starts[c]
+            if size > 2 * self.CHUNK:
+                split = list(range(starts[c] + self.CHUNK, starts[c] + size, self.CHUNK))
+                starts[c + 1:c + 1] = split
+                self.chunk_sums[c + 1:c + 1] = [None] * len(split)
+    
+    def refine(self, line, text, brackets):
+        """Nawiasy linii wyznaczone z tokenów kolorowania"""
+        cache = self.token_brackets
+        if len(cache) >= self.TOKEN_CACHE_LIMIT:
+            cache.clear()
+        cache[text] = brackets
+        values = self.values
+        if values is None or self._block_count != self.document.blockCount() or line >= len(values):
+            return
+        if values[line] != brackets:
+            values[line] = brackets
+            self.sums[line] = _bracket_summary(brackets)
+            self.chunk_sums[bisect_left(self.starts, line + 1) - 1] = None
+    
+    def _chunk_summary(self, c):
+        summary = self.chunk_sums[c]
+        if summary is None:
+            end = self.starts[c + 1] if c + 1 < len(self.starts) else len(self.sums)
+            depth = low = 0
+            for line_depth, line_low, _ in self.sums[self.starts[c]:end]:
+                if depth + line_low < low:
+                    low = depth + line_low
+                depth += line_depth
+            back = back_low = 0
+            for line_depth, _, line_back_low in reversed(self.sums[self.starts[c]:end]):
+                if back + line_back_low < back_low:
+                    back_low = back + line_back_low
+                back -= line_depth
+            summary = self.chunk_sums[c] = (depth, low, back_low)
+        return summary
+    
+    def bracket_at(self, line, column):
+        """Nawias w kolumnie linii albo None"""
+        values = self.ensure()
+        if line >= len(values):
+            return None
+        for col, ch in values[line]:
+            if col == column:
+                return ch
+        return None
+    
+    def match(self, line, column):
+        """(linia, kolumna) nawiasu do pary dla nawiasu w (line, column) albo None"""
+        ch = self.bracket_at(line, column)
+        if ch is None:
+            return None
+        if ch in "([{":
+            found = self._match_forward(line, column)
+        else:
+            found = self._match_backward(line, column)
+        if found and self.bracket_at(*found) == BRACKET_PAIRS[ch]:
+            return found
+        return None
+    
+    def _match_forward(self, line, column):
+        values = self.values
+        depth = self._scan_line(line, 1, lambda col: col > column)
+        if isinstance(depth, tuple):
+            return depth
+        starts = self.starts
+        c = bisect_left(starts, line + 1) - 1
+        target = None
+        j = line + 1
+        end = starts[c + 1] if c + 1 < len(starts) else len(values)
+        while j < end:
+            line_depth, line_low, _ = self.sums[j]
+            if depth + line_low <= 0:
+                target = j
+                break
+            depth += line_depth
+            j += 1
+        if target is None:
+            c += 1
+            while c < len(starts):
+                chunk_depth, chunk_low, _ = self._chunk_summary(c)
+                if depth + chunk_low <= 0:
+                    break
+                depth += chunk_depth
+                c += 1
+            else:
+                return None
+            j = starts[c]
+            while True:
+                line_depth, line_low, _ = self.sums[j]
+                if depth + line_low <= 0:
+                    target = j
+                    break
+                depth += line_depth
+                j += 1
+        return self._scan_line(target, depth, lambda col: True)
+    
+    def _match_backward(self, line, column):
+        depth = self._scan_line(line, 1, lambda col: col < column, reverse=True)
+        if isinstance(depth, tuple):
+            return depth
+        starts = self.starts
+        c = bisect_left(starts, line + 1) - 1
+        target = None
+        j = line - 1
+        while j >= starts[c]:
+            line_depth, _, back_low = self.sums[j]
+            if depth + back_low <= 0:
+                target = j
+                break
+            depth -= line_depth
+            j -= 1
+        if target is None:
+            c -= 1
+            while c >= 0:
+                chunk_depth, _, chunk_back_low = self._chunk_summary(c)
+                if depth + chunk_back_low <= 0:
+                    break
+                depth -= chunk_depth
+                c -= 1
+            else:
+                return None
+            end = starts[c + 1] if c + 1 < len(starts) else len(self.values)
+            j = end - 1
+            while True:
+                line_depth, _, back_low = self.sums[j]
+                if depth + back_low <= 0:
+                    target = j
+                    break
+                depth -= line_depth
+                j -= 1
+        return self._scan_line(target, depth, lambda col: True, reverse=True)
+    
+    def _scan_line(self, line, depth, accept, reverse=False):
+        """Przejdź nawiasy linii; (linia, kolumna) gdy głębokość spadnie do 0, inaczej nowa głębokość"""
+        brackets = self.values[line]
+        opening = ")]}" if reverse else "([{"
+        for col, ch in (reversed(brackets) if reverse else brackets):
+            if not accept(col):
+                continue
+            depth += 1 if ch in opening else -1
+            if depth == 0:
+                return (line, col)
+        return depth
+
+# ================== HISTORIA COFANIA ==================
+
+def undo_store_path(path):
+    """Plik z zapisaną historią cofania pliku w ~/.onecode_cache"""
+    digest = hashlib.sha1(_norm_path(path).encode("utf-8")).hexdigest()[:16]
+    return Path.home() / ".onecode_cache" / "undo" / f"{digest}.json"
+
+class UndoHistory:
+    """Historia cofania dokumentu z limitem pamięci.
+    
+    Qt trzyma każdy wstawiony znak w buforze dokumentu aż do jego przebudowy,
+    więc długa sesja rośnie bez końca. Koszt historii Qt jest szacowany ze
+    wstawionych znaków i liczby kroków. Po przekroczeniu limitu (w chwili
+    bezczynności) stan sprzed najstarszego kroku Qt staje się punktem
+    kontrolnym - tekstem skompresowanym zlib - a dokument jest przebudowywany
+    bez historii. Cofanie za początek historii Qt przechodzi między punktami
+    kontrolnymi (całymi wersjami), a najstarsze są usuwane, gdy przekroczony
+    jest limit dokumentu albo wspólny limit wszystkich kart. Punkty kontrolne
+    są zapisywane przy zamknięciu i wracają przy otwarciu niezmienionego pliku.
+    """
+    STEP_COST = 64
+    COMPACT_DELAY = 2000
+    STORE_LIMIT = 100
+    instances = set()
+    
+    def __init__(self, editor):
+        self.editor = editor
+        self.checkpoints = []
+        self.redo_checkpoints = []
+        # Stan na początku historii Qt: (tekst zlib, pozycja kursora)
+        self.base = None
+        self._base_text = ""
+        self.used = 0
+        self._replaying = False
+        document = editor.document()
+        document.contentsChange.connect(self._on_change)
+        document.undoCommandAdded.connect(self._on_command)
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.COMPACT_DELAY)
+        self.timer.timeout.connect(self._on_idle)
+        UndoHistory.instances.add(self)
+    
+    def limit(self):
+        return self.editor.config.get("undo_memory_mb", 32) * 1024 * 1024
+    
+    def size(self):
+        """Przybliżona pamięć historii: bufor Qt i skompresowane punkty kontrolne"""
+        size = self.used + sum(len(blob) for blob, _ in chain(self.checkpoints, self.redo_checkpoints))
+        if self.base is not None:
+            return size + len(self.base[0])
+        return size + len(self._base_text or "")
+    
+    def reset(self, text):
+        """Nowa treść (wczytanie pliku) - historia zaczyna się od niej"""
+        self.checkpoints = []
+        self.redo_checkpoints = []
+        self.base = None
+        self._base_text = text
+        self.used = 0
+        # Kopia tekstu jest kompresowana dopiero w chwili bezczynności
+        if self in UndoHistory.instances:
+            self.timer.start()
+    
+    @contextmanager
+    def replaying(self):
+        """Zmiany cofania/ponawiania - nie są nowymi edycjami"""
+        self._replaying = True
+        try:
+            yield
+        finally:
+            self._replaying = False
+    
+    def _on_change(self, position, removed, added):
+        if not self._replaying:
+            self.used += 2 * added
+            if self.used > self.limit():
+                self.timer.start()
+    
+    def _on_command(self):
+        if not self._replaying:
+            self.used += self.STEP_COST
+            self.redo_checkpoints = []
+    
+    def _base(self):
+        if self.base is None:
+            text = self._base_text if self._base_text is not None else self.editor.toPlainText()
+            self.base = (zlib.compress(text.encode("utf-8"), 1), 0)
+            self._base_text = None
+        return self.base
+    
+    def _on_idle(self):
+        document = self.editor.document()
+        if self.base is None:
+            if self.editor.isReadOnly() and not document.isUndoAvailable():
+                # Bez edycji początek historii to bieżący tekst - kopia zbędna
+                self._base_text = None
+            else:
+                self._base()
+        # Kompaktowanie usunęłoby kroki do ponowienia - poczeka na następną edycję
+        if self.used > self.limit() and not document.isRedoAvailable():
+            self.compact()
+        UndoHistory.enforce_total(self.editor.config.get("undo_total_memory_mb", 256) * 1024 * 1024)
+    
+    def compact(self):
+        """Zamień historię Qt na jeden punkt kontrolny i zwolnij bufor dokumentu"""
+        editor = self.editor
+        if not editor.document().isUndoAvailable() and not self.used:
+            return False
+        text = editor.toPlainText()
+        self.checkpoints.append(self._base())
+        self.base = (zlib.compress(text.encode("utf-8"), 1), editor.textCursor().position())
+        with self.replaying():
+            editor.rebuild_document(text)
+        self.used = 0
+        self.trim(self.limit())
+        return True
+    
+    def trim(self, limit):
+        """Usuń najstarsze punkty kontrolne ponad limit; False gdy nie ma czego usuwać"""
+        dropped = False
+        while self.checkpoints and self.size() > limit:
+            self.checkpoints.pop(0)
+            dropped = True
+        return dropped
+    
+    @classmethod
+    def enforce_total(cls, limit):
+        """Wspólny limit kart: najpierw kompaktowana/przycinana największa historia"""
+        histories = sorted(cls.instances, key=UndoHistory.size, reverse=True)
+        total = sum(history.size() for history in histories)
+        for history in histories:
+            if total <= limit:
+                break
+            before = history.size()
+            if not history.editor.document().isRedoAvailable():
+                history.compact()
+            history.trim(max(0, history.size() - (total - limit)))
+            total -= before - history.size()
+    
+    def undo(self, editor):
+        """Cofnij za początek historii Qt - do poprzedniego punktu kontrolnego"""
+        if not self.checkpoints:
+            return False
+        base = (self._base()[0], editor.textCursor().position())
+        document = editor.document()
+        if document.isRedoAvailable():
+            # Kroki Qt do ponowienia znikną z przebudową - zostaje ich wynik
+            with self.replaying():
+                while document.isRedoAvailable():
+                    document.redo()
+            self.redo_checkpoints.append((zlib.compress(editor.toPlainText().encode("utf-8"), 1), base[1]))
+        self.redo_checkpoints.append(base)
+        self._restore(editor, self.checkpoints.pop())
+        return True
+    
+    def redo(self, editor):
+        if not self.redo_checkpoints:
+            return False
+        self.checkpoints.append((self._base()[0], editor.textCursor().position()))
+        self._restore(editor, self.redo_checkpoints.pop())
+        return True
+    
+    def _restore(self, editor, state):
+        blob, position = state
+        with self.replaying():
+            editor.rebuild_document(zlib.decompress(blob).decode("utf-8"), position, modified=True)
+        self.base = state
+        self.used = 0
+    
+    def store(self):
+        """Zapisz punkty kontrolne dla niezmienionego pliku (sprawdzane przy otwarciu)"""
+        editor = self.editor
+        if not editor.path or editor.is_modified or not editor.config.get("persistent_undo", True):
+            return
+        states = list(self.checkpoints)
+        if editor.document().isUndoAvailable():
+            states.append(self._base())
+        path = undo_store_path(editor.path)
+        if not states:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return
+        text = editor.toPlainText()
+        data = {
+            "sha1": hashlib.sha1(text.encode("utf-8")).hexdigest(),
+            "checkpoints": [[base64.b64encode(blob).decode("ascii"), pos] for blob, pos in states],
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+            stored = sorted(path.parent.glob("*.json"), key=lambda p: p.stat().st_mtime)
+            for old in stored[:-self.STORE_LIMIT]:
+                old.unlink()
+        except OSError:
+            pass
+    
+    def load(self, path, text):
+        """Przywróć zapisane punkty kontrolne, jeśli plik się od tego czasu nie zmienił"""
+        if not self.editor.config.get("persistent_undo", True):
+            return False
+        try:
+            with open(undo_store_path(path), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("sha1") != hashlib.sha1(text.encode("utf-8")).hexdigest():
+                return False
+            self.checkpoints = [(base64.b64decode(blob), pos) for blob, pos in data["checkpoints"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self.trim(self.limit())
+        return bool(self.checkpoints)
+    
+    def discard(self):
+        """Odłącz od wspólnego limitu (zamknięta karta, dokument tylko do odczytu)"""
+        self.timer.stop()
+        UndoHistory.instances.discard(self)
+
+# ================== ADVANCED CODE EDITOR ==================
+
+WORD_RE = re.compile(r"\w+")
+# Wklejany tekst od tej długości (znaki) wstawiany jest przez insert_bulk,
+# a dłuższy niż porcja - porcjami, z paskiem postępu
+BULK_INSERT_MIN = 256 * 1024
+BULK_INSERT_CHUNK = 1024 * 1024
+
+def line_opcodes(a, b):
+    """Zmienione fragmenty (tag, i1, i2, j1, j2) między listami linii a i b.
+    
+    Patience diff: kotwicami są linie występujące dokładnie raz w obu
+    wersjach (najdłuższy rosnący podciąg pozycji), między kotwicami - wspólne
+    początki i końce. SequenceMatcher porównuje tylko małe fragmenty; dla
+    całego pliku z wieloma rozproszonymi zmianami byłby kwadratowy.
+    """
+    return _line_opcodes(a, b, 0, len(a), 0, len(b), 0)
+
+def _line_opcodes(a, b, i1, i2, j1, j2, depth):
+    while i1 < i2 and j1 < j2 and a[i1] == b[j1]:
+        i1 += 1
+        j1 += 1
+    while i1 < i2 and j1 < j2 and a[i2 - 1] == b[j2 - 1]:
+        i2 -= 1
+        j2 -= 1
+    if i1 == i2 and j1 == j2:
+        return []
+    if i1 == i2:
+        return [("insert", i1, i2, j1, j2)]
+    if j1 == j2:
+        return [("delete", i1, i2, j1, j2)]
+    if (i2 - i1) * (j2 - j1) <= 4096:
+        matcher = difflib.SequenceMatcher(None, a[i1:i2], b[j1:j2], autojunk=False)
+        return [(tag, i1 + x1, i1 + x2, j1 + y1, j1 + y2)
+                for tag, x1, x2, y1, y2 in matcher.get_opcodes() if tag != "equal"]
+    
+    count_a = Counter(a[i1:i2])
+    count_b = Counter(b[j1:j2])
+    unique_b = {b[j]: j for j in range(j1, j2) if count_b[b[j]] == 1}
+    pairs = [(i, unique_b[a[i]]) for i in range(i1, i2)
+             if count_a[a[i]] == 1 and a[i] in unique_b]
+    # Najdłuższy rosnący podciąg pozycji w b (sortowanie cierpliwościowe)
+    tails, tail_index, previous = [], [], [None] * len(pairs)
+    for k, (i, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos:
+            previous[k] = tail_index[pos - 1]
+        if pos == len(tails):
+            tails.append(j)
+            tail_index.append(k)
+        else:
+            tails[pos] = j
+            tail_index[pos] = k
+    if not tails or depth > 32:
+        return [("replace", i1, i2, j1, j2)]
+    anchors = []
+    k = tail_index[-1]
+    while k is not None:
+        anchors.append(pairs[k])
+        k = previous[k]
+    anchors.reverse()
+    
+    opcodes = []
+    for i, j in anchors:
+        opcodes.extend(_line_opcodes(a, b, i1, i, j1, j, depth + 1))
+        i1, j1 = i + 1, j + 1
+    opcodes.extend(_line_opcodes(a, b, i1, i2, j1, j2, depth + 1))
+    return opcodes
+
+def toggle_comment_lines(lines, comment, suffix=""):
+    """Przełącz komentarz w każdej linii: usuń "prefiks " po wcięciu albo dodaj na początku.
+    
+    Z sufiksem (komentarz blokowy, np. <!-- -->) każda linia jest owijana osobno.
+    Prefiks-słowo (REM w Batch) pasuje jak w cmd.exe: bez względu na wielkość
+    liter i tylko jako całe słowo, więc "REMARK = 1" nie jest komentarzem.
+    """
+    word = comment[-1:].isalnum()
+    result = []
+    for line in lines:
+        stripped = line.strip()
+        head = stripped[:len(comment)]
+        if word:
+            matches = head.lower() == comment.lower() \
+                and stripped[len(comment):len(comment) + 1] in ("", " ", "\t")
+        else:
+            matches = head == comment
+        if matches and stripped.endswith(suffix) \
+                and len(stripped) >= len(comment) + len(suffix):
+            indent = len(line) - len(line.lstrip())
+            rest = stripped[len(comment):len(stripped) - len(suffix)]
+            if rest.startswith(" "):
+                rest = rest[1:]
+            if suffix and rest.endswith(" "):
+                rest = rest[:-1]
+            result.append(line[:indent] + rest)
+        else:
+            result.append(comment + " " + line + (" " + suffix if suffix else ""))
+    return result
+
+class AdvancedCodeEditor(QPlainTextEdit):
+    def __init__(self, path=None, config=None, theme=None, source=None, minimap=True):
+        super().__init__()
+        # Widok podziału (source) współdzieli dokument, kolorowanie i indeksy
+        # edytora głównego; stan pliku (ścieżka, zapis, diagnostyki) należy do głównego
+        self.primary = source or self
+        self.views = []
+        if source:
+            source.views.append(self)
+            self.setDocument(source.document())
+        else:
+            self.path = path
+        self.config = config or Config()
+        self.theme = theme or Theme.DARK
+        self.last_save_time = None
+        self.disk_state = None
+        self.diagnostics = {}
+        self._diagnostic_sources = {}
+        self._squiggles = []
+        # Tła linii ustawiane z zewnątrz (widok porównania)
+        self.line_marks = []
+        # Linia -> "added"/"modified"/"deleted" względem HEAD (GitTracker)
+        self.vcs_marks = {}
+        self.symbols = []
+        self.symbol_revision = 0
+        
+        # Setup
+        self._setup_appearance()
+        self._setup_line_numbers()
+        self._init_autoclose()
+        self._init_indentation()
+        
+        # Podświetlanie (indeks nawiasów łączy się z dokumentem przed kolorowaniem,
+        # więc przy edycji kolorowanie poprawia już przesunięte wartości)
+        self.bracket_index = source.bracket_index if source else BracketIndex(self.document())
+        self._highlighter = None
+        
+        # Minimap
+        self.minimap = None
+        if minimap and self.config.get("show_minimap", True) and not source:
+            self.minimap = MiniMap(self)
+        
+        # Autouzupełnianie (słowa z tego i innych otwartych dokumentów)
+        self.word_index = source.word_index if source else IdentifierIndex(self.document())
+        # Historia cofania z limitem pamięci (wspólna z widokami podziału)
+        self.undo_history = source.undo_history if source else UndoHistory(self)
+        self.related_word_indexes = lambda: []
+        
+        # Zwijanie (margines + ukryte bloki pomijane przy kolorowaniu)
+        self.fold_index = source.fold_index if source else FoldIndex(self.document())
+        self.add_gutter_lane(FoldLane(self))
+        self.add_gutter_lane(VcsLane(self))
+        self._stale_highlight = False
+        self.verticalScrollBar().valueChanged.connect(self._refresh_stale_highlight)
+        self.completer = QCompleter(self)
+        self.completer.setWidget(self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.completer.setModel(QStringListModel(self.completer))
+        self.completer.activated.connect(self._insert_completion)
+        
+        # Sygnały
+        self.cursorPositionChanged.connect(self._highlight_current_line)
+        self.cursorPositionChanged.connect(self._reveal_cursor)
+        self.blockCountChanged.connect(self.update_line_number_area_width)
+        self.updateRequest.connect(self.update_line_number_area)
+        
+        # Search
+        self.search_text = ""
+        self.search_matches = []
+        
+        # Dodatkowe kursory (Alt+klik, Ctrl+Alt+strzałki, Alt+Shift+klik - kolumna)
+        self.extra_cursors = []
+        self._batch_depth = 0
+        
+        if source:
+            self.diagnostics = source.diagnostics
+            self._update_squiggles()
+        
+    def _setup_appearance(self):
+        font = QFont(
+            self.config.get("font_family", "Consolas"),
+            self.config.get("font_size", 11)
+        )
+        self.setFont(font)
+        self._apply_colors()
+        
+        if self.config.get("word_wrap", False):
+            self.setLineWrapMode(QPlainTextEdit.LineWrapMode.WidgetWidth)
+        else:
+            self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+    
+    def _apply_colors(self):
+        self.setStyleSheet(f"""
+            QPlainTextEdit {{
+                background-color: {self.theme['bg']};
+                color: {self.theme['fg']};
+                border: none;
+                selection-background-color: {self.theme['selection']};
+            }}
+        """)
+    
+    def set_theme(self, theme):
+        """Zmiana motywu bez ponownego lexowania: nowa tabela formatów, a bloki
+        przekolorowywane z zapisanych klas tokenów - widoczne od razu, reszta
+        przy przewinięciu (ukryte karty - przy pokazaniu)."""
+        self.theme = theme
+        self._apply_colors()
+        self._update_squiggles()
+        self.line_number_area.update()
+        if self.primary is self and self.highlighter:
+            self.highlighter.set_theme(theme)
+        self._stale_highlight = True
+        if self.isVisible():
+            self._refresh_stale_highlight()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._refresh_stale_highlight()
+    
+    def _setup_line_numbers(self):
+        self.line_number_area = LineNumberArea(self)
+        self.gutter_lanes = []
+        self._gutter_width = 0
+        self._gutter_digits = 0
+        self._gutter_style = None
+        self._number_cache = {}
+        self.add_gutter_lane(DiagnosticLane(self))
+    
+    def _init_autoclose(self):
+        self.auto_pairs = {
+            "(": ")", "[": "]", "{": "}", "'": "'", '"': '"',
+            "`": "`"
+        }
+    
+    def _init_indentation(self):
+        self.tab_size = self.config.get("tab_size", 4)
+        self.setTabStopDistance(QFontMetrics(self.font()).horizontalAdvance(' ') * self.tab_size)
+    
+    @property
+    def is_modified(self):
+        # Flaga dokumentu zmienia się tylko przy edycji (nie przy kolorowaniu)
+        return self.document().isModified()
+    
+    @is_modified.setter
+    def is_modified(self, value):
+        self.document().setModified(value)
+    
+    @property
+    def path(self):
+        return self.primary._path
+    
+    @path.setter
+    def path(self, value):
+        # Profil języka rozwiązywany raz, przy zmianie ścieżki
+        self.primary._path = value
+        self.primary._language = language_for(value)
+    
+    @property
+    def language(self):
+        return self.primary._language
+    
+    @property
+    def highlighter(self):
+        return self.primary._highlighter
+    
+    @highlighter.setter
+    def highlighter(self, highlighter):
+        if self.primary is not self:
+            self.primary.highlighter = highlighter
+            return
+        if self._highlighter is not None:
+            # Poprzedni (np. po "Zapisz jako") nie może dalej kolorować dokumentu
+            self._highlighter.setDocument(None)
+        self._highlighter = highlighter
+        if highlighter is not None:
+            highlighter.bracket_index = self.bracket_index
+    
+    # Zwijanie
+    def toggle_fold(self, line=None):
+        """Zwiń/rozwiń region zaczynający się w linii (domyślnie: linia kursora)"""
+        if line is None:
+            line = self.textCursor().blockNumber()
+        if self.fold_index.unfold(line):
+            self._after_unfold()
+            return True
+        region = self.fold_index.region(line)
+        if not region:
+            return False
+        self._move_cursor_out_of(*region)
+        self.fold_index.fold(line)
+        self.line_number_area.update()
+        return True
+    
+    def fold_all(self):
+        cursor_line = self.textCursor().blockNumber()
+        if self.fold_index.fold_all():
+            for start, end in self.fold_index.collapsed.items():
+                if start < cursor_line <= end:
+                    self._move_cursor_out_of(start, end)
+                    break
+            self.line_number_area.update()
+    
+    def unfold_all(self):
+        self.fold_index.unfold_all()
+        self._after_unfold()
+    
+    def reveal_line(self, line):
+        """Rozwiń zwinięte regiony zakrywające linię"""
+        revealed = False
+        for start, end in list(self.fold_index.collapsed.items()):
+            if start < line <= end:
+                revealed |= self.fold_index.unfold(start)
+        if revealed:
+            self._after_unfold()
+    
+    def _move_cursor_out_of(self, start, end):
+        cursor = self.textCursor()
+        if start < cursor.blockNumber() <= end:
+            cursor = QTextCursor(self.document().findBlockByNumber(start))
+            cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+            self.setTextCursor(cursor)
+    
+    def _reveal_cursor(self):
+        block = self.textCursor().block()
+        if not block.isVisible():
+            self.reveal_line(block.blockNumber())
+    
+    def _after_unfold(self):
+        self._stale_highlight = True
+        self._refresh_stale_highlight()
+        self.line_number_area.update()
+    
+    def _refresh_stale_highlight(self):
+        """Pokoloruj odsłonięte bloki, które kolorowanie pominęło - tylko te na ekranie"""
+        if not self._stale_highlight or not self.highlighter:
+            return
+        highlighter = self.highlighter
+        generation = highlighter.generation
+        block = self.firstVisibleBlock()
+        remaining = self.viewport().height() // max(1, self.fontMetrics().height()) + 1
+        collapsed = self.fold_index.collapsed
+        # Bloki sprzed zmiany motywu dostają nowe kolory bez ponownego lexowania
+        highlighter.remapping = True
+        try:
+            while block.isValid() and remaining > 0:
+                data = block.userData()
+                if data is None:
+                    if generation:
+                        highlighter.rehighlightBlock(block)
+                elif data.skipped or data.generation != generation:
+                    highlighter.rehighlightBlock(block)
+                remaining -= 1
+                end = collapsed.get(block.blockNumber())
+                block = self.document().findBlockByNumber(end + 1) if end is not None else block.next()
+        finally:
+            highlighter.remapping = False
+    
+    @perf_timed("_highlight_current_line")
+    def _highlight_current_line(self):
+        if self._batch_depth:
+            return
+        extra_selections = self.line_marks + self._squiggles
+        
+        if not self.isReadOnly():
             selection = QTextEdit.ExtraSelection()
             selection.format.setBackground(QColor(self.theme["current_line"]))
             selection.format.setProperty(QTextFormat.Property.FullWidthSelection, True)
@@ -256,6 +2540,24 @@ class AdvancedCodeEditor(QPlainTextEdit):
             selection.cursor.clearSelection()
             extra_selections.append(selection)
         
+        for cursor in self.extra_cursors:
+            if cursor.hasSelection():
+                selection = QTextEdit.ExtraSelection()
+                selection.format.setBackground(QColor(self.theme["selection"]))
+                selection.cursor = cursor
+                extra_selections.append(selection)
+        
+        # Para nawiasów przy kursorze
+        pair = self._bracket_pair()
+        if pair:
+            for line, column in pair:
+                selection = QTextEdit.ExtraSelection()
+                selection.format.setBackground(QColor(self.theme.get("bracket_match", self.theme["selection"])))
+                selection.cursor = QTextCursor(self.document())
+                selection.cursor.setPosition(self.document().findBlockByNumber(line).position() + column)
+                selection.cursor.movePosition(QTextCursor.MoveOperation.NextCharacter, QTextCursor.MoveMode.KeepAnchor)
+                extra_selections.append(selection)
+        
         # Dodaj wyszukiwania
         for match in self.search_matches:
             selection = QTextEdit.ExtraSelection()
@@ -267,11 +2569,75 @@ class AdvancedCodeEditor(QPlainTextEdit):
         
         self.setExtraSelections(extra_selections)
     
+    def _bracket_pair(self):
+        """((linia, kolumna), (linia, kolumna)) nawiasu przy kursorze i jego pary"""
+        cursor = self.textCursor()
+        if cursor.hasSelection() or self.bracket_index.values is None:
+            return None
+        line = cursor.blockNumber()
+        column = cursor.positionInBlock()
+        # Nawias za kursorem ma pierwszeństwo, potem ten przed nim
+        for col in (column, column - 1):
+            if col >= 0:
+                match = self.bracket_index.match(line, col)
+                if match:
+                    return (line, col), match
+        return None
+    
+    def jump_to_matching_bracket(self):
+        """Przenieś kursor do pary nawiasu (Ctrl+])"""
+        self.bracket_index.ensure()
+        pair = self._bracket_pair()
+        if not pair:
+            return False
+        (line, column), (match_line, match_column) = pair
+        cursor = self.textCursor()
+        # Kursor ląduje po tej samej stronie nawiasu, po której był
+        after = column == cursor.positionInBlock() - 1
+        cursor.setPosition(self.document().findBlockByNumber(match_line).position() + match_column + after)
+        self.setTextCursor(cursor)
+        return True
+    
+    @perf_timed("keyPressEvent")
     def keyPressEvent(self, e):
+        popup = self.completer.popup()
+        if popup.isVisible():
+            # Klawisze wyboru obsługuje QCompleter
+            if e.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter, Qt.Key.Key_Tab,
+                           Qt.Key.Key_Escape, Qt.Key.Key_Backtab):
+                e.ignore()
+                return
+            if e.text() and not (e.text().isalnum() or e.text() == "_"):
+                popup.hide()
+        
+        # Cofanie przez historię z punktami kontrolnymi (nie wbudowane w Qt)
+        if e.matches(QKeySequence.StandardKey.Undo):
+            self.undo()
+            return
+        if e.matches(QKeySequence.StandardKey.Redo):
+            self.redo()
+            return
+        
+        # Dodatkowe kursory (Ctrl+Alt+Góra/Dół)
+        if e.modifiers() & Qt.KeyboardModifier.ControlModifier and e.modifiers() & Qt.KeyboardModifier.AltModifier \
+                and e.key() in (Qt.Key.Key_Up, Qt.Key.Key_Down):
+            self.add_cursor_vertical(-1 if e.key() == Qt.Key.Key_Up else 1)
+            return
+        if self.extra_cursors and self._multi_cursor_key(e):
+            return
+        
+        # Podpowiedzi na żądanie (Ctrl+Spacja)
+        if e.key() == Qt.Key.Key_Space and e.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self._update_completion(force=True)
+            return
+        
         # Auto-zamykanie nawiasów
         key = e.text()
         cursor = self.textCursor()
         
+        if key and not (key.isalnum() or key == "_"):
+            self._remember_word_before_cursor()
+        
         if key in self.auto_pairs and not cursor.hasSelection():
             closing = self.auto_pairs[key]
             cursor.insertText(key + closing)
@@ -281,16 +2647,11 @@ class AdvancedCodeEditor(QPlainTextEdit):
         
         # Inteligentne wcięcia
         if e.key() == Qt.Key.Key_Return:
-            current_line = cursor.block().text()
-            indent = len(current_line) - len(current_line.lstrip())
+            indent = self.language.newline_indent(cursor.block().text(), self.tab_size)
             super().keyPressEvent(e)
             
-            # Dodaj wcięcie
-            self.insertPlainText(" " * indent)
-            
-            # Jeśli linia kończy się ':' lub '{', dodaj dodatkowe wcięcie
-            if current_line.rstrip().endswith((':','{')):
-                self.insertPlainText(" " * self.tab_size)
+            # Wcięcie według profilu języka (np. po ':' w Pythonie, po '{' w C)
+            self.insertPlainText(indent)
             return
         
         # Tab jako spacje
@@ -314,63 +2675,494 @@ class AdvancedCodeEditor(QPlainTextEdit):
             return
         
         super().keyPressEvent(e)
+        
+        if key.isalnum() or key == "_" or (popup.isVisible() and e.key() == Qt.Key.Key_Backspace):
+            self._update_completion()
     
-    def toggle_comment(self):
-        """Komentowanie/odkomentowanie linii"""
+    def _word_prefix(self):
+        """Identyfikator bezpośrednio przed kursorem"""
         cursor = self.textCursor()
-        cursor.beginEditBlock()
+        text = cursor.block().text()[:cursor.positionInBlock()]
+        m = re.search(r"[A-Za-z_][A-Za-z0-9_]*$", text)
+        return m.group(0) if m else ""
+    
+    def _remember_word_before_cursor(self):
+        word = self._word_prefix()
+        if len(word) >= 3:
+            IdentifierIndex.touch(word)
+    
+    def _update_completion(self, force=False):
+        """Pokaż/odśwież listę podpowiedzi dla bieżącego prefiksu"""
+        prefix = self._word_prefix()
+        popup = self.completer.popup()
+        if len(prefix) < (1 if force else 2):
+            popup.hide()
+            return
         
-        # Pobierz comment prefix dla języka
-        comment = "//" if self.path and any(self.path.endswith(x) for x in ['.cpp', '.js', '.c']) else "#"
+        words = IdentifierIndex.rank(prefix, [self.word_index] + self.related_word_indexes())
+        if not words:
+            popup.hide()
+            return
+        self.completer.model().setStringList(words)
+        self.completer.setCompletionPrefix("")
+        popup.setCurrentIndex(self.completer.model().index(0, 0))
         
-        start = cursor.selectionStart()
-        end = cursor.selectionEnd()
+        rect = self.cursorRect()
+        rect.setWidth(popup.sizeHintForColumn(0) + popup.verticalScrollBar().sizeHint().width())
+        self.completer.complete(rect)
+    
+    def _insert_completion(self, word):
+        prefix = self._word_prefix()
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.KeepAnchor, len(prefix))
+        cursor.insertText(word)
+        self.setTextCursor(cursor)
+        IdentifierIndex.touch(word)
+    
+    def toggle_comment(self):
+        """Komentowanie/odkomentowanie linii wszystkich kursorów"""
+        tokens = self.language.comment_tokens()
+        if tokens:
+            self._transform_lines(lambda lines: toggle_comment_lines(lines, *tokens))
+    
+    def replace_text_minimal(self, text):
+        """Zastąp treść zmieniając tylko różniące się linie.
         
-        cursor.setPosition(start)
-        cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock)
+        Kursor, przewinięcie i historia cofania zostają zachowane - całość
+        jest jednym krokiem cofania.
+        """
+        old_lines = self.toPlainText().split("\n")
+        new_lines = text.split("\n")
+        opcodes = line_opcodes(old_lines, new_lines)
+        if not opcodes:
+            return False
         
-        while cursor.position() <= end:
-            cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock)
-            line = cursor.block().text()
-            
-            if line.strip().startswith(comment):
-                # Usuń komentarz
-                pos = line.index(comment)
-                cursor.setPosition(cursor.block().position() + pos)
-                cursor.deleteChar()
-                if comment == "//":
-                    cursor.deleteChar()
-            else:
-                # Dodaj komentarz
-                cursor.insertText(comment + " ")
-            
-            if not cursor.movePosition(QTextCursor.MoveOperation.NextBlock):
+        # Kursor w zmienionym fragmencie zostaje w tej samej linii względem jego początku
+        line, column = self.textCursor().blockNumber(), self.textCursor().positionInBlock()
+        target = line
+        for tag, i1, i2, j1, j2 in opcodes:
+            if line < i1:
+                break
+            if line < i2:
+                target = j1 + min(line - i1, max(0, j2 - j1 - 1))
                 break
+            target = line + j2 - i2
         
-        cursor.endEditBlock()
-    
-    def duplicate_line(self):
-        """Duplikuj aktualną linię"""
+        doc = self.document()
+        # Jedna edycja: kolorowanie od razu tylko widocznych linii
+        with self.batch_edit() as cursor:
+            # Od końca, żeby numery linii przed zmianą pozostały aktualne
+            for tag, i1, i2, j1, j2 in reversed(opcodes):
+                replacement = "\n".join(new_lines[j1:j2])
+                if i1 < len(old_lines):
+                    cursor.setPosition(doc.findBlockByNumber(i1).position())
+                else:
+                    cursor.movePosition(QTextCursor.MoveOperation.End)
+                    replacement = "\n" + replacement
+                if i2 > i1:
+                    if i2 < len(old_lines):
+                        cursor.setPosition(doc.findBlockByNumber(i2).position(), QTextCursor.MoveMode.KeepAnchor)
+                        if j2 > j1:
+                            replacement += "\n"
+                    else:
+                        cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+                        if j2 == j1 and i1 > 0:
+                            # Usunięcie końcówki pliku razem z poprzedzającym znakiem nowej linii
+                            cursor.setPosition(doc.findBlockByNumber(i1 - 1).position() + len(old_lines[i1 - 1]))
+                            cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+                elif i1 < len(old_lines):
+                    replacement += "\n"
+                cursor.insertText(replacement)
+        block = doc.findBlockByNumber(min(target, doc.blockCount() - 1))
         cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock)
-        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
-        text = cursor.selectedText()
-        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
-        cursor.insertText("\n" + text)
+        cursor.setPosition(block.position() + min(column, block.length() - 1))
+        self.setTextCursor(cursor)
+        return True
     
-    def delete_line(self):
-        """Usuń aktualną linię"""
+    def rebuild_document(self, text, position=None, modified=None):
+        """Wstaw tekst od nowa, bez historii cofania Qt - zwalnia bufor dokumentu.
+        
+        Kolorowane od razu są tylko widoczne linie. Bez position (ten sam
+        tekst, kompaktowanie historii) zostają zaznaczenie, przewinięcie i
+        zwinięte regiony; z position kursor trafia w to miejsce.
+        """
+        doc = self.document()
         cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock)
-        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
-        cursor.removeSelectedText()
-        cursor.deleteChar()  # Usuń newline
+        anchor, pos = (cursor.anchor(), cursor.position()) if position is None else (position, position)
+        scroll = self.verticalScrollBar().value(), self.horizontalScrollBar().value()
+        folds = sorted(self.fold_index.collapsed) if position is None else []
+        modified = doc.isModified() if modified is None else modified
+        self.fold_index.unfold_all()
+        self.extra_cursors = []
+        highlighter = self.highlighter
+        if highlighter:
+            first = self.firstVisibleBlock().blockNumber()
+            lines = self.viewport().height() // max(1, self.fontMetrics().height()) + 1
+            highlighter.deferred_range = (first, first + 2 * lines)
+        try:
+            doc.setPlainText(text)
+        finally:
+            if highlighter:
+                highlighter.deferred_range = None
+        doc.setModified(modified)
+        for line in folds:
+            self.fold_index.fold(line)
+        end = doc.characterCount() - 1
+        cursor = QTextCursor(doc)
+        cursor.setPosition(min(anchor, end))
+        cursor.setPosition(min(pos, end), QTextCursor.MoveMode.KeepAnchor)
+        self.setTextCursor(cursor)
+        if position is None:
+            self.verticalScrollBar().setValue(scroll[0])
+            self.horizontalScrollBar().setValue(scroll[1])
+        else:
+            self.ensureCursorVisible()
+        self._stale_highlight = True
+        self._refresh_stale_highlight()
+        self.line_number_area.update()
     
-    def search(self, text, case_sensitive=False):
-        """Wyszukaj tekst w edytorze"""
-        self.search_text = text
-        self.search_matches = []
-        
+    def setPlainText(self, text):
+        super().setPlainText(text)
+        self.undo_history.reset(text)
+    
+    def undo(self):
+        """Cofnij krok Qt, a za początkiem jego historii - do punktu kontrolnego"""
+        if self.document().isUndoAvailable():
+            with self.undo_history.replaying():
+                super().undo()
+        else:
+            self.undo_history.undo(self)
+    
+    def redo(self):
+        if self.document().isRedoAvailable():
+            with self.undo_history.replaying():
+                super().redo()
+        else:
+            self.undo_history.redo(self)
+    
+    def duplicate_line(self):
+        """Duplikuj linie wszystkich kursorów"""
+        doc = self.document()
+        with self.batch_edit() as cursor:
+            for first, last in reversed(self._cursor_line_ranges()):
+                end = doc.findBlockByNumber(last)
+                text = self._lines_text(first, last)
+                cursor.setPosition(end.position() + end.length() - 1)
+                cursor.insertText("\n" + text)
+    
+    def delete_line(self):
+        """Usuń linie wszystkich kursorów"""
+        doc = self.document()
+        with self.batch_edit() as cursor:
+            for first, last in reversed(self._cursor_line_ranges()):
+                start = doc.findBlockByNumber(first)
+                end = doc.findBlockByNumber(last)
+                if end.next().isValid():
+                    cursor.setPosition(start.position())
+                    cursor.setPosition(end.next().position(), QTextCursor.MoveMode.KeepAnchor)
+                else:
+                    # Ostatnia linia - usuń razem z poprzedzającym znakiem nowej linii
+                    cursor.setPosition(max(0, start.position() - 1))
+                    cursor.setPosition(end.position() + end.length() - 1, QTextCursor.MoveMode.KeepAnchor)
+                cursor.removeSelectedText()
+        self._merge_cursors()
+    
+    # Edycja zbiorcza i wiele kursorów
+    @contextmanager
+    def batch_edit(self):
+        """Zmiany w wielu miejscach jako jedna edycja i jeden krok cofania.
+        
+        Dokument wysyła jeden contentsChange dla całości, kolorowanie obejmuje
+        od razu tylko widoczne linie (resztę - leniwie przy przewijaniu), a
+        podświetlenia kursora odświeżane są raz, na końcu.
+        """
+        cursor = QTextCursor(self.document())
+        self._batch_depth += 1
+        cursor.beginEditBlock()
+        try:
+            yield cursor
+        finally:
+            self._batch_depth -= 1
+            highlighter = self.highlighter if not self._batch_depth else None
+            if highlighter:
+                first = self.firstVisibleBlock().blockNumber()
+                lines = self.viewport().height() // max(1, self.fontMetrics().height()) + 1
+                highlighter.deferred_range = (first, first + 2 * lines)
+            try:
+                cursor.endEditBlock()
+            finally:
+                if highlighter:
+                    highlighter.deferred_range = None
+            if not self._batch_depth:
+                self._stale_highlight = True
+                self._refresh_stale_highlight()
+                self._highlight_current_line()
+                self.viewport().update()
+    
+    def insertFromMimeData(self, source):
+        """Wklejanie: duży tekst jednym wstawieniem przez insert_bulk"""
+        if source.hasText() and not self.extra_cursors and not self.isReadOnly():
+            text = source.text()
+            if len(text) >= BULK_INSERT_MIN:
+                self.insert_bulk(text)
+                return
+        super().insertFromMimeData(source)
+    
+    @perf_timed("insert_bulk")
+    def insert_bulk(self, text):
+        """Wstaw duży tekst w miejsce zaznaczenia jako jedną edycję (jeden krok cofania).
+        
+        Kolorowanie obejmuje od razu tylko linie na ekranie (batch_edit),
+        resztę - przy przewijaniu; indeksy, lint i symbole liczą się raz, po
+        wstawieniu. Tekst dłuższy niż BULK_INSERT_CHUNK wstawiany jest porcjami
+        z paskiem postępu odrysowywanym bez obiegu pętli zdarzeń - w trakcie
+        edycji zbiorczej nic innego nie może zmienić dokumentu.
+        """
+        text = text.replace("\r\n", "\n")
+        progress = None
+        if len(text) > BULK_INSERT_CHUNK:
+            progress = QProgressDialog(f"Wklejanie {len(text) / 2**20:.0f} MB tekstu...", None, 0, len(text), self)
+            progress.setWindowTitle("Wklejanie")
+            progress.setAutoReset(False)
+            progress.show()
+            QApplication.processEvents(QEventLoop.ProcessEventsFlag.ExcludeUserInputEvents)
+        selection = self.textCursor()
+        with self.batch_edit() as cursor:
+            cursor.setPosition(selection.anchor())
+            cursor.setPosition(selection.position(), QTextCursor.MoveMode.KeepAnchor)
+            for start in range(0, len(text), BULK_INSERT_CHUNK):
+                cursor.insertText(text[start:start + BULK_INSERT_CHUNK])
+                if progress:
+                    progress.setValue(min(len(text), start + BULK_INSERT_CHUNK))
+                    progress.repaint()
+            if progress:
+                progress.setLabelText("Układanie linii...")
+                progress.repaint()
+        if progress:
+            progress.close()
+        self.setTextCursor(cursor)
+        self.ensureCursorVisible()
+    
+    def all_cursors(self):
+        """Główny kursor i dodatkowe, w kolejności w dokumencie"""
+        return sorted([self.textCursor()] + self.extra_cursors, key=QTextCursor.position)
+    
+    def add_cursor(self, position, anchor=None, merge=True):
+        """Dodaj kursor (główny staje się dodatkowym)"""
+        self.extra_cursors.append(self.textCursor())
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(position if anchor is None else anchor)
+        if anchor is not None:
+            cursor.setPosition(position, QTextCursor.MoveMode.KeepAnchor)
+        self.setTextCursor(cursor)
+        if merge:
+            self._merge_cursors()
+    
+    def clear_extra_cursors(self):
+        if self.extra_cursors:
+            self.extra_cursors = []
+            self._highlight_current_line()
+            self.viewport().update()
+    
+    def add_cursor_vertical(self, direction):
+        """Kursor linię nad najwyższym / pod najniższym (Ctrl+Alt+Góra/Dół)"""
+        cursors = [self.textCursor()] + self.extra_cursors
+        edge = (min if direction < 0 else max)(cursors, key=QTextCursor.position)
+        block = edge.block().previous() if direction < 0 else edge.block().next()
+        while block.isValid() and not block.isVisible():
+            block = block.previous() if direction < 0 else block.next()
+        if not block.isValid():
+            return
+        column = min(edge.positionInBlock(), block.length() - 1)
+        # Linia poza skrajnym kursorem - duplikat niemożliwy
+        self.add_cursor(block.position() + column, merge=False)
+    
+    def column_select(self, position):
+        """Zaznaczenie kolumnowe od głównego kursora do pozycji (Alt+Shift+klik)"""
+        doc = self.document()
+        origin = self.textCursor()
+        target = QTextCursor(doc)
+        target.setPosition(position)
+        first, last = sorted((origin.blockNumber(), target.blockNumber()))
+        start_col, end_col = origin.positionInBlock(), target.positionInBlock()
+        cursors = []
+        block = doc.findBlockByNumber(first)
+        for _ in range(last - first + 1):
+            if block.isVisible():
+                length = block.length() - 1
+                cursor = QTextCursor(doc)
+                cursor.setPosition(block.position() + min(start_col, length))
+                cursor.setPosition(block.position() + min(end_col, length), QTextCursor.MoveMode.KeepAnchor)
+                cursors.append(cursor)
+            block = block.next()
+        if not cursors:
+            return
+        primary = cursors.pop() if target.blockNumber() >= origin.blockNumber() else cursors.pop(0)
+        self.extra_cursors = cursors
+        self.setTextCursor(primary)
+        self._highlight_current_line()
+        self.viewport().update()
+    
+    def _merge_cursors(self):
+        """Usuń dodatkowe kursory, które po edycji trafiły w to samo miejsce"""
+        seen = {(self.textCursor().anchor(), self.textCursor().position())}
+        merged = []
+        for cursor in self.extra_cursors:
+            key = (cursor.anchor(), cursor.position())
+            if key not in seen:
+                seen.add(key)
+                merged.append(cursor)
+        self.extra_cursors = merged
+    
+    def _cursor_line_ranges(self):
+        """Scalone zakresy linii (pierwsza, ostatnia) objęte przez wszystkie kursory"""
+        doc = self.document()
+        ranges = []
+        for cursor in self.all_cursors():
+            first = doc.findBlock(cursor.selectionStart())
+            last = doc.findBlock(cursor.selectionEnd())
+            # Zaznaczenie kończące się na początku linii jej nie obejmuje
+            if cursor.hasSelection() and last.position() == cursor.selectionEnd() and last != first:
+                last = last.previous()
+            first, last = first.blockNumber(), last.blockNumber()
+            if ranges and first <= ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], max(last, ranges[-1][1]))
+            else:
+                ranges.append((first, last))
+        return ranges
+    
+    def _lines_text(self, first, last):
+        block = self.document().findBlockByNumber(first)
+        lines = []
+        for _ in range(last - first + 1):
+            lines.append(block.text())
+            block = block.next()
+        return "\n".join(lines)
+    
+    def _transform_lines(self, transform):
+        """Przekształć linie kursorów funkcją lista -> lista (ta sama długość).
+        
+        Każdy zakres podmieniany jest jednym insertText, a kursory wracają w
+        te same linie z kolumnami przesuniętymi o zmianę długości linii.
+        """
+        doc = self.document()
+        cursors = [self.textCursor()] + self.extra_cursors
+        saved = []
+        for cursor in cursors:
+            anchor = doc.findBlock(cursor.anchor())
+            position = doc.findBlock(cursor.position())
+            saved.append((anchor.blockNumber(), cursor.anchor() - anchor.position(),
+                          position.blockNumber(), cursor.position() - position.position()))
+        
+        shifts = {}
+        with self.batch_edit() as edit:
+            for first, last in reversed(self._cursor_line_ranges()):
+                old_lines = self._lines_text(first, last).split("\n")
+                new_lines = transform(old_lines)
+                if new_lines == old_lines:
+                    continue
+                for i, (old, new) in enumerate(zip(old_lines, new_lines)):
+                    shifts[first + i] = len(new) - len(old)
+                end = doc.findBlockByNumber(last)
+                edit.setPosition(doc.findBlockByNumber(first).position())
+                edit.setPosition(end.position() + end.length() - 1, QTextCursor.MoveMode.KeepAnchor)
+                edit.insertText("\n".join(new_lines))
+            
+            def place(line, column):
+                block = doc.findBlockByNumber(line)
+                if column:
+                    column = max(0, column + shifts.get(line, 0))
+                return block.position() + min(column, block.length() - 1)
+            
+            restored = []
+            for cursor, (anchor_line, anchor_col, line, col) in zip(cursors, saved):
+                cursor.setPosition(place(anchor_line, anchor_col))
+                cursor.setPosition(place(line, col), QTextCursor.MoveMode.KeepAnchor)
+                restored.append(cursor)
+        self.setTextCursor(restored[0])
+        self.extra_cursors = restored[1:]
+    
+    MULTI_CURSOR_MOVES = {
+        Qt.Key.Key_Left: QTextCursor.MoveOperation.Left,
+        Qt.Key.Key_Right: QTextCursor.MoveOperation.Right,
+        Qt.Key.Key_Up: QTextCursor.MoveOperation.Up,
+        Qt.Key.Key_Down: QTextCursor.MoveOperation.Down,
+        Qt.Key.Key_Home: QTextCursor.MoveOperation.StartOfBlock,
+        Qt.Key.Key_End: QTextCursor.MoveOperation.EndOfBlock,
+    }
+    
+    def _multi_cursor_key(self, e):
+        """Klawisz dla wszystkich kursorów naraz; False gdy to nie edycja/ruch"""
+        key = e.key()
+        text = e.text()
+        modifiers = e.modifiers()
+        if modifiers & (Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.AltModifier):
+            return False
+        if key == Qt.Key.Key_Escape:
+            self.clear_extra_cursors()
+            return True
+        
+        cursors = [self.textCursor()] + self.extra_cursors
+        if key in self.MULTI_CURSOR_MOVES:
+            mode = (QTextCursor.MoveMode.KeepAnchor if modifiers & Qt.KeyboardModifier.ShiftModifier
+                    else QTextCursor.MoveMode.MoveAnchor)
+            for cursor in cursors:
+                cursor.movePosition(self.MULTI_CURSOR_MOVES[key], mode)
+        elif key in (Qt.Key.Key_Backspace, Qt.Key.Key_Delete, Qt.Key.Key_Return, Qt.Key.Key_Enter, Qt.Key.Key_Tab) \
+                or (text and text.isprintable()):
+            if key == Qt.Key.Key_Tab:
+                text = " " * self.tab_size
+            elif key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+                text = "\n"
+            with self.batch_edit():
+                for cursor in cursors:
+                    if key == Qt.Key.Key_Backspace and not cursor.hasSelection():
+                        cursor.deletePreviousChar()
+                    elif key == Qt.Key.Key_Delete and not cursor.hasSelection():
+                        cursor.deleteChar()
+                    elif key in (Qt.Key.Key_Backspace, Qt.Key.Key_Delete):
+                        cursor.removeSelectedText()
+                    elif text == "\n":
+                        cursor.insertText(text + self.language.newline_indent(cursor.block().text(), self.tab_size))
+                    else:
+                        cursor.insertText(text)
+        else:
+            return False
+        self.setTextCursor(cursors[0])
+        self.extra_cursors = cursors[1:]
+        self._merge_cursors()
+        self._highlight_current_line()
+        self.viewport().update()
+        return True
+    
+    def mousePressEvent(self, e):
+        if e.button() == Qt.MouseButton.LeftButton and e.modifiers() & Qt.KeyboardModifier.AltModifier:
+            position = self.cursorForPosition(e.position().toPoint()).position()
+            if e.modifiers() & Qt.KeyboardModifier.ShiftModifier:
+                self.column_select(position)
+            else:
+                self.add_cursor(position)
+            return
+        self.clear_extra_cursors()
+        super().mousePressEvent(e)
+    
+    def paintEvent(self, e):
+        super().paintEvent(e)
+        if not self.extra_cursors:
+            return
+        painter = QPainter(self.viewport())
+        area = e.rect()
+        for cursor in self.extra_cursors:
+            rect = self.cursorRect(cursor)
+            if rect.intersects(area):
+                painter.fillRect(rect.x(), rect.y(), 2, rect.height(), QColor(self.theme["fg"]))
+    
+    @perf_timed("search")
+    def search(self, text, case_sensitive=False):
+        """Wyszukaj tekst w edytorze"""
+        self.search_text = text
+        self.search_matches = []
+        
         if not text:
             self._highlight_current_line()
             return
@@ -390,60 +3182,230 @@ class AdvancedCodeEditor(QPlainTextEdit):
         
         self._highlight_current_line()
     
+    def set_vcs_marks(self, marks):
+        """Znaczniki zmian względem HEAD (wspólne z widokami podziału)"""
+        self.primary.vcs_marks = marks
+        for editor in [self.primary] + self.primary.views:
+            editor.line_number_area.update()
+    
+    SQUIGGLE_LIMIT = 1000
+    
+    def set_diagnostics(self, diagnostics, source="run"):
+        """Ustaw znaczniki błędów (linia -> diagnostyki) z danego źródła.
+        
+        Źródła ("run" - wyjście uruchomionego programu, "lint" - sprawdzanie
+        w tle) są przechowywane osobno i łączone na marginesie.
+        """
+        self._diagnostic_sources[source] = list(diagnostics)
+        self.diagnostics = {}
+        for diags in self._diagnostic_sources.values():
+            for diag in diags:
+                self.diagnostics.setdefault(diag.line - 1, []).append(diag)
+        for editor in [self] + self.views:
+            editor.diagnostics = self.diagnostics
+            editor._update_squiggles()
+            editor.line_number_area.update()
+    
+    def _update_squiggles(self):
+        """Podkreślenia falką od kolumny diagnostyki do końca słowa (lub linii)"""
+        self._squiggles = []
+        doc = self.document()
+        for line in sorted(self.diagnostics)[:self.SQUIGGLE_LIMIT]:
+            block = doc.findBlockByNumber(line)
+            if not block.isValid():
+                continue
+            text = block.text()
+            indent = len(text) - len(text.lstrip())
+            for diag in self.diagnostics[line]:
+                start = min(max(diag.col - 1, indent), len(text))
+                word = WORD_RE.match(text, start)
+                end = word.end() if word else len(text.rstrip())
+                if end <= start:
+                    start, end = max(0, start - 1), max(end, start)
+                selection = QTextEdit.ExtraSelection()
+                selection.format.setUnderlineStyle(QTextCharFormat.UnderlineStyle.WaveUnderline)
+                selection.format.setUnderlineColor(QColor(self.theme.get(diag.severity, self.theme["warning"])))
+                selection.cursor = QTextCursor(doc)
+                selection.cursor.setPosition(block.position() + start)
+                selection.cursor.setPosition(block.position() + end, QTextCursor.MoveMode.KeepAnchor)
+                self._squiggles.append(selection)
+        self._highlight_current_line()
+    
     # Line numbers
+    NUMBER_CACHE_LIMIT = 4096
+    
+    def add_gutter_lane(self, lane):
+        """Dodaj pas znaczników (lewy - przed numerami, prawy - za nimi)"""
+        self.gutter_lanes.append(lane)
+        self._gutter_digits = 0
+        self.update_line_number_area_width(self.blockCount())
+    
     def line_number_area_width(self):
-        digits = len(str(max(1, self.blockCount())))
-        return 10 + self.fontMetrics().horizontalAdvance('9') * digits
+        return self._gutter_width
     
-    def update_line_number_area_width(self, _):
-        self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+    def update_line_number_area_width(self, block_count):
+        # Szerokość zależy tylko od liczby cyfr - margines zmienia się przy 9 -> 10, 99 -> 100...
+        digits = len(str(max(1, block_count)))
+        if digits == self._gutter_digits:
+            return
+        self._gutter_digits = digits
+        lanes = sum(lane.width for lane in self.gutter_lanes)
+        self._gutter_width = lanes + 10 + self.fontMetrics().horizontalAdvance('9') * digits
+        self.setViewportMargins(self._gutter_width, 0, 0, 0)
+        self.line_number_area.update()
     
     def update_line_number_area(self, rect, dy):
         if dy:
             self.line_number_area.scroll(0, dy)
         else:
             self.line_number_area.update(0, rect.y(), self.line_number_area.width(), rect.height())
-        
-        if rect.contains(self.viewport().rect()):
-            self.update_line_number_area_width(0)
+    
+    def update_gutter_lines(self, first, last):
+        """Odśwież margines tylko dla linii first..last (jeśli są widoczne)"""
+        doc = self.document()
+        top_block = doc.findBlockByNumber(first)
+        bottom_block = doc.findBlockByNumber(last)
+        if not top_block.isValid():
+            return
+        offset = self.contentOffset()
+        top = int(self.blockBoundingGeometry(top_block).translated(offset).top())
+        if bottom_block.isValid():
+            bottom = int(self.blockBoundingGeometry(bottom_block).translated(offset).bottom())
+        else:
+            bottom = self.line_number_area.height()
+        if bottom < 0 or top > self.line_number_area.height():
+            return
+        self.line_number_area.update(0, top, self.line_number_area.width(), bottom - top + 1)
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.FontChange and hasattr(self, "gutter_lanes"):
+            self._gutter_digits = 0
+            self.update_line_number_area_width(self.blockCount())
     
     def resizeEvent(self, event):
         super().resizeEvent(event)
         cr = self.contentsRect()
         self.line_number_area.setGeometry(QRect(cr.left(), cr.top(), self.line_number_area_width(), cr.height()))
     
+    def _lane_rects(self):
+        """Pozycje x pasów: [(lane, x)], x numerów i ich prawa krawędź"""
+        x = 0
+        placed = []
+        for lane in self.gutter_lanes:
+            if lane.side == "left":
+                placed.append((lane, x))
+                x += lane.width
+        right = self._gutter_width - 5 - sum(l.width for l in self.gutter_lanes if l.side != "left")
+        x = right + 5
+        for lane in self.gutter_lanes:
+            if lane.side != "left":
+                placed.append((lane, x))
+                x += lane.width
+        return placed, right
+    
+    def _gutter_hit(self, pos):
+        """(pas lub None, numer linii) dla punktu na marginesie"""
+        line = self.cursorForPosition(QPoint(0, pos.y())).block().blockNumber()
+        placed, _ = self._lane_rects()
+        for lane, x in placed:
+            if x <= pos.x() < x + lane.width:
+                return lane, line
+        return None, line
+    
+    def gutter_tooltip(self, pos):
+        lane, line = self._gutter_hit(pos)
+        if lane:
+            return lane.tooltip(line)
+        return "\n".join(filter(None, (l.tooltip(line) for l in self.gutter_lanes)))
+    
+    def gutter_click(self, pos):
+        lane, line = self._gutter_hit(pos)
+        return bool(lane and lane.clicked(line))
+    
+    def _gutter_paint_style(self):
+        """Czcionki/pióra marginesu - tworzone ponownie tylko po zmianie czcionki lub motywu"""
+        key = (self.font().key(), self.theme["fg"], self.theme["sidebar"])
+        if self._gutter_style is None or self._gutter_style[0] != key:
+            bold = QFont(self.font())
+            bold.setBold(True)
+            self._gutter_style = (key, self.font(), bold, QPen(QColor("#858585")),
+                                  QPen(QColor(self.theme["fg"])), QColor(self.theme["sidebar"]))
+            self._number_cache = {}
+        return self._gutter_style
+    
+    def _line_number_text(self, number, font):
+        """QStaticText z numerem linii - układ glifów liczony raz na numer"""
+        text = QStaticText(str(number))
+        text.setTextFormat(Qt.TextFormat.PlainText)
+        text.prepare(QTransform(), font)
+        return text, math.ceil(text.size().width())
+    
+    @perf_timed("line_number_area_paint_event")
     def line_number_area_paint_event(self, event):
         painter = QPainter(self.line_number_area)
-        painter.fillRect(event.rect(), QColor(self.theme["sidebar"]))
+        _, font, bold_font, pen, current_pen, background = self._gutter_paint_style()
+        dirty = event.rect()
+        painter.fillRect(dirty, background)
         
-        block = self.firstVisibleBlock()
+        # Pierwszy blok odświeżanego obszaru (a nie pierwszy widoczny)
+        block = self.cursorForPosition(QPoint(0, dirty.top())).block()
+        if not block.isVisible():
+            block = self.firstVisibleBlock()
         block_number = block.blockNumber()
         top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
-        bottom = top + int(self.blockBoundingRect(block).height())
-        
-        current_line = self.textCursor().blockNumber()
         
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(block_number + 1)
-                if block_number == current_line:
-                    painter.setPen(QColor(self.theme["fg"]))
-                    font = painter.font()
-                    font.setBold(True)
-                    painter.setFont(font)
-                else:
-                    painter.setPen(QColor("#858585"))
-                    font = painter.font()
-                    font.setBold(False)
-                    painter.setFont(font)
-                
-                painter.drawText(0, top, self.line_number_area.width() - 5, 
-                               self.fontMetrics().height(), Qt.AlignmentFlag.AlignRight, number)
-            
+        # Widoczne linie w obszarze: [(numer bloku, y)]
+        rows = []
+        first, last = dirty.top(), dirty.bottom()
+        collapsed = self.fold_index.collapsed
+        doc = self.document()
+        while block.isValid() and top <= last:
+            height = int(self.blockBoundingRect(block).height())
+            if block.isVisible() and top + height >= first:
+                rows.append((block_number, top))
+            top += height
+            end = collapsed.get(block_number)
+            if end is not None:
+                # Ukryte linie zwiniętego regionu mają zerową wysokość - przeskocz je
+                block_number = end
+                block = doc.findBlockByNumber(end)
             block = block.next()
-            top = bottom
-            bottom = top + int(self.blockBoundingRect(block).height())
             block_number += 1
+        
+        placed, right = self._lane_rects()
+        current_line = self.textCursor().blockNumber()
+        line_height = self.fontMetrics().height()
+        align = Qt.AlignmentFlag.AlignRight
+        
+        # Numer widziany pierwszy raz rysujemy zwykłym drawText (przygotowanie
+        # QStaticText kosztuje więcej niż jedno rysowanie), przy kolejnym
+        # odświeżeniu tej samej linii trafia już do cache
+        cache = self._number_cache
+        if len(cache) > self.NUMBER_CACHE_LIMIT:
+            cache.clear()
+        painter.setFont(font)
+        painter.setPen(pen)
+        for line, y in rows:
+            number = line + 1
+            if line == current_line:
+                painter.setFont(bold_font)
+                painter.setPen(current_pen)
+                painter.drawText(0, y, right, line_height, align, str(number))
+                painter.setFont(font)
+                painter.setPen(pen)
+                continue
+            entry = cache.get(number)
+            if entry:
+                painter.drawStaticText(right - entry[1], y, entry[0])
+            else:
+                painter.drawText(0, y, right, line_height, align, str(number))
+                cache[number] = self._line_number_text(number, font) if number in cache else None
+        
+        for lane, x in placed:
+            painter.save()
+            lane.paint(painter, x, rows, line_height)
+            painter.restore()
 
 # ================== STATUS BAR ==================
 
@@ -497,8 +3459,1833 @@ class SearchWidget(QWidget):
         layout.addWidget(self.next_btn)
         layout.addWidget(self.close_btn)
         
-        self.setLayout(layout)
-        self.hide()
+        self.setLayout(layout)
+        self.hide()
+
+# ================== TERMINAL ==================
+
+class TerminalView(QPlainTextEdit):
+    """Wyjście terminala z klikalnymi lokalizacjami błędów"""
+    location_activated = Signal(str, int, int)
+    
+    def __init__(self):
+        super().__init__()
+        self.setReadOnly(True)
+        self.setMouseTracking(True)
+        self.base_dir = None
+    
+    def _diagnostic_at(self, pos):
+        block = self.cursorForPosition(pos).block()
+        return OutputParser.parse_line(block.text().rstrip("\r"), self.base_dir)
+    
+    def mouseMoveEvent(self, e):
+        super().mouseMoveEvent(e)
+        if self._diagnostic_at(e.position().toPoint()):
+            self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        else:
+            self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
+    
+    def mouseReleaseEvent(self, e):
+        super().mouseReleaseEvent(e)
+        if e.button() == Qt.MouseButton.LeftButton and not self.textCursor().hasSelection():
+            diag = self._diagnostic_at(e.position().toPoint())
+            if diag:
+                self.location_activated.emit(diag.path, diag.line, diag.col)
+
+# ================== INDEKS PLIKÓW ==================
+
+IGNORED_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", ".nox", ".idea", ".vscode"
+}
+
+def _match_score(query, text):
+    """Dopasowanie podciągu od lewej z premią za ciągłość i początki słów"""
+    score = 0
+    run = 0
+    pos = -1
+    prev = -2
+    for ch in query:
+        pos = text.find(ch, pos + 1)
+        if pos < 0:
+            return None
+        run = run + 1 if pos == prev + 1 else 0
+        score += 3 * run
+        if pos == 0 or text[pos - 1] in "/_-. ":
+            score += 8
+        prev = pos
+    return score
+
+def fuzzy_score(query, path):
+    """Wynik dopasowania rozmytego (większy = lepszy) lub None"""
+    lower = path.lower()
+    name = lower[lower.rfind("/") + 1:]
+    score = _match_score(query, name)
+    if score is not None:
+        score += 30
+        pos = name.find(query)
+        if pos == 0:
+            score += 40
+        elif pos > 0:
+            score += 25
+    else:
+        score = _match_score(query, lower)
+        if score is None:
+            return None
+    return score - len(path) * 0.1
+
+def iter_project_dirs(root):
+    """Pliki projektu (ścieżki względne z '/') - lista na każdy katalog.
+    
+    BFS - płytkie (zwykle ważniejsze) pliki są zwracane najpierw; katalogi
+    z IGNORED_DIRS i dowiązania do katalogów są pomijane.
+    """
+    queue = deque([""])
+    while queue:
+        rel_dir = queue.popleft()
+        files = []
+        try:
+            with os.scandir(os.path.join(root, rel_dir)) as entries:
+                for entry in entries:
+                    rel = rel_dir + "/" + entry.name if rel_dir else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in IGNORED_DIRS:
+                                queue.append(rel)
+                            continue
+                    except OSError:
+                        continue
+                    files.append(rel)
+        except OSError:
+            continue
+        yield files
+
+class FileIndex:
+    """Lista plików projektu z szybkim wyszukiwaniem rozmytym.
+    
+    Dla każdego znaku trzymana jest maska bitowa (int) plików, które go
+    zawierają - AND masek daje kandydatów w mikrosekundach, a dokładne
+    ocenianie dotyczy tylko ich niewielkiej części.
+    """
+    SCORE_BUDGET = 0.008
+    MAX_MATCHES = 400
+    
+    def __init__(self):
+        self.reset(None)
+    
+    def reset(self, root):
+        self.root = root
+        self.paths = []
+        self.lookup = {}
+        self.dir_files = {}
+        self.bits = {}
+        self.complete = False
+    
+    @staticmethod
+    def batch_bits(batch):
+        """Maski znaków dla partii ścieżek (liczone w wątku indeksującym)"""
+        size = (len(batch) + 7) // 8
+        arrays = {}
+        for i, path in enumerate(batch):
+            byte, bit = i >> 3, 1 << (i & 7)
+            for ch in set(path.lower()):
+                arr = arrays.get(ch)
+                if arr is None:
+                    arr = arrays[ch] = bytearray(size)
+                arr[byte] |= bit
+        return {ch: int.from_bytes(arr, "little") for ch, arr in arrays.items()}
+    
+    def merge(self, batch, bits):
+        """Dołącz partię plików z wątku indeksującego"""
+        offset = len(self.paths)
+        for i, path in enumerate(batch):
+            self.lookup[path] = offset + i
+            folder, _, name = path.rpartition("/")
+            self.dir_files.setdefault(folder, set()).add(name)
+        self.paths.extend(batch)
+        for ch, mask in bits.items():
+            self.bits[ch] = self.bits.get(ch, 0) | (mask << offset)
+    
+    def add_path(self, rel):
+        if rel in self.lookup:
+            return
+        i = len(self.paths)
+        self.paths.append(rel)
+        self.lookup[rel] = i
+        folder, _, name = rel.rpartition("/")
+        self.dir_files.setdefault(folder, set()).add(name)
+        for ch in set(rel.lower()):
+            self.bits[ch] = self.bits.get(ch, 0) | (1 << i)
+    
+    def remove_path(self, rel):
+        self.remove_paths([rel])
+    
+    def remove_paths(self, rels):
+        """Usuń pliki - jedna operacja na maskę znaku dla całej grupy"""
+        size = (len(self.paths) + 7) // 8
+        arrays = {}
+        for rel in rels:
+            i = self.lookup.pop(rel, None)
+            if i is None:
+                continue
+            self.paths[i] = None
+            folder, _, name = rel.rpartition("/")
+            self.dir_files.get(folder, set()).discard(name)
+            for ch in set(rel.lower()):
+                arr = arrays.get(ch)
+                if arr is None:
+                    arr = arrays[ch] = bytearray(size)
+                arr[i >> 3] |= 1 << (i & 7)
+        for ch, arr in arrays.items():
+            self.bits[ch] &= ~int.from_bytes(arr, "little")
+    
+    def sync_directory(self, rel_dir, names):
+        """Uzgodnij pliki jednego katalogu z listą z dysku (bez rekurencji)"""
+        known = self.dir_files.get(rel_dir, set())
+        prefix = rel_dir + "/" if rel_dir else ""
+        removed = [prefix + name for name in known - names]
+        if removed:
+            self.remove_paths(removed)
+        added = [prefix + name for name in names - known if prefix + name not in self.lookup]
+        if added:
+            self.merge(added, self.batch_bits(added))
+    
+    def relative(self, path):
+        """Ścieżka względem katalogu projektu (z '/') lub None"""
+        if not self.root or not path:
+            return None
+        rel = os.path.relpath(path, self.root)
+        if rel.startswith(".."):
+            return None
+        return rel.replace(os.sep, "/")
+    
+    def _candidates(self, query):
+        """Indeksy plików zawierających wszystkie znaki zapytania (rosnąco)"""
+        mask = -1
+        for ch in set(query):
+            mask &= self.bits.get(ch, 0)
+            if not mask:
+                return
+        if mask < 0:
+            return
+        raw = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        for m in re.finditer(b"[^\x00]", raw):
+            byte = raw[m.start()]
+            base = m.start() * 8
+            while byte:
+                low = byte & -byte
+                yield base + low.bit_length() - 1
+                byte ^= low
+    
+    def query(self, text, limit=50, recent=()):
+        """Najlepsze dopasowania; pliki z `recent` (względne) mają premię"""
+        q = text.lower().replace(" ", "").replace("\\", "/")
+        recent = [p for p in recent if p in self.lookup]
+        if not q:
+            results = recent[:limit]
+            for path in self.paths:
+                if len(results) >= limit:
+                    break
+                if path is not None and path not in results:
+                    results.append(path)
+            return results
+        
+        matches = {}
+        for rank, path in enumerate(recent):
+            score = fuzzy_score(q, path)
+            if score is not None:
+                matches[path] = score + max(5, 40 - rank * 2)
+        
+        deadline = time.perf_counter() + self.SCORE_BUDGET
+        for n, i in enumerate(self._candidates(q)):
+            path = self.paths[i]
+            if path is not None and path not in matches:
+                score = fuzzy_score(q, path)
+                if score is not None:
+                    matches[path] = score
+                    if len(matches) >= self.MAX_MATCHES:
+                        break
+            if n & 255 == 255 and time.perf_counter() > deadline:
+                break
+        return heapq.nlargest(limit, matches, key=matches.get)
+
+class FileIndexer(QThread):
+    """Przechodzi drzewo katalogów w tle i wysyła partie ścieżek"""
+    batch_ready = Signal(int, object, object)
+    indexing_finished = Signal(int)
+    BATCH_SIZE = 5000
+    
+    def __init__(self, root, generation):
+        super().__init__()
+        self.root = root
+        self.generation = generation
+    
+    def _emit(self, batch):
+        self.batch_ready.emit(self.generation, batch, FileIndex.batch_bits(batch))
+    
+    def run(self):
+        batch = []
+        for files in iter_project_dirs(self.root):
+            if self.isInterruptionRequested():
+                return
+            batch.extend(files)
+            if len(batch) >= self.BATCH_SIZE:
+                self._emit(batch)
+                batch = []
+        if batch:
+            self._emit(batch)
+        self.indexing_finished.emit(self.generation)
+
+class QuickOpenDialog(QDialog):
+    """Okno szybkiego wyboru z filtrem (pliki, symbole)"""
+    def __init__(self, parent, provider, placeholder="Szukaj..."):
+        super().__init__(parent, Qt.WindowType.Popup)
+        self.provider = provider
+        self.selected = None
+        
+        layout = QVBoxLayout()
+        layout.setContentsMargins(4, 4, 4, 4)
+        self.input = QLineEdit()
+        self.input.setPlaceholderText(placeholder)
+        self.list = QListWidget()
+        layout.addWidget(self.input)
+        layout.addWidget(self.list)
+        self.setLayout(layout)
+        
+        self.input.textChanged.connect(self._refresh)
+        self.input.installEventFilter(self)
+        self.list.itemActivated.connect(self._accept_item)
+        
+        if parent:
+            width = min(700, parent.width() - 40)
+            self.resize(width, 400)
+            top_left = parent.mapToGlobal(QPoint((parent.width() - width) // 2, 60))
+            self.move(top_left)
+        self._refresh()
+    
+    def _refresh(self):
+        self.list.clear()
+        for label, detail, payload in self.provider(self.input.text()):
+            item = QListWidgetItem(f"{label}    {detail}" if detail else label)
+            item.setData(Qt.ItemDataRole.UserRole, payload)
+            self.list.addItem(item)
+        if self.list.count():
+            self.list.setCurrentRow(0)
+    
+    def _accept_item(self, item):
+        if item:
+            self.selected = item.data(Qt.ItemDataRole.UserRole)
+            self.accept()
+    
+    def eventFilter(self, obj, event):
+        if obj is self.input and event.type() == QEvent.Type.KeyPress:
+            key = event.key()
+            if key in (Qt.Key.Key_Up, Qt.Key.Key_Down, Qt.Key.Key_PageUp, Qt.Key.Key_PageDown):
+                QApplication.sendEvent(self.list, event)
+                return True
+            if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+                self._accept_item(self.list.currentItem())
+                return True
+        return super().eventFilter(obj, event)
+
+# ================== SYMBOLE ==================
+
+def _python_symbols(text):
+    """Klasy i funkcje z drzewa ast: (nazwa, rodzaj, linia, głębokość, rodzic)"""
+    symbols = []
+    
+    def visit(node, depth, parent, in_class):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                symbols.append((child.name, "class", child.lineno, depth, parent))
+                visit(child, depth + 1, child.name, True)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if in_class else "function"
+                symbols.append((child.name, kind, child.lineno, depth, parent))
+                visit(child, depth + 1, child.name, False)
+    
+    visit(ast.parse(text), 0, "", False)
+    return symbols
+
+DECLARATION_KEYWORDS = {
+    "function": "function", "func": "function", "fn": "function", "def": "function",
+    "class": "class", "struct": "class", "interface": "class", "enum": "class",
+    "trait": "class", "type": "class"
+}
+
+def _token_symbols(text, lexer):
+    """Symbole z tokenów pygments Name.Function / Name.Class.
+    
+    Część lekserów (np. JavaScript, Go) oznacza nazwy definicji jako
+    Name.Other - wtedy decyduje poprzedzające słowo kluczowe deklaracji.
+    """
+    symbols = []
+    line = 1
+    declared = None
+    for token, content in lex(text, lexer):
+        if token in Token.Name.Class:
+            symbols.append((content, "class", line, 0, ""))
+            declared = None
+        elif token in Token.Name.Function:
+            symbols.append((content, "function", line, 0, ""))
+            declared = None
+        elif token in Token.Keyword:
+            declared = DECLARATION_KEYWORDS.get(content)
+        elif declared and token in Token.Name:
+            symbols.append((content, declared, line, 0, ""))
+            declared = None
+        elif declared and content.strip():
+            declared = None
+        line += content.count("\n")
+    return symbols
+
+def extract_symbols(text, path, lexer):
+    """Symbole pliku; None gdy nie da się sparsować (np. w trakcie pisania).
+    
+    Duży tekst Pythona przechodzi przez lekser: ast.parse trzyma GIL przez
+    całe parsowanie i wątek GUI stałby na ten czas (kilka sekund przy 10 MB).
+    """
+    try:
+        if path and path.lower().endswith((".py", ".pyw")) and (len(text) <= SYMBOL_MAX_FILE_SIZE or not lexer):
+            return _python_symbols(text)
+        if lexer:
+            return _token_symbols(text, lexer)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+    return []
+
+class SymbolSignals(QObject):
+    done = Signal(object, int, object)
+
+class SymbolWorker(QRunnable):
+    """Parsowanie symboli jednego dokumentu w puli wątków"""
+    def __init__(self, key, revision, text, path, lexer, signals):
+        super().__init__()
+        self.key = key
+        self.revision = revision
+        self.text = text
+        self.path = path
+        self.lexer = lexer
+        self.signals = signals
+    
+    def run(self):
+        self.signals.done.emit(self.key, self.revision,
+                               extract_symbols(self.text, self.path, self.lexer))
+
+class SymbolIndex(QObject):
+    """Symbole otwartych dokumentów, odświeżane w tle po edycji"""
+    symbols_updated = Signal(object)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.editors = {}
+        self._dirty = set()
+        self.signals = SymbolSignals()
+        self.signals.done.connect(self._on_done)
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(400)
+        self.timer.timeout.connect(self._flush)
+    
+    def register(self, editor):
+        self.editors[id(editor)] = editor
+        editor.textChanged.connect(lambda: self.schedule(editor))
+        self._dirty.add(id(editor))
+        self.timer.start(0)
+    
+    def unregister(self, editor):
+        self.editors.pop(id(editor), None)
+        self._dirty.discard(id(editor))
+    
+    def schedule(self, editor):
+        if id(editor) in self.editors:
+            self._dirty.add(id(editor))
+            self.timer.start()
+    
+    def _flush(self):
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            editor = self.editors.get(key)
+            if editor is None:
+                continue
+            editor.symbol_revision += 1
+            lexer = editor.highlighter.lexer if editor.highlighter else None
+            worker = SymbolWorker(key, editor.symbol_revision, editor.toPlainText(),
+                                  editor.path, lexer, self.signals)
+            QThreadPool.globalInstance().start(worker)
+    
+    def _on_done(self, key, revision, symbols):
+        editor = self.editors.get(key)
+        # Wynik dla starszej wersji tekstu lub błąd składni - zostaw poprzednie
+        if editor is None or revision != editor.symbol_revision or symbols is None:
+            return
+        editor.symbols = symbols
+        self.symbols_updated.emit(editor)
+
+SYMBOL_MAX_FILE_SIZE = 1024 * 1024
+
+def symbol_cache_path(root):
+    """Plik pamięci podręcznej symboli projektu w ~/.onecode_cache"""
+    digest = hashlib.sha1(_norm_path(root).encode("utf-8")).hexdigest()[:16]
+    return Path.home() / ".onecode_cache" / "symbols" / f"{digest}.json"
+
+def symbol_entry(full, rel, lexer, cached=None):
+    """Wpis indeksu [mtime_ns, rozmiar, symbole] jednego pliku.
+    
+    Zwraca cached bez czytania pliku, gdy czas modyfikacji i rozmiar się
+    zgadzają; None dla plików pominiętych (brak leksera, za duże, błąd odczytu).
+    """
+    if not lexer and not rel.lower().endswith((".py", ".pyw")):
+        return None
+    try:
+        st = os.stat(full)
+    except OSError:
+        return None
+    if st.st_size > SYMBOL_MAX_FILE_SIZE:
+        return None
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached
+    try:
+        with open(full, 'r', encoding='utf-8', errors='ignore') as f:
+            symbols = extract_symbols(f.read(), rel, lexer)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size, symbols or []]
+
+def write_symbol_cache(root, files):
+    path = symbol_cache_path(root)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(files, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+class ProjectSymbolWorker(QRunnable):
+    """Indeksuje symbole całego projektu, korzystając z pamięci podręcznej na dysku"""
+    def __init__(self, root, paths, cached, lexer_for, signals):
+        super().__init__()
+        self.root = root
+        self.paths = paths
+        self.cached = cached
+        self.lexer_for = lexer_for
+        self.signals = signals
+        self.cancelled = False
+    
+    def run(self):
+        files = {}
+        lexers = {}
+        for rel in self.paths:
+            if self.cancelled:
+                return
+            ext = os.path.splitext(rel)[1].lower()
+            if ext not in lexers:
+                lexers[ext] = self.lexer_for(rel)
+            entry = symbol_entry(os.path.join(self.root, rel), rel, lexers[ext], self.cached.get(rel))
+            if entry:
+                files[rel] = entry
+        if not self.cancelled:
+            self.signals.done.emit(self.root, 0, files)
+
+class ProjectSymbolIndex(QObject):
+    """Symbole całego projektu (nazwa -> lokalizacje), zapisywane w ~/.onecode_cache"""
+    ready = Signal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = None
+        self.files = {}
+        self.by_name = {}
+        self.signals = SymbolSignals()
+        self.signals.done.connect(self._on_done)
+        self._worker = None
+    
+    def cancel(self):
+        if self._worker:
+            self._worker.cancelled = True
+            self._worker = None
+    
+    def build(self, root, paths, lexer_for):
+        """Załaduj cache i w tle przeindeksuj tylko zmienione pliki"""
+        self.cancel()
+        if root != self.root:
+            self.root = root
+            self.files = {}
+            try:
+                with open(symbol_cache_path(root), 'r', encoding='utf-8') as f:
+                    self.files = json.load(f)
+            except (OSError, ValueError):
+                pass
+            self._rebuild_names()
+        self._worker = ProjectSymbolWorker(root, paths, dict(self.files), lexer_for, self.signals)
+        QThreadPool.globalInstance().start(self._worker)
+    
+    def _on_done(self, root, _, files):
+        if root != self.root:
+            return
+        self._worker = None
+        self.files = files
+        self._rebuild_names()
+        self._save()
+        self.ready.emit()
+    
+    def _rebuild_names(self):
+        self.by_name = {}
+        for rel, (_, _, symbols) in self.files.items():
+            for name, kind, line, depth, parent in symbols:
+                self.by_name.setdefault(name, []).append((rel, line, kind, parent))
+    
+    def _save(self):
+        write_symbol_cache(self.root, self.files)
+    
+    def update_file(self, path, symbols):
+        """Aktualizacja jednego pliku (po zapisie), bez pełnego przebudowania"""
+        if not self.root or symbols is None:
+            return
+        rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+        if rel.startswith(".."):
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        old = self.files.get(rel)
+        if old:
+            for name, kind, line, depth, parent in old[2]:
+                locations = self.by_name.get(name, [])
+                locations[:] = [loc for loc in locations if loc[0] != rel]
+        self.files[rel] = [st.st_mtime_ns, st.st_size, [list(s) for s in symbols]]
+        for name, kind, line, depth, parent in symbols:
+            self.by_name.setdefault(name, []).append((rel, line, kind, parent))
+    
+    def lookup(self, name):
+        return [(os.path.join(self.root, rel), line, kind, parent)
+                for rel, line, kind, parent in self.by_name.get(name, [])]
+    
+    def search(self, text, limit=50):
+        q = text.lower().replace(" ", "")
+        if not q:
+            return []
+        scored = []
+        for name, locations in self.by_name.items():
+            score = _match_score(q, name.lower())
+            if score is not None:
+                scored.append((score - len(name) * 0.1, name))
+        results = []
+        for _, name in heapq.nlargest(limit, scored):
+            results.extend((name,) + loc for loc in self.lookup(name))
+        return results[:limit]
+
+# ================== DOKUMENTY ==================
+
+class DocumentRegistry:
+    """Otwarte dokumenty: ścieżka -> edytor i karta -> edytor.
+    
+    Zastępuje przeszukiwanie kart przez findChild - znalezienie otwartego
+    pliku czy edytora karty to jedno odwołanie do słownika. Stan zmian
+    i rewizja pochodzą z dokumentu edytora (isModified/revision), więc nie
+    trzeba ich synchronizować.
+    """
+    def __init__(self):
+        self.by_path = {}
+        self.by_container = {}
+        self.containers = {}
+    
+    def add(self, editor, container):
+        self.by_container[container] = editor
+        self.containers[editor] = container
+        if editor.path:
+            self.by_path[_norm_path(editor.path)] = editor
+    
+    def remove(self, editor):
+        container = self.containers.pop(editor, None)
+        self.by_container.pop(container, None)
+        if editor.path and self.by_path.get(_norm_path(editor.path)) is editor:
+            del self.by_path[_norm_path(editor.path)]
+    
+    def rename(self, editor, old_path):
+        if old_path and self.by_path.get(_norm_path(old_path)) is editor:
+            del self.by_path[_norm_path(old_path)]
+        if editor.path:
+            self.by_path[_norm_path(editor.path)] = editor
+    
+    def find(self, path):
+        return self.by_path.get(_norm_path(path)) if path else None
+    
+    def editor_for(self, container):
+        return self.by_container.get(container)
+    
+    def container(self, editor):
+        return self.containers.get(editor)
+    
+    def editors(self):
+        """Edytory główne - każdy dokument raz"""
+        return list(self.by_container.values())
+    
+    def views(self):
+        """Wszystkie widoki, łącznie z widokami podziału"""
+        for editor in self.by_container.values():
+            yield editor
+            yield from editor.views
+    
+    def modified(self):
+        return [editor for editor in self.by_container.values() if editor.is_modified]
+    
+    def revision(self, path):
+        """Rewizja dokumentu otwartego pliku (None gdy nie jest otwarty)"""
+        editor = self.find(path)
+        return editor.document().revision() if editor else None
+
+# ================== FORMATOWANIE ==================
+
+FORMAT_TIMEOUT = 10
+
+def _format_with(tool, text, path):
+    """Sformatuj tekst jednym narzędziem; ImportError/FileNotFoundError gdy niedostępne"""
+    if tool == "black":
+        import black
+        try:
+            return black.format_str(text, mode=black.Mode())
+        except black.NothingChanged:
+            return text
+    commands = {
+        "ruff": ["ruff", "format", "--stdin-filename", path, "-"],
+        "clang-format": ["clang-format", f"--assume-filename={path}"],
+    }
+    result = subprocess.run(commands[tool], input=text.encode("utf-8"),
+                            capture_output=True, timeout=FORMAT_TIMEOUT)
+    if result.returncode != 0:
+        raise ValueError(result.stderr.decode(errors="ignore").strip() or f"kod wyjścia {result.returncode}")
+    return result.stdout.decode("utf-8")
+
+def format_text(tools, text, path, unavailable):
+    """Sformatuj pierwszym dostępnym narzędziem -> (tekst, None) albo (None, błąd).
+    
+    Niedostępne narzędzia trafiają do zbioru unavailable, więc kolejne pliki
+    nie próbują ich ponownie.
+    """
+    for tool in tools:
+        if tool in unavailable:
+            continue
+        try:
+            return _format_with(tool, text, path), None
+        except (ImportError, FileNotFoundError):
+            unavailable.add(tool)
+        except Exception as e:
+            return None, f"{tool}: {str(e).splitlines()[0] if str(e) else type(e).__name__}"
+    return None, "brak formatera: " + ", ".join(tools)
+
+def format_worker_main():
+    """Proces formatujący: żądania i odpowiedzi JSON, po jednym w linii.
+    
+    Żądanie: {"id", "tools", "path", "text"}; odpowiedź: {"id", "text"} albo
+    {"id", "error"}. Proces żyje przez całą sesję, więc black importowany
+    jest raz, a nie przy każdym zapisie.
+    """
+    unavailable = set()
+    try:
+        import black
+    except ImportError:
+        unavailable.add("black")
+    for line in sys.stdin:
+        request = json.loads(line)
+        text, error = format_text(request["tools"], request["text"], request["path"], unavailable)
+        reply = {"id": request["id"]}
+        reply.update({"text": text} if error is None else {"error": error})
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+    return 0
+
+class FormatterWorker(QObject):
+    """Klient długo działającego procesu formatującego (main.py --format-worker).
+    
+    Bufory wysyłane są przez stdin bez czekania na poprzednie odpowiedzi, więc
+    zapis wszystkich kart kosztuje jedno opóźnienie, a nie po jednym na plik.
+    """
+    TIMEOUT = FORMAT_TIMEOUT * 1000
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process = None
+        self._next_id = 0
+        self._buffer = b""
+        self._replies = {}
+    
+    def start(self):
+        """Uruchom proces (bez czekania) - np. przy otwarciu pierwszego pliku do formatowania"""
+        if self.process and self.process.state() != QProcess.ProcessState.NotRunning:
+            return
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.ForwardedErrorChannel)
+        self._buffer = b""
+        self._replies = {}
+        if getattr(sys, "frozen", False):
+            self.process.start(sys.executable, ["--format-worker"])
+        else:
+            self.process.start(sys.executable, [os.path.abspath(__file__), "--format-worker"])
+    
+    def format_many(self, jobs):
+        """[(narzędzia, ścieżka, tekst)] -> [(tekst albo None, błąd)]"""
+        self.start()
+        if not self.process.waitForStarted(self.TIMEOUT):
+            return [(None, "nie można uruchomić procesu formatowania")] * len(jobs)
+        ids = []
+        for tools, path, text in jobs:
+            self._next_id += 1
+            ids.append(self._next_id)
+            request = {"id": self._next_id, "tools": list(tools), "path": path, "text": text}
+            self.process.write((json.dumps(request) + "\n").encode())
+        # Limit czasu liczony od ostatniej odpowiedzi
+        while any(i not in self._replies for i in ids):
+            if not self.process.waitForReadyRead(self.TIMEOUT):
+                self.process.kill()
+                self.process.waitForFinished(1000)
+                break
+            self._read()
+        results = []
+        for i in ids:
+            reply = self._replies.pop(i, {"error": "przekroczono limit czasu formatowania"})
+            results.append((reply.get("text"), reply.get("error")))
+        return results
+    
+    def _read(self):
+        data = self._buffer + self.process.readAllStandardOutput().data()
+        *lines, self._buffer = data.split(b"\n")
+        for line in lines:
+            if line.strip():
+                reply = json.loads(line)
+                self._replies[reply["id"]] = reply
+    
+    def shutdown(self):
+        if self.process and self.process.state() != QProcess.ProcessState.NotRunning:
+            self.process.closeWriteChannel()
+            if not self.process.waitForFinished(1000):
+                self.process.kill()
+
+# ================== PORÓWNANIE ==================
+
+class DiffSignals(QObject):
+    hunks = Signal(int, object, int)
+    failed = Signal(int, str)
+
+class DiffWorker(QRunnable):
+    """Różnice linii w puli wątków, wysyłane partiami do widoku"""
+    BATCH = 500
+    
+    def __init__(self, generation, left, right, signals):
+        super().__init__()
+        self.generation = generation
+        self.left = left
+        self.right = right
+        self.signals = signals
+        self.cancelled = False
+    
+    def run(self):
+        try:
+            hunks = line_opcodes(self.left.split("\n"), self.right.split("\n"))
+        except RecursionError as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        for start in range(0, max(1, len(hunks)), self.BATCH):
+            if self.cancelled:
+                return
+            self.signals.hunks.emit(self.generation, hunks[start:start + self.BATCH], len(hunks))
+
+class DiffView(QWidget):
+    """Porównanie dwóch tekstów obok siebie.
+    
+    Różnice liczy DiffWorker poza wątkiem GUI; fragmenty dochodzą partiami.
+    Obie strony to edytory tylko do odczytu z leniwym kolorowaniem składni,
+    przewijane razem przez odwzorowanie linii między fragmentami. Tła zmian
+    i różnice wewnątrz linii powstają tylko dla fragmentów na ekranie.
+    """
+    INTRALINE_LIMIT = 2000
+    
+    def __init__(self, left_text, right_text, left_title, right_title,
+                 path=None, config=None, theme=None):
+        super().__init__()
+        self.theme = theme or Theme.DARK
+        self.hunks = []
+        self._left_starts = []
+        self._right_starts = []
+        self._intraline = {}
+        self._syncing = False
+        self.current_hunk = None
+        self.generation = 0
+        self.worker = None
+        
+        header = QHBoxLayout()
+        header.setContentsMargins(6, 2, 6, 2)
+        self.left_label = QLabel(left_title)
+        self.right_label = QLabel(right_title)
+        self.summary = QLabel("Porównywanie...")
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)
+        self.progress.setMaximumWidth(160)
+        self.progress.setTextVisible(False)
+        prev_btn = QPushButton("▲")
+        prev_btn.setToolTip("Poprzednia zmiana (Shift+F7)")
+        prev_btn.clicked.connect(lambda: self.goto_hunk(-1))
+        next_btn = QPushButton("▼")
+        next_btn.setToolTip("Następna zmiana (F7)")
+        next_btn.clicked.connect(lambda: self.goto_hunk(1))
+        header.addWidget(self.left_label, 1)
+        header.addWidget(self.summary)
+        header.addWidget(self.progress)
+        header.addWidget(prev_btn)
+        header.addWidget(next_btn)
+        header.addWidget(self.right_label, 1)
+        
+        self.left = self._make_editor(left_text, path, config)
+        self.right = self._make_editor(right_text, path, config)
+        lexer = self.left.language.lexer()
+        self.highlighter = AdvancedHighlighter(None, lexer, self.theme) if lexer else None
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.left)
+        splitter.addWidget(self.right)
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addLayout(header)
+        layout.addWidget(splitter)
+        
+        for shortcut, step in (("F7", 1), ("Shift+F7", -1)):
+            action = QShortcut(QKeySequence(shortcut), self)
+            action.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+            action.activated.connect(lambda step=step: self.goto_hunk(step))
+        
+        self.left.verticalScrollBar().valueChanged.connect(lambda: self._sync(self.left, self.right))
+        self.right.verticalScrollBar().valueChanged.connect(lambda: self._sync(self.right, self.left))
+        self.left.horizontalScrollBar().valueChanged.connect(self.right.horizontalScrollBar().setValue)
+        self.right.horizontalScrollBar().valueChanged.connect(self.left.horizontalScrollBar().setValue)
+        
+        self.signals = DiffSignals()
+        self.signals.hunks.connect(self._on_hunks)
+        self.signals.failed.connect(self._on_failed)
+        self.start(left_text, right_text)
+    
+    def _make_editor(self, text, path, config):
+        editor = AdvancedCodeEditor(path, config, self.theme, minimap=False)
+        editor.setPlainText(text)
+        editor.setReadOnly(True)
+        editor.undo_history.discard()
+        editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        # Kolorowanie tylko bloków na ekranie (highlighter niepodpięty do dokumentu)
+        editor.formatted_blocks = set()
+        return editor
+    
+    def start(self, left_text, right_text):
+        self.cancel()
+        self.generation += 1
+        self.hunks = []
+        self._left_starts = []
+        self._right_starts = []
+        self._intraline = {}
+        self.current_hunk = None
+        self.worker = DiffWorker(self.generation, left_text, right_text, self.signals)
+        QThreadPool.globalInstance().start(self.worker)
+    
+    def cancel(self):
+        if self.worker:
+            self.worker.cancelled = True
+            self.worker = None
+    
+    def _on_hunks(self, generation, batch, total):
+        if generation != self.generation:
+            return
+        for hunk in batch:
+            self.hunks.append(hunk)
+            self._left_starts.append(hunk[1])
+            self._right_starts.append(hunk[3])
+        self.progress.setRange(0, max(1, total))
+        self.progress.setValue(len(self.hunks))
+        if len(self.hunks) >= total:
+            self.progress.hide()
+            self.worker = None
+            self.summary.setText(f"Zmian: {total}" if total else "Brak różnic")
+        else:
+            self.summary.setText(f"Zmian: {len(self.hunks)}/{total}")
+        self._sync(self.left, self.right)
+    
+    def _on_failed(self, generation, error):
+        if generation == self.generation:
+            self.progress.hide()
+            self.worker = None
+            self.summary.setText(f"Błąd porównania: {error}")
+    
+    def map_line(self, line, from_left):
+        """Linia drugiej strony odpowiadająca linii line"""
+        starts = self._left_starts if from_left else self._right_starts
+        k = bisect_right(starts, line) - 1
+        if k < 0:
+            return line
+        tag, i1, i2, j1, j2 = self.hunks[k]
+        if not from_left:
+            i1, i2, j1, j2 = j1, j2, i1, i2
+        if line < i2:
+            return j1 + min(line - i1, max(0, j2 - j1 - 1))
+        return j2 + line - i2
+    
+    def _sync(self, source, target):
+        if self._syncing:
+            return
+        self._syncing = True
+        try:
+            line = self.map_line(source.verticalScrollBar().value(), source is self.left)
+            target.verticalScrollBar().setValue(line)
+        finally:
+            self._syncing = False
+        self._update_marks()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_marks()
+    
+    def goto_hunk(self, step):
+        """Przewiń do następnej (step=1) lub poprzedniej (step=-1) zmiany"""
+        if not self.hunks:
+            return
+        if self.current_hunk is None:
+            k = bisect_left(self._left_starts, self.left.verticalScrollBar().value())
+        else:
+            k = self.current_hunk + step
+        k = self.current_hunk = max(0, min(k, len(self.hunks) - 1))
+        self.left.verticalScrollBar().setValue(max(0, self.hunks[k][1] - 3))
+        self.right.verticalScrollBar().setValue(max(0, self.hunks[k][3] - 3))
+        self.summary.setText(f"Zmiana {k + 1} z {len(self.hunks)}")
+    
+    def _visible_lines(self, editor):
+        top = editor.firstVisibleBlock().blockNumber()
+        return top, top + editor.viewport().height() // max(1, editor.fontMetrics().height()) + 1
+    
+    def _highlight_visible(self, editor):
+        if self.highlighter is None:
+            return
+        top, bottom = self._visible_lines(editor)
+        block = editor.document().findBlockByNumber(top)
+        while block.isValid() and block.blockNumber() <= bottom:
+            if block.blockNumber() not in editor.formatted_blocks:
+                self.highlighter.format_block(block)
+                editor.formatted_blocks.add(block.blockNumber())
+            block = block.next()
+    
+    def _visible_hunks(self, editor, starts, side):
+        top, bottom = self._visible_lines(editor)
+        k = max(0, bisect_right(starts, top) - 1)
+        while k < len(self.hunks):
+            hunk = self.hunks[k]
+            first, last = hunk[1 + side], hunk[2 + side]
+            if first > bottom:
+                break
+            if last > top:
+                yield k, hunk, max(first, top), min(last, bottom + 1)
+            k += 1
+    
+    def _update_marks(self):
+        for editor, starts, side in ((self.left, self._left_starts, 0),
+                                     (self.right, self._right_starts, 2)):
+            line_color = QColor(self.theme["diff_removed" if side == 0 else "diff_added"])
+            text_color = QColor(self.theme["diff_removed_text" if side == 0 else "diff_added_text"])
+            self._highlight_visible(editor)
+            doc = editor.document()
+            marks = []
+            for k, hunk, first, last in self._visible_hunks(editor, starts, side):
+                for line in range(first, last):
+                    block = doc.findBlockByNumber(line)
+                    selection = QTextEdit.ExtraSelection()
+                    selection.format.setBackground(line_color)
+                    selection.format.setProperty(QTextFormat.Property.FullWidthSelection, True)
+                    selection.cursor = QTextCursor(block)
+                    marks.append(selection)
+                    if hunk[0] != "replace":
+                        continue
+                    for start, end in self._intraline_ranges(k, line - hunk[1 + side], side):
+                        selection = QTextEdit.ExtraSelection()
+                        selection.format.setBackground(text_color)
+                        selection.cursor = QTextCursor(block)
+                        selection.cursor.setPosition(block.position() + start)
+                        selection.cursor.setPosition(block.position() + end, QTextCursor.MoveMode.KeepAnchor)
+                        marks.append(selection)
+            editor.line_marks = marks
+            editor._highlight_current_line()
+    
+    def _intraline_ranges(self, k, offset, side):
+        """Zmienione znaki linii offset fragmentu k (liczone raz, przy pierwszym pokazaniu)"""
+        key = (k, offset)
+        if key not in self._intraline:
+            tag, i1, i2, j1, j2 = self.hunks[k]
+            ranges = ([], [])
+            if offset < min(i2 - i1, j2 - j1):
+                a = self.left.document().findBlockByNumber(i1 + offset).text()
+                b = self.right.document().findBlockByNumber(j1 + offset).text()
+                if len(a) + len(b) <= self.INTRALINE_LIMIT:
+                    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+                    for op, x1, x2, y1, y2 in matcher.get_opcodes():
+                        if op != "equal":
+                            if x2 > x1:
+                                ranges[0].append((x1, x2))
+                            if y2 > y1:
+                                ranges[1].append((y1, y2))
+            self._intraline[key] = ranges
+        return self._intraline[key][side // 2]
+    
+    def set_theme(self, theme):
+        self.theme = theme
+        self.left.set_theme(theme)
+        self.right.set_theme(theme)
+        if self.highlighter:
+            self.highlighter.set_theme(theme)
+        self.left.formatted_blocks.clear()
+        self.right.formatted_blocks.clear()
+        self._update_marks()
+
+# ================== GIT ==================
+
+GIT_TIMEOUT = 15
+
+def _git(cwd, *args, input=None):
+    return subprocess.run(["git", "-C", cwd, *args], input=input, capture_output=True,
+                          timeout=GIT_TIMEOUT, check=True).stdout
+
+def parse_porcelain(data, top):
+    """git status --porcelain -z -> {ścieżka: litera statusu}"""
+    statuses = {}
+    entries = data.split(b"\0")
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if len(entry) < 4:
+            continue
+        xy = entry[:2].decode()
+        if "R" in xy or "C" in xy:
+            # Następny wpis to stara ścieżka przeniesienia
+            i += 1
+        if xy == "??":
+            code = "?"
+        elif "U" in xy or xy in ("AA", "DD"):
+            code = "U"
+        else:
+            code = xy[1] if xy[1] != " " else xy[0]
+        path = os.path.join(top, entry[3:].decode('utf-8', 'surrogateescape'))
+        statuses[_norm_path(path)] = code
+    return statuses
+
+def parse_cat_file(data):
+    """Wyjście git cat-file --batch -> {hash: linie}"""
+    contents = {}
+    pos = 0
+    while pos < len(data):
+        end = data.find(b"\n", pos)
+        if end < 0:
+            break
+        header = data[pos:end].split()
+        pos = end + 1
+        if len(header) < 3 or header[1] != b"blob":
+            continue
+        size = int(header[2])
+        text = data[pos:pos + size].decode('utf-8', 'ignore').replace("\r\n", "\n")
+        contents[header[0].decode()] = text.split("\n")
+        pos += size + 1
+    return contents
+
+def git_snapshot(root, paths, known):
+    """Stan repozytorium folderu root w trzech wywołaniach git: status wszystkich
+    plików, hashe HEAD otwartych plików (ls-tree) i treść nieznanych jeszcze
+    blobów (cat-file). None, gdy folder nie jest w repozytorium lub brak gita."""
+    try:
+        top = os.path.normpath(_git(root, "rev-parse", "--show-toplevel").decode().strip())
+        statuses = parse_porcelain(_git(top, "status", "--porcelain", "-z"), top)
+    except (OSError, subprocess.SubprocessError, UnicodeDecodeError):
+        return None
+    rel = {}
+    for path in paths:
+        name = os.path.relpath(path, top)
+        if not name.startswith(".."):
+            rel[name.replace(os.sep, "/")] = path
+    blobs, contents = {}, {}
+    if rel:
+        try:
+            listing = _git(top, "ls-tree", "-z", "HEAD", "--", *rel)
+        except (OSError, subprocess.SubprocessError):
+            # Repozytorium bez commitów
+            listing = b""
+        for entry in listing.split(b"\0"):
+            meta, _, name = entry.partition(b"\t")
+            meta = meta.split()
+            path = rel.get(name.decode('utf-8', 'surrogateescape'))
+            if path and len(meta) == 3 and meta[1] == b"blob":
+                blobs[_norm_path(path)] = meta[2].decode()
+        missing = sorted(set(blobs.values()) - known)
+        if missing:
+            try:
+                contents = parse_cat_file(_git(top, "cat-file", "--batch",
+                                               input="\n".join(missing).encode() + b"\n"))
+            except (OSError, subprocess.SubprocessError):
+                pass
+    return {"top": top, "statuses": statuses, "blobs": blobs, "contents": contents}
+
+def vcs_line_marks(old, new):
+    """Linie nowej wersji dodane/zmienione względem old; "deleted" - usunięte nad linią"""
+    marks = {}
+    for tag, i1, i2, j1, j2 in line_opcodes(old, new):
+        if tag == "delete":
+            marks.setdefault(min(j1, max(0, len(new) - 1)), "deleted")
+            continue
+        kind = "added" if tag == "insert" else "modified"
+        for j in range(j1, j2):
+            marks[j] = kind
+    return marks
+
+class GitSignals(QObject):
+    status_done = Signal(int, object)
+    marks_done = Signal(object, int, object)
+
+class GitStatusWorker(QRunnable):
+    def __init__(self, generation, root, paths, known, signals):
+        super().__init__()
+        self.generation = generation
+        self.root = root
+        self.paths = paths
+        self.known = known
+        self.signals = signals
+    
+    def run(self):
+        self.signals.status_done.emit(self.generation, git_snapshot(self.root, self.paths, self.known))
+
+class LineMarksWorker(QRunnable):
+    def __init__(self, key, revision, old, text, signals):
+        super().__init__()
+        self.key = key
+        self.revision = revision
+        self.old = old
+        self.text = text
+        self.signals = signals
+    
+    def run(self):
+        self.signals.marks_done.emit(self.key, self.revision, vcs_line_marks(self.old, self.text.split("\n")))
+
+class GitTracker(QObject):
+    """Stan git projektu: dekoracje drzewa plików i znaczniki zmian w edytorach.
+    
+    Odświeżanie (po zapisie, zdarzeniach systemu plików, zmianie indeksu git)
+    jest odkładane o DELAY i wykonywane w puli wątków - jedno git status dla
+    całego repozytorium. Treść plików z HEAD jest pamiętana według hasha bloba,
+    więc po edycji porównywany jest tylko tekst edytora, bez wywołań git.
+    """
+    DELAY = 500
+    MARKS_DELAY = 300
+    CACHE_LIMIT = 64
+    
+    statuses_changed = Signal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = None
+        self.top = None
+        self.statuses = {}
+        self.dirs = set()
+        self.blobs = {}
+        # hash bloba -> linie (najstarsze usuwane po przekroczeniu CACHE_LIMIT)
+        self.head_lines = {}
+        self.editors = {}
+        self._dirty = set()
+        self.generation = 0
+        self._running = False
+        self._pending = False
+        self.signals = GitSignals()
+        self.signals.status_done.connect(self._on_status)
+        self.signals.marks_done.connect(self._on_marks)
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DELAY)
+        self.timer.timeout.connect(self.refresh)
+        self.marks_timer = QTimer()
+        self.marks_timer.setSingleShot(True)
+        self.marks_timer.setInterval(self.MARKS_DELAY)
+        self.marks_timer.timeout.connect(self._flush_marks)
+        # Commit, checkout czy add z terminala zmieniają indeks, nie pliki projektu
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.schedule)
+    
+    def set_root(self, root):
+        self.root = root
+        self.generation += 1
+        self.timer.start(0)
+    
+    def register(self, editor):
+        self.editors[id(editor)] = editor
+        editor.textChanged.connect(lambda: self.schedule_marks(editor))
+        if editor.path:
+            self.schedule()
+    
+    def unregister(self, editor):
+        self.editors.pop(id(editor), None)
+        self._dirty.discard(id(editor))
+    
+    def schedule(self):
+        if self.root:
+            self.timer.start(self.DELAY)
+    
+    def schedule_marks(self, editor):
+        if id(editor) in self.editors and editor.path and self.top:
+            self._dirty.add(id(editor))
+            self.marks_timer.start()
+    
+    def status_for(self, path):
+        """Litera statusu pliku, "" dla katalogu ze zmianami, None bez zmian"""
+        norm = _norm_path(path)
+        code = self.statuses.get(norm)
+        if code is None and norm in self.dirs:
+            return ""
+        return code
+    
+    def refresh(self):
+        if self._running:
+            self._pending = True
+            return
+        if not self.root:
+            return
+        self._running = True
+        paths = [editor.path for editor in self.editors.values() if editor.path]
+        QThreadPool.globalInstance().start(GitStatusWorker(
+            self.generation, self.root, paths, frozenset(self.head_lines), self.signals))
+    
+    def _on_status(self, generation, snapshot):
+        self._running = False
+        if self._pending or generation != self.generation:
+            self._pending = False
+            self.timer.start(0)
+        if generation != self.generation:
+            return
+        if snapshot is None:
+            self.top = None
+            self.statuses, self.dirs, self.blobs = {}, set(), {}
+        else:
+            self.top = snapshot["top"]
+            self.statuses = snapshot["statuses"]
+            self.blobs = snapshot["blobs"]
+            self.dirs = set()
+            top = _norm_path(self.top)
+            for path in self.statuses:
+                folder = os.path.dirname(path)
+                while folder not in self.dirs and len(folder) > len(top):
+                    self.dirs.add(folder)
+                    folder = os.path.dirname(folder)
+            self.head_lines.update(snapshot["contents"])
+            while len(self.head_lines) > self.CACHE_LIMIT:
+                del self.head_lines[next(iter(self.head_lines))]
+            watched = set(self.watcher.files())
+            for name in ("index", "HEAD"):
+                path = os.path.join(self.top, ".git", name)
+                if path not in watched and os.path.isfile(path):
+                    self.watcher.addPath(path)
+        self.statuses_changed.emit()
+        self._dirty.update(self.editors)
+        self._flush_marks()
+    
+    def _flush_marks(self):
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            editor = self.editors.get(key)
+            if editor is None or not editor.path:
+                continue
+            blob = self.blobs.get(_norm_path(editor.path))
+            old = self.head_lines.get(blob)
+            if old is None:
+                if editor.vcs_marks:
+                    editor.set_vcs_marks({})
+                continue
+            # Ostatnio używane na końcu - przy przycinaniu cache zostają
+            self.head_lines[blob] = self.head_lines.pop(blob)
+            QThreadPool.globalInstance().start(LineMarksWorker(
+                key, editor.document().revision(), old, editor.toPlainText(), self.signals))
+    
+    def _on_marks(self, key, revision, marks):
+        editor = self.editors.get(key)
+        # Wynik dla starszej wersji tekstu - przyjdzie nowszy
+        if editor is not None and revision == editor.document().revision():
+            editor.set_vcs_marks(marks)
+
+class GitDecorationDelegate(QStyledItemDelegate):
+    """Kolor i litera statusu git w drzewie plików - odczyt ze słownika trackera"""
+    COLORS = {"M": "git_modified", "A": "git_added", "?": "git_added", "R": "git_added",
+              "D": "git_deleted", "U": "git_deleted", "": "git_modified"}
+    
+    def __init__(self, tracker, model, theme, parent=None):
+        super().__init__(parent)
+        self.tracker = tracker
+        self.model = model
+        self.theme = theme
+    
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        if not self.tracker.statuses and not self.tracker.dirs:
+            return
+        code = self.tracker.status_for(self.model.filePath(index))
+        if code is None:
+            return
+        color = QColor(self.theme()[self.COLORS.get(code, "git_modified")])
+        option.palette.setColor(QPalette.ColorRole.Text, color)
+        option.palette.setColor(QPalette.ColorRole.HighlightedText, color)
+        if code:
+            option.text = f"{option.text}  {code}"
+
+# ================== ŚLEDZENIE LOGÓW ==================
+
+class LogTail:
+    """Przyrostowe czytanie rosnącego pliku (tail -f).
+    
+    Czytane są tylko nowe bajty od zapamiętanej pozycji. Rotacja (pod ścieżką
+    inny plik) kończy czytanie starego i przechodzi na nowy od początku, a
+    obcięcie (rozmiar mniejszy niż pozycja) wraca na początek. Dekoder
+    przyrostowy nie psuje znaków UTF-8 podzielonych między odczyty, a
+    niedokończona ostatnia linia czeka na swój koniec.
+    """
+    CHUNK = 4 * 1024 * 1024
+    
+    def __init__(self, path, initial=256 * 1024):
+        self.path = path
+        self.initial = initial
+        self.file = None
+        self.identity = None
+        self.offset = 0
+        self.partial = ""
+        self.more = False
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    
+    def _open(self, start=None):
+        """Otwórz plik; start=None - od końca (ostatnie initial bajtów)"""
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return False
+        self.close()
+        self.file = f
+        st = os.fstat(f.fileno())
+        self.identity = (st.st_dev, st.st_ino)
+        self.offset = max(0, st.st_size - self.initial) if start is None else start
+        self.decoder.reset()
+        self.partial = ""
+        if self.offset:
+            f.seek(self.offset - 1)
+            if f.read(1) != b"\n":
+                # Początek pierwszej linii jest przed pozycją - pomiń ją
+                f.readline()
+                self.offset = f.tell()
+        else:
+            f.seek(0)
+        return True
+    
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+    
+    def _read(self):
+        data = self.file.read(self.CHUNK)
+        self.more = len(data) == self.CHUNK
+        if not data:
+            return []
+        self.offset += len(data)
+        lines = (self.partial + self.decoder.decode(data)).replace("\r\n", "\n").split("\n")
+        self.partial = lines.pop()
+        return lines
+    
+    def _finish(self):
+        """Reszta starego pliku, łącznie z linią bez znaku końca"""
+        lines = self._read() if self.file else []
+        tail = self.partial + self.decoder.decode(b"", final=True)
+        if tail:
+            lines.append(tail)
+        return lines
+    
+    def poll(self):
+        """Nowe pełne linie i zdarzenie: "rotated", "truncated" albo None"""
+        if self.file is None and not self._open():
+            return [], None
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            # Plik przeniesiony, nowy jeszcze nie powstał - czytaj stary dalej
+            return self._read(), None
+        if (st.st_dev, st.st_ino) != self.identity:
+            lines = self._finish()
+            self._open(start=0)
+            return lines + self._read(), "rotated"
+        if st.st_size < self.offset:
+            self.file.seek(0)
+            self.offset = 0
+            self.decoder.reset()
+            self.partial = ""
+            return self._read(), "truncated"
+        return self._read(), None
+
+LOG_TIME_RE = re.compile(r"\[?\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?\]?")
+LOG_LEVEL_RE = re.compile(r"\b(FATAL|CRITICAL|ERROR|WARN(?:ING)?|INFO|DEBUG|TRACE)\b")
+
+class LogHighlighter(QSyntaxHighlighter):
+    """Znaczniki czasu i poziomy w logach (wyrażenia regularne zamiast leksera).
+    
+    Dopisane linie to nowe bloki, więc kolorowane są tylko one.
+    """
+    LEVELS = {"FATAL": "error", "CRITICAL": "error", "ERROR": "error", "WARN": "warning",
+              "WARNING": "warning", "INFO": "function", "DEBUG": "comment", "TRACE": "comment"}
+    LEVEL_SCAN = 200
+    
+    def __init__(self, document, theme):
+        super().__init__(document)
+        self._init_formats(theme)
+    
+    def _init_formats(self, theme):
+        self.time_format = QTextCharFormat()
+        self.time_format.setForeground(QColor(theme["comment"]))
+        self.level_formats = {}
+        for level, key in self.LEVELS.items():
+            fmt = QTextCharFormat()
+            fmt.setForeground(QColor(theme[key]))
+            if key in ("error", "warning"):
+                fmt.setFontWeight(QFont.Weight.Bold)
+            self.level_formats[level] = fmt
+    
+    def set_theme(self, theme):
+        self._init_formats(theme)
+        self.rehighlight()
+    
+    def highlightBlock(self, text):
+        m = LOG_TIME_RE.match(text)
+        if m:
+            self.setFormat(0, m.end(), self.time_format)
+        m = LOG_LEVEL_RE.search(text, 0, self.LEVEL_SCAN)
+        if m:
+            self.setFormat(m.start(), m.end() - m.start(), self.level_formats[m.group(1)])
+
+class LogView(QWidget):
+    """Podgląd rosnącego pliku z limitem linii i filtrem (regex).
+    
+    Linie (także odfiltrowane) są trzymane w ograniczonej kolejce, więc zmiana
+    filtra przebudowuje widok bez ponownego czytania pliku.
+    """
+    MAX_LINES = 100000
+    INTERVAL = 250
+    
+    def __init__(self, path, config=None, theme=None):
+        super().__init__()
+        self.path = path
+        self.theme = theme or Theme.DARK
+        self.lines = deque(maxlen=self.MAX_LINES)
+        self.filter_re = None
+        self.received = 0
+        
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filtr (regex)")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(lambda: self.filter_timer.start())
+        self.info = QLabel()
+        clear_btn = QPushButton("Wyczyść")
+        clear_btn.clicked.connect(self.clear)
+        header = QHBoxLayout()
+        header.setContentsMargins(6, 2, 6, 2)
+        header.addWidget(QLabel(path), 1)
+        header.addWidget(self.filter_edit, 1)
+        header.addWidget(self.info)
+        header.addWidget(clear_btn)
+        
+        self.view = QPlainTextEdit()
+        self.view.setReadOnly(True)
+        self.view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.view.setMaximumBlockCount(self.MAX_LINES)
+        if config:
+            self.view.setFont(QFont(config.get("font_family", "Consolas"), config.get("font_size", 11)))
+        self.highlighter = LogHighlighter(self.view.document(), self.theme)
+        self._apply_colors()
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addLayout(header)
+        layout.addWidget(self.view)
+        
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(200)
+        self.filter_timer.timeout.connect(self._apply_filter)
+        
+        self.tail = LogTail(path)
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.INTERVAL)
+        self.timer.timeout.connect(self.poll)
+        self.timer.start()
+        self.poll()
+    
+    @perf_timed("LogView.poll")
+    def poll(self):
+        lines, event = self.tail.poll()
+        if event:
+            lines.insert(0, "——— plik obcięty ———" if event == "truncated" else "——— nowy plik (rotacja) ———")
+        if lines:
+            self.received += len(lines)
+            self.lines.extend(lines)
+            if self.filter_re:
+                lines = [line for line in lines if self.filter_re.search(line)]
+            if lines:
+                # appendPlainText przewija tylko, gdy widok był na końcu
+                self.view.appendPlainText("\n".join(lines[-self.MAX_LINES:]))
+            self._update_info()
+        if self.tail.more:
+            # Zaległe dane (np. po chwilowej przerwie) - dokończ zaraz, porcjami
+            QTimer.singleShot(0, self.poll)
+    
+    def _update_info(self):
+        shown = self.view.blockCount() if self.view.document().characterCount() > 1 else 0
+        self.info.setText(f"{shown} / {self.received} linii")
+    
+    def _apply_filter(self):
+        text = self.filter_edit.text()
+        try:
+            self.filter_re = re.compile(text) if text else None
+        except re.error as e:
+            self.filter_edit.setStyleSheet(f"border: 1px solid {self.theme['error']};")
+            self.filter_edit.setToolTip(str(e))
+            return
+        self.filter_edit.setStyleSheet("")
+        self.filter_edit.setToolTip("")
+        lines = self.lines if self.filter_re is None else [l for l in self.lines if self.filter_re.search(l)]
+        self.view.setPlainText("\n".join(lines))
+        self.view.moveCursor(QTextCursor.MoveOperation.End)
+        self._update_info()
+    
+    def clear(self):
+        self.lines.clear()
+        self.view.clear()
+        self.received = 0
+        self._update_info()
+    
+    def stop(self):
+        self.timer.stop()
+        self.tail.close()
+    
+    def _apply_colors(self):
+        self.view.setStyleSheet(f"""
+            QPlainTextEdit {{
+                background-color: {self.theme['bg']};
+                color: {self.theme['fg']};
+                border: none;
+                selection-background-color: {self.theme['selection']};
+            }}
+        """)
+    
+    def set_theme(self, theme):
+        self.theme = theme
+        self._apply_colors()
+        self.highlighter.set_theme(theme)
+
+# ================== PODGLĄD BINARNY ==================
+
+BINARY_SAMPLE = 8192
+# Bajty spotykane w tekście - reszta znaków sterujących świadczy o pliku binarnym
+TEXT_BYTES = bytes(range(32, 256)) + b"\t\n\r\f\b\x1b"
+
+def looks_binary(data):
+    """Bajt zerowy albo ponad 10% znaków sterujących w pierwszych 8 KB"""
+    sample = data[:BINARY_SAMPLE]
+    if not sample:
+        return False
+    if b"\0" in sample:
+        return True
+    return len(sample.translate(None, TEXT_BYTES)) > len(sample) // 10
+
+def is_binary_file(path):
+    try:
+        with open(path, 'rb') as f:
+            return looks_binary(f.read(BINARY_SAMPLE))
+    except OSError:
+        return False
+
+class HexView(QAbstractScrollArea):
+    """Podgląd hex/ASCII pliku dowolnej wielkości.
+    
+    Plik jest mapowany w pamięć (mmap), a rysowane są tylko widoczne wiersze -
+    system wczytuje jedynie oglądane strony, więc kilkugigabajtowy plik nie
+    zajmuje pamięci i przewija się od razu.
+    """
+    ROW = 16
+    selection_changed = Signal(str)
+    
+    def __init__(self, path, config=None, theme=None):
+        super().__init__()
+        self.path = path
+        self.theme = theme or Theme.DARK
+        self.file = open(path, 'rb')
+        self.size = 0
+        self.data = b""
+        self.selected = None
+        self._map(os.fstat(self.file.fileno()).st_size)
+        font = QFont(config.get("font_family", "Consolas") if config else "Consolas",
+                     config.get("font_size", 11) if config else 11)
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.setFont(font)
+        self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+        self._update_scrollbars()
+    
+    def _map(self, size):
+        if self.size:
+            self.data.close()
+        self.size = size
+        # Pliku o zerowej długości nie da się zmapować
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.rows = (size + self.ROW - 1) // self.ROW
+        self.digits = max(8, len(f"{size:x}"))
+        if self.selected is not None and self.selected >= size:
+            self.selected = None
+    
+    def _check_size(self):
+        """Zmapuj od nowa, gdy plik zmienił długość na dysku.
+        
+        Odczyt strony mapy za końcem obciętego pliku kończy cały proces
+        sygnałem SIGBUS, więc długość sprawdzana jest przed każdym odczytem.
+        """
+        size = os.fstat(self.file.fileno()).st_size
+        if size != self.size:
+            self._map(size)
+            self._update_scrollbars()
+    
+    def close_file(self):
+        if self.size:
+            self.data.close()
+        self.file.close()
+    
+    def _layout(self):
+        """(szerokość znaku, wysokość wiersza, x kolumny hex, x kolumny ASCII, szerokość)"""
+        metrics = self.fontMetrics()
+        cw = metrics.horizontalAdvance("0")
+        hex_x = (self.digits + 2) * cw
+        ascii_x = hex_x + (self.ROW * 3 + 2) * cw
+        return cw, metrics.height(), hex_x, ascii_x, ascii_x + (self.ROW + 1) * cw
+    
+    def visible_rows(self):
+        return max(1, self.viewport().height() // max(1, self.fontMetrics().height()))
+    
+    def _update_scrollbars(self):
+        visible = self.visible_rows()
+        bar = self.verticalScrollBar()
+        bar.setRange(0, max(0, self.rows - visible))
+        bar.setPageStep(visible)
+        width = self._layout()[4]
+        self.horizontalScrollBar().setRange(0, max(0, width - self.viewport().width()))
+        self.horizontalScrollBar().setPageStep(self.viewport().width())
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.FontChange:
+            self._update_scrollbars()
+    
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(event.rect(), QColor(self.theme["bg"]))
+        painter.setFont(self.font())
+        cw, lh, hex_x, ascii_x, _ = self._layout()
+        ascent = self.fontMetrics().ascent()
+        painter.translate(-self.horizontalScrollBar().value(), 0)
+        self._check_size()
+        first = self.verticalScrollBar().value()
+        count = self.visible_rows() + 1
+        start = first * self.ROW
+        # Jedno odczytanie z mapy na odświeżenie - tylko widoczne bajty
+        chunk = self.data[start:start + count * self.ROW]
+        offset_color = QColor(self.theme["comment"])
+        text_color = QColor(self.theme["fg"])
+        if self.selected is not None and 0 <= self.selected - start < len(chunk):
+            row, col = divmod(self.selected - start, self.ROW)
+            color = QColor(self.theme["selection"])
+            painter.fillRect(hex_x + (col * 3 + (col >= 8)) * cw, row * lh, 2 * cw, lh, color)
+            painter.fillRect(ascii_x + col * cw, row * lh, cw, lh, color)
+        for row in range(count):
+            data = chunk[row * self.ROW:(row + 1) * self.ROW]
+            if not data:
+                break
+            y = row * lh + ascent
+            painter.setPen(offset_color)
+            painter.drawText(0, y, f"{start + row * self.ROW:0{self.digits}x}")
+            painter.setPen(text_color)
+            painter.drawText(hex_x, y, data[:8].hex(" ") + "  " + data[8:].hex(" "))
+            painter.drawText(ascii_x, y, "".join(chr(b) if 32 <= b < 127 else "." for b in data))
+    
+    def byte_at(self, pos):
+        """Pozycja bajtu pod punktem widoku (kolumna hex lub ASCII) albo None"""
+        cw, lh, hex_x, ascii_x, _ = self._layout()
+        x = pos.x() + self.horizontalScrollBar().value()
+        row = self.verticalScrollBar().value() + pos.y() // lh
+        if hex_x <= x < ascii_x - cw:
+            col = (x - hex_x) // cw
+            col = (col - (col >= 25)) // 3
+        elif ascii_x <= x < ascii_x + self.ROW * cw:
+            col = (x - ascii_x) // cw
+        else:
+            return None
+        offset = row * self.ROW + min(col, self.ROW - 1)
+        return offset if offset < self.size else None
+    
+    def select(self, offset):
+        self._check_size()
+        if offset >= self.size:
+            return
+        self.selected = offset
+        value = self.data[offset]
+        self.selection_changed.emit(
+            f"Pozycja 0x{offset:x} ({offset}) - bajt 0x{value:02x} ({value}) z {self.size} B")
+        self.viewport().update()
+    
+    def goto(self, offset):
+        """Przewiń do bajtu i zaznacz go"""
+        self._check_size()
+        offset = max(0, min(offset, self.size - 1))
+        if self.size:
+            row = offset // self.ROW
+            bar = self.verticalScrollBar()
+            if not bar.value() <= row < bar.value() + self.visible_rows():
+                bar.setValue(row - self.visible_rows() // 2)
+            self.select(offset)
+    
+    def mousePressEvent(self, event):
+        offset = self.byte_at(event.position().toPoint())
+        if offset is not None:
+            self.select(offset)
+    
+    def keyPressEvent(self, event):
+        key = event.key()
+        if event.matches(QKeySequence.StandardKey.MoveToStartOfDocument):
+            self.goto(0)
+        elif event.matches(QKeySequence.StandardKey.MoveToEndOfDocument):
+            self.goto(self.size - 1)
+        elif key == Qt.Key.Key_G and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            text, ok = QInputDialog.getText(self, "Przejdź do pozycji", "Pozycja (dziesiętnie lub 0x...):")
+            if ok and text.strip():
+                try:
+                    self.goto(int(text.strip(), 0))
+                except ValueError:
+                    pass
+        elif key in (Qt.Key.Key_Up, Qt.Key.Key_Down, Qt.Key.Key_Left, Qt.Key.Key_Right,
+                     Qt.Key.Key_PageUp, Qt.Key.Key_PageDown) and self.size:
+            step = {Qt.Key.Key_Up: -self.ROW, Qt.Key.Key_Down: self.ROW, Qt.Key.Key_Left: -1,
+                    Qt.Key.Key_Right: 1, Qt.Key.Key_PageUp: -self.ROW * self.visible_rows(),
+                    Qt.Key.Key_PageDown: self.ROW * self.visible_rows()}[key]
+            self.goto((self.selected or 0) + step)
+        else:
+            super().keyPressEvent(event)
+    
+    def set_theme(self, theme):
+        self.theme = theme
+        self.viewport().update()
 
 # ================== MAIN WINDOW ==================
 
@@ -506,15 +5293,69 @@ class OneCodePro(QMainWindow):
     def __init__(self):
         super().__init__()
         self.config = Config()
-        self.theme = Theme.DARK if self.config.settings["theme"] == "dark" else Theme.LIGHT
+        self.config.load_project(QDir.currentPath())
+        self.theme = Theme.get(self.config.get("theme"))
         
         self.setWindowTitle("OneCode - OSS")
         self.resize(1400, 900)
         
+        # Diagnostyki z wyjścia uruchamianych programów
+        self.diagnostics = DiagnosticIndex()
+        self.stdout_parser = OutputParser()
+        self.stderr_parser = OutputParser()
+        self._diagnostic_paths = set()
+        self.diagnostic_timer = QTimer()
+        self.diagnostic_timer.setSingleShot(True)
+        self.diagnostic_timer.setInterval(100)
+        self.diagnostic_timer.timeout.connect(self._refresh_diagnostic_markers)
+        
+        # Indeks plików projektu (Ctrl+P)
+        self.project_root = QDir.currentPath()
+        self.file_index = FileIndex()
+        self._index_generation = 0
+        self._indexers = []
+        
+        # Symbole: bieżące dokumenty i cały projekt
+        self.symbol_index = SymbolIndex(self)
+        self.symbol_index.symbols_updated.connect(self._on_symbols_updated)
+        self.project_symbols = ProjectSymbolIndex(self)
+        
+        # Otwarte dokumenty (ścieżka/karta -> edytor)
+        self.documents = DocumentRegistry()
+        
+        # Sprawdzanie składni w tle (podkreślenia + kropki na marginesie)
+        self.linter = Linter(self)
+        
+        # Formatowanie przy zapisie (proces uruchamiany przy pierwszej potrzebie)
+        self.formatter = FormatterWorker(self)
+        
+        # Obserwacja zmian na dysku (zdarzenia zbierane i obsługiwane partiami)
+        self.fs_watcher = QFileSystemWatcher(self)
+        self.fs_watcher.fileChanged.connect(self._on_fs_file_event)
+        self.fs_watcher.directoryChanged.connect(self._on_fs_dir_event)
+        self._fs_pending_files = set()
+        self._fs_pending_dirs = set()
+        self._fs_prompt_open = False
+        self.fs_timer = QTimer()
+        self.fs_timer.setSingleShot(True)
+        self.fs_timer.setInterval(300)
+        self.fs_timer.timeout.connect(self._process_fs_events)
+        
+        # Pomiary wydajności (panel Ctrl+Alt+P)
+        self.stall_detector = StallDetector(self)
+        self.perf_hud = PerfHUD(self)
+        self.key_recorder = KeystrokeRecorder(self)
+        if self.config.get("perf_monitor", False):
+            PERF.enabled = True
+            self.stall_detector.start()
+        
+        # Status git projektu i znaczniki zmian linii
+        self.git = GitTracker(self)
+        
         self.auto_save_timer = QTimer()
         self.auto_save_timer.timeout.connect(self._auto_save)
-        if self.config.settings.get("auto_save", True):
-            self.auto_save_timer.start(self.config.settings.get("auto_save_interval", 30000))
+        if self.config.get("auto_save", True):
+            self.auto_save_timer.start(self.config.get("auto_save_interval", 30000))
         
         self._setup_ui()
         self._setup_menu()
@@ -524,6 +5365,13 @@ class OneCodePro(QMainWindow):
         
         # Przywróć ostatnie pliki
         self._restore_recent_files()
+        self._start_file_indexing(self.project_root)
+        self._update_watched_dirs()
+        self.git.set_root(self.project_root)
+        
+        self.config.save_failed.connect(lambda error: self.status.showMessage(error, 5000))
+        if self.config.error:
+            self.status.showMessage(self.config.error, 5000)
     
     def _setup_ui(self):
         main_splitter = QSplitter(Qt.Orientation.Horizontal)
@@ -545,13 +5393,27 @@ class OneCodePro(QMainWindow):
         for i in range(1, 4):
             self.tree.hideColumn(i)
         self.tree.doubleClicked.connect(self._open_selected_file)
+        # Status git plików (kolor i litera) - dane z GitTracker, bez wywołań git przy rysowaniu
+        self.tree.setItemDelegate(GitDecorationDelegate(self.git, self.model, lambda: self.theme, self.tree))
+        self.git.statuses_changed.connect(self.tree.viewport().update)
         
         # Folder selector
         folder_btn = QPushButton("📁 Otwórz folder")
         folder_btn.clicked.connect(self._select_folder)
         
+        # Outline (struktura bieżącego pliku)
+        self.outline = QTreeWidget()
+        self.outline.setHeaderHidden(True)
+        self.outline.itemActivated.connect(self._outline_activated)
+        self.outline.itemClicked.connect(self._outline_activated)
+        
+        side_splitter = QSplitter(Qt.Orientation.Vertical)
+        side_splitter.addWidget(self.tree)
+        side_splitter.addWidget(self.outline)
+        side_splitter.setSizes([500, 250])
+        
         sidebar_layout.addWidget(folder_btn)
-        sidebar_layout.addWidget(self.tree)
+        sidebar_layout.addWidget(side_splitter)
         sidebar.setLayout(sidebar_layout)
         
         main_splitter.addWidget(sidebar)
@@ -595,9 +5457,9 @@ class OneCodePro(QMainWindow):
         layout.setContentsMargins(0, 0, 0, 0)
         
         # Terminal output
-        self.terminal_view = QPlainTextEdit()
-        self.terminal_view.setReadOnly(True)
+        self.terminal_view = TerminalView()
         self.terminal_view.setFont(QFont("Consolas", 10))
+        self.terminal_view.location_activated.connect(self._goto_location)
         
         # Terminal input
         self.terminal_input = QLineEdit()
@@ -643,11 +5505,20 @@ class OneCodePro(QMainWindow):
         save_all_act.setShortcut("Ctrl+Alt+S")
         save_all_act.triggered.connect(self._save_all)
         
+        quick_open_act = QAction("Przejdź do pliku...", self)
+        quick_open_act.setShortcut("Ctrl+P")
+        quick_open_act.triggered.connect(self._quick_open)
+        
         close_act = QAction("Zamknij", self)
         close_act.setShortcut("Ctrl+W")
         close_act.triggered.connect(lambda: self._close_tab(self.tabs.currentIndex()))
         
-        file_menu.addActions([new_act, open_act, save_act, save_as_act, save_all_act, close_act])
+        follow_act = QAction("Śledź plik (tail -f)...", self)
+        follow_act.triggered.connect(self._follow_file_dialog)
+        
+        file_menu.addActions([new_act, open_act, quick_open_act, save_act, save_as_act, save_all_act, close_act])
+        file_menu.addSeparator()
+        file_menu.addAction(follow_act)
         
         # Edycja
         edit_menu = menubar.addMenu("✏️ Edycja")
@@ -668,7 +5539,31 @@ class OneCodePro(QMainWindow):
         replace_act.setShortcut("Ctrl+H")
         replace_act.triggered.connect(self._show_replace)
         
+        goto_symbol_act = QAction("Przejdź do symbolu...", self)
+        goto_symbol_act.setShortcut("Ctrl+Shift+O")
+        goto_symbol_act.triggered.connect(self._goto_symbol)
+        
+        project_symbol_act = QAction("Symbol w projekcie...", self)
+        project_symbol_act.setShortcut("Ctrl+T")
+        project_symbol_act.triggered.connect(self._goto_project_symbol)
+        
+        definition_act = QAction("Przejdź do definicji", self)
+        definition_act.setShortcut("F12")
+        definition_act.triggered.connect(self._goto_definition)
+        
         edit_menu.addActions([undo_act, redo_act, find_act, replace_act])
+        edit_menu.addSeparator()
+        bracket_act = QAction("Przejdź do pary nawiasu", self)
+        bracket_act.setShortcut("Ctrl+]")
+        bracket_act.triggered.connect(self._jump_to_bracket)
+        
+        edit_menu.addActions([goto_symbol_act, project_symbol_act, definition_act, bracket_act])
+        edit_menu.addSeparator()
+        format_act = QAction("Formatuj przy zapisie", self)
+        format_act.setCheckable(True)
+        format_act.setChecked(self.config.get("format_on_save", False))
+        format_act.toggled.connect(self._toggle_format_on_save)
+        edit_menu.addAction(format_act)
         
         # Widok
         view_menu = menubar.addMenu("👁️ Widok")
@@ -678,15 +5573,58 @@ class OneCodePro(QMainWindow):
         
         minimap_act = QAction("Pokaż minimap", self)
         minimap_act.setCheckable(True)
-        minimap_act.setChecked(self.config.settings.get("show_minimap", True))
+        minimap_act.setChecked(self.config.get("show_minimap", True))
         minimap_act.triggered.connect(self._toggle_minimap)
         
         wrap_act = QAction("Zawijanie wierszy", self)
         wrap_act.setCheckable(True)
-        wrap_act.setChecked(self.config.settings.get("word_wrap", False))
+        wrap_act.setChecked(self.config.get("word_wrap", False))
         wrap_act.triggered.connect(self._toggle_word_wrap)
         
-        view_menu.addActions([theme_act, minimap_act, wrap_act])
+        perf_act = QAction("Panel wydajności", self)
+        perf_act.setShortcut("Ctrl+Alt+P")
+        perf_act.triggered.connect(self._toggle_perf_hud)
+        
+        perf_dump_act = QAction("Zapisz raport wydajności...", self)
+        perf_dump_act.triggered.connect(self._dump_perf_report)
+        
+        self.record_keys_act = QAction("Nagrywaj sesję klawiatury", self)
+        self.record_keys_act.setCheckable(True)
+        self.record_keys_act.triggered.connect(self._toggle_key_recording)
+        
+        fold_act = QAction("Zwiń/rozwiń region", self)
+        fold_act.setShortcut("Ctrl+Shift+[")
+        fold_act.triggered.connect(self._toggle_fold)
+        
+        fold_all_act = QAction("Zwiń wszystko", self)
+        fold_all_act.setShortcut("Ctrl+K, Ctrl+0")
+        fold_all_act.triggered.connect(self._fold_all)
+        
+        unfold_all_act = QAction("Rozwiń wszystko", self)
+        unfold_all_act.setShortcut("Ctrl+K, Ctrl+J")
+        unfold_all_act.triggered.connect(self._unfold_all)
+        
+        split_act = QAction("Podziel edytor", self)
+        split_act.setShortcut("Ctrl+\\")
+        split_act.triggered.connect(self._toggle_split)
+        
+        compare_saved_act = QAction("Porównaj z zapisanym", self)
+        compare_saved_act.setShortcut("Ctrl+K, D")
+        compare_saved_act.triggered.connect(self._compare_with_saved)
+        
+        compare_tab_act = QAction("Porównaj z kartą...", self)
+        compare_tab_act.triggered.connect(self._compare_with_tab)
+        
+        # Motywy wbudowane i z ~/.onecode_themes (lista odświeżana przy otwarciu menu)
+        self.theme_menu = QMenu("Motyw", self)
+        self.theme_menu.aboutToShow.connect(self._fill_theme_menu)
+        
+        view_menu.addActions([theme_act, self.theme_menu.menuAction(), minimap_act, wrap_act, split_act])
+        view_menu.addActions([compare_saved_act, compare_tab_act])
+        view_menu.addSeparator()
+        view_menu.addActions([fold_act, fold_all_act, unfold_all_act])
+        view_menu.addSeparator()
+        view_menu.addActions([perf_act, perf_dump_act, self.record_keys_act])
         
         # Uruchom
         run_menu = menubar.addMenu("▶️ Uruchom")
@@ -695,7 +5633,15 @@ class OneCodePro(QMainWindow):
         run_act.setShortcut("F5")
         run_act.triggered.connect(self._run_file)
         
-        run_menu.addAction(run_act)
+        next_error_act = QAction("Następny błąd", self)
+        next_error_act.setShortcut("F8")
+        next_error_act.triggered.connect(lambda: self._step_diagnostic(1))
+        
+        prev_error_act = QAction("Poprzedni błąd", self)
+        prev_error_act.setShortcut("Shift+F8")
+        prev_error_act.triggered.connect(lambda: self._step_diagnostic(-1))
+        
+        run_menu.addActions([run_act, next_error_act, prev_error_act])
         
         # Pomoc
         help_menu = menubar.addMenu("❓ Pomoc")
@@ -825,6 +5771,7 @@ class OneCodePro(QMainWindow):
         """)
         
         self.tree.setStyleSheet(f"background-color:{self.theme['sidebar']};color:{self.theme['fg']};")
+        self.outline.setStyleSheet(f"background-color:{self.theme['sidebar']};color:{self.theme['fg']};")
         self.terminal_view.setStyleSheet(f"background-color:{self.theme['bg']};color:{self.theme['fg']};")
         self.terminal_input.setStyleSheet(f"background-color:{self.theme['sidebar']};color:{self.theme['fg']};")
     
@@ -842,6 +5789,39 @@ class OneCodePro(QMainWindow):
         if path:
             self._open_file(path)
     
+    def _open_hex(self, path):
+        """Plik binarny - podgląd hex zamiast dekodowania całości jako tekst"""
+        for index in range(self.tabs.count()):
+            widget = self.tabs.widget(index)
+            if isinstance(widget, HexView) and _norm_path(widget.path) == _norm_path(path):
+                self.tabs.setCurrentIndex(index)
+                return
+        try:
+            view = HexView(path, self.config, self.theme)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Błąd", f"Nie można otworzyć pliku:\n{str(e)}")
+            return
+        view.selection_changed.connect(lambda text: self.status.showMessage(text))
+        idx = self.tabs.addTab(view, f"{os.path.basename(path)} [hex]")
+        self.tabs.setCurrentIndex(idx)
+        self._add_to_recent(path)
+        self.status.showMessage(f"Otwarto (hex): {path} - {view.size} B", 3000)
+    
+    def _follow_file_dialog(self):
+        editor = self._get_current_editor()
+        start = os.path.dirname(editor.path) if editor and editor.path else ""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Śledź plik", start, "Logi (*.log *.txt *.out);;Wszystkie pliki (*.*)")
+        if path:
+            self._follow_file(path)
+    
+    def _follow_file(self, path):
+        """Karta podglądu rosnącego pliku - dopisywane są tylko nowe linie"""
+        view = LogView(path, self.config, self.theme)
+        idx = self.tabs.addTab(view, f"⏵ {os.path.basename(path)}")
+        self.tabs.setCurrentIndex(idx)
+        self.status.showMessage(f"Śledzenie: {path}", 3000)
+    
     def _open_selected_file(self, index):
         path = self.model.filePath(index)
         if os.path.isfile(path):
@@ -849,12 +5829,13 @@ class OneCodePro(QMainWindow):
     
     def _open_file(self, path):
         # Sprawdź czy plik jest już otwarty
-        for i in range(self.tabs.count()):
-            widget = self.tabs.widget(i)
-            editor = widget.findChild(AdvancedCodeEditor)
-            if editor and editor.path == path:
-                self.tabs.setCurrentIndex(i)
-                return
+        editor = self.documents.find(path)
+        if editor:
+            self.tabs.setCurrentWidget(self.documents.container(editor))
+            return
+        if is_binary_file(path):
+            self._open_hex(path)
+            return
         
         try:
             with open(path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -865,14 +5846,19 @@ class OneCodePro(QMainWindow):
         
         editor = AdvancedCodeEditor(path, self.config, self.theme)
         editor.setPlainText(text)
+        editor.undo_history.load(path, text)
         editor.is_modified = False
+        editor.disk_state = self._disk_state(path)
         
         # Setup highlighter
-        lexer = self._get_lexer(path)
+        lexer = editor.language.lexer()
         if lexer:
             editor.highlighter = AdvancedHighlighter(editor.document(), lexer, self.theme)
         
+        editor.set_diagnostics(self.diagnostics.for_path(path))
         self._add_editor_tab(editor, os.path.basename(path))
+        self.fs_watcher.addPath(path)
+        self._update_watched_dirs()
         
         # Dodaj do ostatnio otwartych
         self._add_to_recent(path)
@@ -886,21 +5872,35 @@ class OneCodePro(QMainWindow):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
         
-        layout.addWidget(editor)
+        # Splitter na widoki podziału tego samego dokumentu
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(editor)
+        layout.addWidget(splitter)
         
         if editor.minimap:
             layout.addWidget(editor.minimap)
-            editor.textChanged.connect(editor.minimap.update_minimap)
-            editor.minimap.update_minimap()
         
         container.setLayout(layout)
+        self.documents.add(editor, container)
         
         idx = self.tabs.addTab(container, title)
         self.tabs.setCurrentIndex(idx)
         
         # Connect cursor position updates
         editor.cursorPositionChanged.connect(lambda: self._update_cursor_position(editor))
+        editor.related_word_indexes = lambda: self._other_word_indexes(editor)
+        self.symbol_index.register(editor)
+        self.git.register(editor)
+        if self.config.get("background_lint", True):
+            self.linter.register(editor)
+        if self.config.get("format_on_save", False) and editor.language.formatter:
+            self.formatter.start()
     
+    def _other_word_indexes(self, editor):
+        """Indeksy identyfikatorów pozostałych otwartych kart (podpowiedzi)"""
+        return [other.word_index for other in self.documents.editors() if other is not editor]
+    
+    @perf_timed("save")
     def _save_file(self):
         if self.tabs.count() == 0:
             return
@@ -913,13 +5913,15 @@ class OneCodePro(QMainWindow):
             self._save_file_as()
             return
         
+        errors = self._format_editors([editor])
         try:
-            with open(editor.path, 'w', encoding='utf-8') as f:
-                f.write(editor.toPlainText())
-            editor.is_modified = False
+            self._write_to_disk(editor)
             editor.last_save_time = QTimer()
             self._update_tab_title(self.tabs.currentIndex())
-            self.status.showMessage(f"Zapisano: {editor.path}", 3000)
+            if errors:
+                self.status.showMessage(f"Zapisano bez formatowania - {errors[0]}", 5000)
+            else:
+                self.status.showMessage(f"Zapisano: {editor.path}", 3000)
         except Exception as e:
             QMessageBox.warning(self, "Błąd", f"Nie można zapisać pliku:\n{str(e)}")
     
@@ -933,42 +5935,81 @@ class OneCodePro(QMainWindow):
         )
         
         if path:
+            old_path = editor.path
+            if editor.path:
+                self.fs_watcher.removePath(editor.path)
             editor.path = path
+            self.documents.rename(editor, old_path)
             self._save_file()
+            self.fs_watcher.addPath(path)
+            self._update_watched_dirs()
             self.tabs.setTabText(self.tabs.currentIndex(), os.path.basename(path))
             
             # Update highlighter
-            lexer = self._get_lexer(path)
+            lexer = editor.language.lexer()
             if lexer:
                 editor.highlighter = AdvancedHighlighter(editor.document(), lexer, self.theme)
+            self.linter.schedule(editor)
             
             self._add_to_recent(path)
+            rel = self.file_index.relative(path)
+            if rel:
+                self.file_index.add_path(rel)
     
+    @perf_timed("save_all")
     def _save_all(self):
-        for i in range(self.tabs.count()):
-            widget = self.tabs.widget(i)
-            editor = widget.findChild(AdvancedCodeEditor)
-            if editor and editor.is_modified:
-                if editor.path:
-                    try:
-                        with open(editor.path, 'w', encoding='utf-8') as f:
-                            f.write(editor.toPlainText())
-                        editor.is_modified = False
-                        self._update_tab_title(i)
-                    except:
-                        pass
-        self.status.showMessage("Zapisano wszystkie pliki", 3000)
+        editors = [e for e in self.documents.modified() if e.path]
+        errors = self._format_editors(editors)
+        for editor in editors:
+            try:
+                self._write_to_disk(editor)
+                self._update_editor_title(editor)
+            except:
+                pass
+        if errors:
+            self.status.showMessage(f"Zapisano wszystkie pliki, bez formatowania: {'; '.join(errors)}", 5000)
+        else:
+            self.status.showMessage("Zapisano wszystkie pliki", 3000)
     
+    @perf_timed("format")
+    def _format_editors(self, editors):
+        """Formatowanie przy zapisie: jedna partia żądań do procesu formatującego.
+        
+        Zwraca opisy błędów (np. błąd składni) - plik zapisuje się wtedy bez zmian.
+        """
+        if not self.config.get("format_on_save", False):
+            return []
+        editors = [e for e in editors if e.language.formatter]
+        if not editors:
+            return []
+        results = self.formatter.format_many(
+            [(e.language.formatter, e.path, e.toPlainText()) for e in editors])
+        errors = []
+        for editor, (text, error) in zip(editors, results):
+            if error:
+                errors.append(f"{os.path.basename(editor.path)}: {error}")
+            elif text is not None:
+                # Tylko zmienione linie - kursor i historia cofania zostają
+                editor.replace_text_minimal(text)
+        return errors
+    
+    def _toggle_format_on_save(self, checked):
+        self.config.set("format_on_save", checked)
+        if checked:
+            self.formatter.start()
+    
+    @perf_timed("auto_save")
     def _auto_save(self):
         """Auto-zapisywanie plików"""
-        for i in range(self.tabs.count()):
-            widget = self.tabs.widget(i)
-            editor = widget.findChild(AdvancedCodeEditor)
-            if editor and editor.is_modified and editor.path:
+        for editor in self.documents.modified():
+            if editor.path:
+                if self._changed_on_disk(editor):
+                    # Nie nadpisuj nowszej wersji z dysku - decyzję podejmie użytkownik
+                    self._fs_pending_files.add(editor.path)
+                    self.fs_timer.start()
+                    continue
                 try:
-                    with open(editor.path, 'w', encoding='utf-8') as f:
-                        f.write(editor.toPlainText())
-                    editor.is_modified = False
+                    self._write_to_disk(editor)
                 except:
                     pass
     
@@ -977,7 +6018,7 @@ class OneCodePro(QMainWindow):
             return
         
         widget = self.tabs.widget(index)
-        editor = widget.findChild(AdvancedCodeEditor)
+        editor = self.documents.editor_for(widget)
         
         if editor and editor.is_modified:
             reply = QMessageBox.question(
@@ -989,21 +6030,176 @@ class OneCodePro(QMainWindow):
             )
             
             if reply == QMessageBox.StandardButton.Save:
+                # Zapis dotyczy zamykanej karty, nie bieżącej
+                self.tabs.setCurrentIndex(index)
                 self._save_file()
             elif reply == QMessageBox.StandardButton.Cancel:
                 return
         
         self.tabs.removeTab(index)
+        # removeTab nie usuwa widżetu - bez tego dokument zostawałby w pamięci
+        widget.deleteLater()
+        if isinstance(widget, DiffView):
+            widget.cancel()
+        elif isinstance(widget, LogView):
+            widget.stop()
+        elif isinstance(widget, HexView):
+            widget.close_file()
+        if editor:
+            editor.undo_history.store()
+            editor.undo_history.discard()
+            self.documents.remove(editor)
+            self.symbol_index.unregister(editor)
+            self.linter.unregister(editor)
+            self.git.unregister(editor)
+        if editor and editor.path:
+            self.fs_watcher.removePath(editor.path)
+            self._update_watched_dirs()
+    
+    def _update_editor_title(self, editor):
+        self._update_tab_title(self.tabs.indexOf(self.documents.container(editor)))
     
     def _update_tab_title(self, index):
-        widget = self.tabs.widget(index)
-        editor = widget.findChild(AdvancedCodeEditor)
+        editor = self.documents.editor_for(self.tabs.widget(index))
         if editor:
             title = os.path.basename(editor.path) if editor.path else "Nowy plik"
             if editor.is_modified:
                 title = "● " + title
             self.tabs.setTabText(index, title)
     
+    @perf_timed("write_to_disk")
+    def _write_to_disk(self, editor):
+        """Zapisz treść edytora i zapamiętaj stan pliku na dysku"""
+        with open(editor.path, 'w', encoding='utf-8') as f:
+            f.write(editor.toPlainText())
+        editor.is_modified = False
+        editor.disk_state = self._disk_state(editor.path)
+        self.project_symbols.update_file(editor.path, editor.symbols)
+        self.git.schedule()
+    
+    # ========== EXTERNAL CHANGES ==========
+    
+    def _disk_state(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _changed_on_disk(self, editor):
+        return editor.disk_state is not None and self._disk_state(editor.path) != editor.disk_state
+    
+    def _update_watched_dirs(self):
+        """Obserwuj katalog projektu i katalogi otwartych plików"""
+        wanted = {os.path.normpath(self.project_root)}
+        for editor in self.documents.editors():
+            if editor.path:
+                wanted.add(os.path.dirname(os.path.abspath(editor.path)))
+        current = set(self.fs_watcher.directories())
+        if current - wanted:
+            self.fs_watcher.removePaths(list(current - wanted))
+        new = [d for d in wanted - current if os.path.isdir(d)]
+        if new:
+            self.fs_watcher.addPaths(new)
+    
+    def _on_fs_file_event(self, path):
+        self._fs_pending_files.add(path)
+        if not self.fs_timer.isActive():
+            self.fs_timer.start()
+    
+    def _on_fs_dir_event(self, path):
+        self._fs_pending_dirs.add(path)
+        if not self.fs_timer.isActive():
+            self.fs_timer.start()
+    
+    @perf_timed("fs_events")
+    def _process_fs_events(self):
+        """Obsłuż zebraną serię zdarzeń naraz"""
+        if self._fs_prompt_open:
+            # Pytanie o konflikt jest otwarte - nowe zdarzenia poczekają
+            self.fs_timer.start()
+            return
+        files, self._fs_pending_files = self._fs_pending_files, set()
+        dirs, self._fs_pending_dirs = self._fs_pending_dirs, set()
+        if files or dirs:
+            self.git.schedule()
+        
+        # Indeks plików: tylko katalogi, które faktycznie się zmieniły
+        for folder in dirs:
+            rel = self.file_index.relative(folder)
+            if rel is None:
+                continue
+            try:
+                with os.scandir(folder) as entries:
+                    names = {e.name for e in entries if not e.is_dir(follow_symlinks=False)}
+            except OSError:
+                names = set()
+            self.file_index.sync_directory("" if rel == "." else rel, names)
+        
+        # Podmiana pliku (np. git checkout) zgłasza zmianę katalogu, nie pliku
+        touched = {_norm_path(p) for p in files}
+        touched_dirs = {_norm_path(d) for d in dirs}
+        reloaded = []
+        conflicts = []
+        watched = set(self.fs_watcher.files())
+        for editor in self.documents.editors():
+            if not editor.path:
+                continue
+            norm = _norm_path(editor.path)
+            if norm not in touched and os.path.dirname(norm) not in touched_dirs:
+                continue
+            state = self._disk_state(editor.path)
+            if state is not None and editor.path not in watched:
+                self.fs_watcher.addPath(editor.path)
+            if state == editor.disk_state:
+                continue
+            if state is None:
+                self.status.showMessage(f"Plik usunięty z dysku: {editor.path}", 5000)
+                continue
+            if editor.is_modified:
+                conflicts.append(editor)
+            elif self._reload_editor(editor):
+                self._update_editor_title(editor)
+                reloaded.append(editor)
+        
+        if reloaded:
+            self.status.showMessage(f"Przeładowano z dysku: {len(reloaded)} plik(ów)", 3000)
+        if conflicts:
+            self._resolve_conflicts(conflicts)
+    
+    def _reload_editor(self, editor):
+        """Wczytaj plik ponownie, zachowując kursor i przewinięcie"""
+        try:
+            with open(editor.path, 'r', encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+        except OSError:
+            return False
+        editor.replace_text_minimal(text)
+        editor.is_modified = False
+        editor.disk_state = self._disk_state(editor.path)
+        return True
+    
+    def _resolve_conflicts(self, conflicts):
+        """Jedno pytanie dla wszystkich zmienionych plików z niezapisanymi zmianami"""
+        names = "\n".join(os.path.basename(editor.path) for editor in conflicts[:15])
+        if len(conflicts) > 15:
+            names += f"\n... i {len(conflicts) - 15} więcej"
+        self._fs_prompt_open = True
+        reply = QMessageBox.question(
+            self, "Plik zmieniony na dysku",
+            f"Pliki zmieniły się na dysku, a mają niezapisane zmiany:\n\n{names}\n\n"
+            "Przeładować je (niezapisane zmiany zostaną utracone)?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        self._fs_prompt_open = False
+        for editor in conflicts:
+            if reply == QMessageBox.StandardButton.Yes:
+                if self._reload_editor(editor):
+                    self._update_editor_title(editor)
+            else:
+                # Zachowaj wersję z edytora; kolejny zapis nadpisze plik świadomie
+                editor.disk_state = self._disk_state(editor.path)
+    
     # ========== EDITOR OPERATIONS ==========
     
     def _undo(self):
@@ -1034,49 +6230,180 @@ class OneCodePro(QMainWindow):
     # ========== VIEW OPERATIONS ==========
     
     def _toggle_theme(self):
-        if self.config.settings["theme"] == "dark":
-            self.config.settings["theme"] = "light"
-            self.theme = Theme.LIGHT
-        else:
-            self.config.settings["theme"] = "dark"
-            self.theme = Theme.DARK
-        
-        self.config.save()
+        self._set_theme("light" if self.config.get("theme") == "dark" else "dark")
+    
+    def _set_theme(self, name):
+        self.config.set("theme", name)
+        self._apply_theme_name(name)
+    
+    def _apply_theme_name(self, name):
+        self.theme = Theme.get(name)
         self._apply_theme()
         
-        # Update all editors
-        for i in range(self.tabs.count()):
-            widget = self.tabs.widget(i)
-            editor = widget.findChild(AdvancedCodeEditor)
-            if editor:
-                editor.theme = self.theme
-                editor._setup_appearance()
-                if editor.highlighter:
-                    editor.highlighter.theme = self.theme
-                    editor.highlighter._init_formats()
-                    editor.highlighter.rehighlight()
+        # Update all editors (widok główny przed widokami podziału - wspólne kolorowanie)
+        for editor in self.documents.views():
+            editor.set_theme(self.theme)
+        for index in range(self.tabs.count()):
+            widget = self.tabs.widget(index)
+            if isinstance(widget, (DiffView, LogView, HexView)):
+                widget.set_theme(self.theme)
+    
+    def _fill_theme_menu(self):
+        self.theme_menu.clear()
+        current = self.config.get("theme")
+        for name in Theme.available():
+            act = self.theme_menu.addAction(name)
+            act.setCheckable(True)
+            act.setChecked(name == current)
+            act.triggered.connect(lambda checked=False, name=name: self._set_theme(name))
     
     def _toggle_minimap(self):
-        show = not self.config.settings.get("show_minimap", True)
-        self.config.settings["show_minimap"] = show
-        self.config.save()
+        self.config.set("show_minimap", not self.config.get("show_minimap", True))
         QMessageBox.information(self, "Minimap", 
             "Zmiana zostanie zastosowana dla nowych plików.\nZamknij i otwórz ponownie istniejące pliki.")
     
     def _toggle_word_wrap(self):
-        wrap = not self.config.settings.get("word_wrap", False)
-        self.config.settings["word_wrap"] = wrap
-        self.config.save()
+        wrap = not self.config.get("word_wrap", False)
+        self.config.set("word_wrap", wrap)
         
         # Apply to all open editors
+        for editor in self.documents.views():
+            if wrap:
+                editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.WidgetWidth)
+            else:
+                editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+    
+    def _jump_to_bracket(self):
+        editor = self._get_focused_editor()
+        if editor:
+            editor.jump_to_matching_bracket()
+    
+    def _toggle_split(self):
+        """Drugi widok tego samego dokumentu obok (lub zamknięcie podziału)"""
+        editor = self._get_current_editor()
+        if not editor:
+            return
+        if editor.views:
+            for view in editor.views:
+                view.deleteLater()
+            editor.views = []
+            editor.setFocus()
+            return
+        view = AdvancedCodeEditor(config=self.config, theme=self.theme, source=editor)
+        view.setLineWrapMode(editor.lineWrapMode())
+        view.related_word_indexes = editor.related_word_indexes
+        view.cursorPositionChanged.connect(lambda: self._update_cursor_position(view))
+        editor.parentWidget().addWidget(view)
+        view.setTextCursor(editor.textCursor())
+        view.verticalScrollBar().setValue(editor.verticalScrollBar().value())
+        view.setFocus()
+    
+    def _compare_with_saved(self):
+        """Zmiany bieżącej karty względem pliku na dysku"""
+        editor = self._get_current_editor()
+        if not editor or not editor.path:
+            self.status.showMessage("Brak zapisanego pliku do porównania", 3000)
+            return
+        try:
+            with open(editor.path, 'r', encoding='utf-8', errors='ignore') as f:
+                saved = f.read()
+        except OSError as e:
+            QMessageBox.warning(self, "Błąd", f"Nie można odczytać pliku:\n{str(e)}")
+            return
+        name = os.path.basename(editor.path)
+        self._open_diff(saved, editor.toPlainText(), f"{name} (zapisany)", f"{name} (bieżący)", editor.path)
+    
+    def _compare_with_tab(self):
+        editor = self._get_current_editor()
+        others = [other for other in self.documents.editors() if other is not editor]
+        if not editor or not others:
+            self.status.showMessage("Potrzebne są co najmniej dwie otwarte karty", 3000)
+            return
+        names = [self.tabs.tabText(self.tabs.indexOf(self.documents.container(other))) for other in others]
+        name, ok = QInputDialog.getItem(self, "Porównaj z kartą", "Karta:", names, 0, False)
+        if not ok:
+            return
+        other = others[names.index(name)]
+        title = self.tabs.tabText(self.tabs.currentIndex())
+        self._open_diff(other.toPlainText(), editor.toPlainText(), name, title, editor.path)
+    
+    def _open_diff(self, left_text, right_text, left_title, right_title, path):
+        view = DiffView(left_text, right_text, left_title, right_title, path, self.config, self.theme)
+        idx = self.tabs.addTab(view, f"⇄ {right_title}")
+        self.tabs.setCurrentIndex(idx)
+    
+    def _toggle_fold(self):
+        editor = self._get_focused_editor()
+        if editor:
+            editor.toggle_fold()
+    
+    def _fold_all(self):
+        editor = self._get_focused_editor()
+        if editor:
+            editor.fold_all()
+    
+    def _unfold_all(self):
+        editor = self._get_focused_editor()
+        if editor:
+            editor.unfold_all()
+    
+    def _toggle_perf_hud(self):
+        if not self.perf_hud.isVisible() and not PERF.enabled:
+            PERF.enabled = True
+            self.stall_detector.start()
+        elif self.perf_hud.isVisible() and not self.config.get("perf_monitor", False):
+            PERF.enabled = False
+            self.stall_detector.stop()
+        self.perf_hud.toggle()
+    
+    def _tab_memory(self):
+        result = []
         for i in range(self.tabs.count()):
-            widget = self.tabs.widget(i)
-            editor = widget.findChild(AdvancedCodeEditor)
+            editor = self.documents.editor_for(self.tabs.widget(i))
             if editor:
-                if wrap:
-                    editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.WidgetWidth)
-                else:
-                    editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+                result.append((self.tabs.tabText(i), editor_memory_estimate(editor)))
+        return result
+    
+    def _dump_perf_report(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Raport wydajności", "onecode_perf.json", "JSON (*.json)")
+        if not path:
+            return
+        report = PERF.report()
+        report["tabs"] = [{"title": title, "bytes": size} for title, size in self._tab_memory()]
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.status.showMessage(f"Zapisano raport: {path}", 3000)
+        except OSError as e:
+            QMessageBox.warning(self, "Błąd", f"Nie można zapisać raportu:\n{str(e)}")
+    
+    def _toggle_key_recording(self, checked):
+        if checked:
+            editor = self._get_current_editor()
+            if not editor:
+                self.record_keys_act.setChecked(False)
+                return
+            self.key_recorder.start(editor)
+            self.status.showMessage("⏺ Nagrywanie klawiszy - wyłącz w menu Widok, aby zapisać sesję", 5000)
+            return
+        
+        session = self.key_recorder.stop()
+        if not session["events"]:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Sesja klawiatury", "onecode_keys.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(session, f)
+            self.status.showMessage(f"Zapisano sesję ({len(session['events'])} zdarzeń): {path}", 3000)
+        except OSError as e:
+            QMessageBox.warning(self, "Błąd", f"Nie można zapisać sesji:\n{str(e)}")
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.perf_hud.isVisible():
+            self.perf_hud.refresh()
     
     # ========== RUN OPERATIONS ==========
     
@@ -1088,38 +6415,39 @@ class OneCodePro(QMainWindow):
         
         self._save_file()
         
-        ext = os.path.splitext(editor.path)[1].lower()
-        
-        commands = {
-            ".py": f"python \"{editor.path}\"",
-            ".cpp": f"g++ \"{editor.path}\" -o temp.exe && temp.exe" if os.name == "nt" else f"g++ \"{editor.path}\" -o temp.out && ./temp.out",
-            ".c": f"gcc \"{editor.path}\" -o temp.exe && temp.exe" if os.name == "nt" else f"gcc \"{editor.path}\" -o temp.out && ./temp.out",
-            ".js": f"node \"{editor.path}\"",
-            ".html": f"start \"{editor.path}\"" if os.name == "nt" else f"xdg-open \"{editor.path}\"",
-            ".java": f"javac \"{editor.path}\" && java {os.path.splitext(os.path.basename(editor.path))[0]}"
-        }
-        
-        cmd = commands.get(ext)
+        cmd = editor.language.run_command(editor.path)
         
         if cmd:
+            self._clear_diagnostics(os.path.dirname(editor.path))
             self.terminal_view.appendPlainText(f"\n> {cmd}\n")
             self.terminal_process.write((cmd + "\n").encode())
             self.status.showMessage(f"Uruchomiono: {os.path.basename(editor.path)}", 3000)
         else:
+            runnable = ", ".join(ext for language in LANGUAGES if language.run for ext in language.extensions)
             QMessageBox.information(self, "Uwaga", 
-                f"Nieobsługiwane rozszerzenie: {ext}\n\n"
-                "Obsługiwane: .py, .cpp, .c, .js, .html, .java")
+                f"Nie można uruchomić pliku: {editor.language.name}\n\n"
+                f"Obsługiwane: {runnable}")
     
     # ========== TERMINAL ==========
     
     def _terminal_output(self):
         data = self.terminal_process.readAllStandardOutput().data().decode(errors='ignore')
-        self.terminal_view.moveCursor(QTextCursor.MoveOperation.End)
-        self.terminal_view.insertPlainText(data)
-        self.terminal_view.moveCursor(QTextCursor.MoveOperation.End)
+        self._append_terminal(data)
     
     def _terminal_error(self):
         data = self.terminal_process.readAllStandardError().data().decode(errors='ignore')
+        self._append_terminal(data, error=True)
+    
+    @perf_timed("terminal_flush")
+    def _append_terminal(self, data, error=False):
+        """Dopisz wyjście procesu do terminala i przekaż je parserowi błędów"""
+        if not error:
+            self.terminal_view.moveCursor(QTextCursor.MoveOperation.End)
+            self.terminal_view.insertPlainText(data)
+            self.terminal_view.moveCursor(QTextCursor.MoveOperation.End)
+            self._collect_diagnostics(self.stdout_parser.feed(data))
+            return
+        
         self.terminal_view.moveCursor(QTextCursor.MoveOperation.End)
         cursor = self.terminal_view.textCursor()
         fmt = QTextCharFormat()
@@ -1127,6 +6455,7 @@ class OneCodePro(QMainWindow):
         cursor.setCharFormat(fmt)
         cursor.insertText(data)
         self.terminal_view.setTextCursor(cursor)
+        self._collect_diagnostics(self.stderr_parser.feed(data))
     
     def _exec_terminal_command(self):
         cmd = self.terminal_input.text().strip()
@@ -1137,42 +6466,178 @@ class OneCodePro(QMainWindow):
         self.terminal_process.write((cmd + "\n").encode())
         self.terminal_input.clear()
     
+    # ========== DIAGNOSTICS ==========
+    
+    def _clear_diagnostics(self, base_dir=None):
+        """Wyczyść indeks przed nowym uruchomieniem"""
+        for diag in self.diagnostics.items:
+            self._diagnostic_paths.add(_norm_path(diag.path))
+        self.diagnostics.clear()
+        self.stdout_parser.reset(base_dir)
+        self.stderr_parser.reset(base_dir)
+        self.terminal_view.base_dir = base_dir
+        self.diagnostic_timer.start()
+    
+    def _collect_diagnostics(self, found):
+        for diag in found:
+            if self.diagnostics.add(diag):
+                self._diagnostic_paths.add(_norm_path(diag.path))
+        if self._diagnostic_paths and not self.diagnostic_timer.isActive():
+            self.diagnostic_timer.start()
+    
+    def _refresh_diagnostic_markers(self):
+        """Odśwież znaczniki tylko w edytorach, których dotyczą zmiany"""
+        paths, self._diagnostic_paths = self._diagnostic_paths, set()
+        for path in paths:
+            editor = self.documents.find(path)
+            if editor:
+                editor.set_diagnostics(self.diagnostics.for_path(editor.path))
+    
+    def _step_diagnostic(self, delta):
+        diag = self.diagnostics.step(delta)
+        if diag:
+            self._goto_location(diag.path, diag.line, diag.col)
+            if diag.message:
+                self.status.showMessage(f"{diag.severity}: {diag.message}", 5000)
+        else:
+            self.status.showMessage("Brak błędów", 3000)
+    
+    def _goto_location(self, path, line, col=1):
+        """Otwórz plik i ustaw kursor na podanej linii/kolumnie"""
+        if not os.path.isfile(path):
+            self.status.showMessage(f"Nie znaleziono pliku: {path}", 3000)
+            return
+        self._open_file(path)
+        editor = self._get_current_editor()
+        if not editor or not editor.path or _norm_path(editor.path) != _norm_path(path):
+            return
+        block = editor.document().findBlockByNumber(max(0, line - 1))
+        cursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.MoveOperation.Right, n=min(max(0, col - 1), block.length() - 1))
+        editor.setTextCursor(cursor)
+        editor.centerCursor()
+        editor.setFocus()
+    
+    # ========== SYMBOLS ==========
+    
+    def _on_symbols_updated(self, editor):
+        if editor is self._get_current_editor():
+            self._rebuild_outline()
+    
+    def _rebuild_outline(self):
+        """Drzewo struktury dla bieżącego edytora"""
+        self.outline.clear()
+        editor = self._get_current_editor()
+        if not editor:
+            return
+        icons = {"class": "◆", "function": "ƒ", "method": "ƒ"}
+        parents = []
+        for name, kind, line, depth, _ in editor.symbols:
+            item = QTreeWidgetItem([f"{icons.get(kind, '•')} {name}"])
+            item.setData(0, Qt.ItemDataRole.UserRole, line)
+            item.setToolTip(0, f"{kind}, linia {line}")
+            del parents[depth:]
+            if parents:
+                parents[-1].addChild(item)
+            else:
+                self.outline.addTopLevelItem(item)
+            parents.append(item)
+        self.outline.expandAll()
+    
+    def _outline_activated(self, item, column=0):
+        editor = self._get_current_editor()
+        if editor:
+            self._goto_line(editor, item.data(0, Qt.ItemDataRole.UserRole))
+    
+    def _goto_symbol(self):
+        """Wybór symbolu z bieżącego pliku (Ctrl+Shift+O)"""
+        editor = self._get_focused_editor()
+        if not editor:
+            return
+        
+        def provider(text):
+            q = text.lower().replace(" ", "")
+            items = []
+            for name, kind, line, depth, parent in editor.primary.symbols:
+                score = _match_score(q, name.lower()) if q else 0
+                if score is not None:
+                    label = f"{parent}.{name}" if parent else name
+                    items.append((score, line, (label, f"{kind}, linia {line}", line)))
+            items.sort(key=lambda x: (-x[0], x[1]) if q else (0, x[1]))
+            return [item for _, _, item in items[:200]]
+        
+        dialog = QuickOpenDialog(self, provider, "Nazwa symbolu...")
+        if dialog.exec() and dialog.selected:
+            self._goto_line(editor, dialog.selected)
+    
+    def _goto_line(self, editor, line):
+        """Przenieś kursor edytora na początek linii (numerowanej od 1)"""
+        block = editor.document().findBlockByNumber(line - 1)
+        editor.setTextCursor(QTextCursor(block))
+        editor.centerCursor()
+        editor.setFocus()
+    
+    def _goto_project_symbol(self):
+        """Wybór symbolu z indeksu całego projektu (Ctrl+T)"""
+        def provider(text):
+            items = []
+            for name, path, line, kind, parent in self.project_symbols.search(text):
+                rel = os.path.relpath(path, self.project_root)
+                label = f"{parent}.{name}" if parent else name
+                items.append((label, f"{rel}:{line}", (path, line)))
+            return items
+        
+        dialog = QuickOpenDialog(self, provider, "Symbol w projekcie...")
+        if dialog.exec() and dialog.selected:
+            self._goto_location(*dialog.selected)
+    
+    def _goto_definition(self):
+        """Definicja słowa pod kursorem: najpierw bieżący plik, potem projekt"""
+        editor = self._get_focused_editor()
+        if not editor:
+            return
+        cursor = editor.textCursor()
+        cursor.select(QTextCursor.SelectionType.WordUnderCursor)
+        word = cursor.selectedText()
+        if not word:
+            return
+        
+        for name, kind, line, depth, parent in editor.primary.symbols:
+            if name == word:
+                self._goto_line(editor, line)
+                return
+        
+        locations = self.project_symbols.lookup(word)
+        if len(locations) == 1:
+            path, line, _, _ = locations[0]
+            self._goto_location(path, line)
+        elif locations:
+            def provider(text):
+                return [(os.path.relpath(path, self.project_root), f"{kind}, linia {line}", (path, line))
+                        for path, line, kind, parent in locations]
+            dialog = QuickOpenDialog(self, provider, word)
+            if dialog.exec() and dialog.selected:
+                self._goto_location(*dialog.selected)
+        else:
+            self.status.showMessage(f"Nie znaleziono definicji: {word}", 3000)
+    
     # ========== UTILITIES ==========
     
     def _get_current_editor(self):
         if self.tabs.count() == 0:
             return None
-        widget = self.tabs.currentWidget()
-        return widget.findChild(AdvancedCodeEditor) if widget else None
+        return self.documents.editor_for(self.tabs.currentWidget())
+    
+    def _get_focused_editor(self):
+        """Widok z fokusem w bieżącej karcie (podział edytora), inaczej edytor karty"""
+        editor = self._get_current_editor()
+        focus = QApplication.focusWidget()
+        if editor and isinstance(focus, AdvancedCodeEditor) and focus.primary is editor:
+            return focus
+        return editor
     
     def _get_lexer(self, path):
-        ext = os.path.splitext(path)[1].lower()
-        lexers = {
-            ".py": PythonLexer(),
-            ".cpp": CppLexer(),
-            ".c": CppLexer(),
-            ".h": CppLexer(),
-            ".hpp": CppLexer(),
-            ".html": HtmlLexer(),
-            ".htm": HtmlLexer(),
-            ".css": CssLexer(),
-            ".js": JavascriptLexer(),
-            ".json": JavascriptLexer(),
-            ".java": get_lexer_by_name('java'),
-            ".php": get_lexer_by_name('php'),
-            ".rb": get_lexer_by_name('ruby'),
-            ".go": get_lexer_by_name('go'),
-            ".rs": get_lexer_by_name('rust'),
-            ".ts": get_lexer_by_name('typescript'),
-            ".sql": get_lexer_by_name('sql'),
-            ".sh": get_lexer_by_name('bash'),
-            ".bat": get_lexer_by_name('batch'),
-            ".xml": get_lexer_by_name('xml'),
-            ".yaml": get_lexer_by_name('yaml'),
-            ".yml": get_lexer_by_name('yaml'),
-            ".md": get_lexer_by_name('markdown'),
-        }
-        return lexers.get(ext)
+        return language_for(path).lexer()
     
     def _update_cursor_position(self, editor):
         cursor = editor.textCursor()
@@ -1181,35 +6646,84 @@ class OneCodePro(QMainWindow):
         self.status.update_position(line, col)
         
         # Update language in status bar
-        if editor.path:
-            ext = os.path.splitext(editor.path)[1].upper()[1:]
-            self.status.update_language(ext if ext else "Plain Text")
+        self.status.update_language(editor.language.name)
     
     def _tab_changed(self, index):
         if index >= 0:
-            widget = self.tabs.widget(index)
-            editor = widget.findChild(AdvancedCodeEditor)
+            editor = self.documents.editor_for(self.tabs.widget(index))
             if editor:
                 self._update_cursor_position(editor)
+        self._rebuild_outline()
     
     def _select_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Wybierz folder")
         if folder:
             self.model.setRootPath(folder)
             self.tree.setRootIndex(self.model.index(folder))
-            self.config.settings.setdefault("recent_folders", [])
-            if folder not in self.config.settings["recent_folders"]:
-                self.config.settings["recent_folders"].insert(0, folder)
-                self.config.settings["recent_folders"] = self.config.settings["recent_folders"][:10]
-                self.config.save()
+            self.project_root = folder
+            self._start_file_indexing(folder)
+            self._update_watched_dirs()
+            self.git.set_root(folder)
+            self.config.add_recent("recent_folders", folder)
+            self._apply_project_config(folder)
+    
+    def _apply_project_config(self, folder):
+        """Ustawienia z .onecode.json nowego projektu dla otwartych edytorów"""
+        self.config.error = None
+        self.config.load_project(folder)
+        if self.config.error:
+            self.status.showMessage(self.config.error, 5000)
+        theme = Theme.get(self.config.get("theme"))
+        if theme != self.theme:
+            self._apply_theme_name(self.config.get("theme"))
+        for editor in self.documents.views():
+            editor._setup_appearance()
+            editor._init_indentation()
+    
+    def _start_file_indexing(self, root):
+        """Zbuduj (od nowa) indeks plików w wątku roboczym"""
+        for indexer in self._indexers:
+            indexer.requestInterruption()
+        self._index_generation += 1
+        self.file_index.reset(root)
+        
+        indexer = FileIndexer(root, self._index_generation)
+        indexer.batch_ready.connect(self._on_index_batch)
+        indexer.indexing_finished.connect(self._on_indexing_finished)
+        indexer.finished.connect(lambda: self._indexers.remove(indexer))
+        self._indexers.append(indexer)
+        indexer.start(QThread.Priority.LowPriority)
+    
+    def _on_index_batch(self, generation, batch, bits):
+        if generation == self._index_generation:
+            self.file_index.merge(batch, bits)
+    
+    def _on_indexing_finished(self, generation):
+        if generation == self._index_generation:
+            self.file_index.complete = True
+            self.status.showMessage(f"Zindeksowano plików: {len(self.file_index.lookup)}", 3000)
+            paths = [p for p in self.file_index.paths if p is not None]
+            self.project_symbols.build(self.file_index.root, paths, self._get_lexer)
+    
+    def _quick_open_items(self, text):
+        recent = []
+        for path in self.config.settings.get("recent_files", []):
+            rel = self.file_index.relative(path)
+            if rel:
+                recent.append(rel)
+        items = []
+        for rel in self.file_index.query(text, 50, recent):
+            folder, name = os.path.split(rel)
+            items.append((name, folder, os.path.join(self.file_index.root, rel)))
+        return items
+    
+    def _quick_open(self):
+        dialog = QuickOpenDialog(self, self._quick_open_items, "Nazwa pliku...")
+        if dialog.exec() and dialog.selected:
+            self._open_file(os.path.normpath(dialog.selected))
     
     def _add_to_recent(self, path):
-        self.config.settings.setdefault("recent_files", [])
-        if path in self.config.settings["recent_files"]:
-            self.config.settings["recent_files"].remove(path)
-        self.config.settings["recent_files"].insert(0, path)
-        self.config.settings["recent_files"] = self.config.settings["recent_files"][:20]
-        self.config.save()
+        self.config.add_recent("recent_files", path)
     
     def _restore_recent_files(self):
         # Możesz tutaj dodać menu z ostatnimi plikami
@@ -1239,27 +6753,39 @@ class OneCodePro(QMainWindow):
             "<table>"
             "<tr><td><b>Ctrl+N</b></td><td>Nowy plik</td></tr>"
             "<tr><td><b>Ctrl+O</b></td><td>Otwórz plik</td></tr>"
+            "<tr><td><b>Ctrl+P</b></td><td>Przejdź do pliku</td></tr>"
             "<tr><td><b>Ctrl+S</b></td><td>Zapisz</td></tr>"
             "<tr><td><b>Ctrl+Shift+S</b></td><td>Zapisz jako</td></tr>"
             "<tr><td><b>Ctrl+W</b></td><td>Zamknij zakładkę</td></tr>"
             "<tr><td><b>Ctrl+F</b></td><td>Szukaj</td></tr>"
             "<tr><td><b>Ctrl+H</b></td><td>Zamień</td></tr>"
+            "<tr><td><b>Ctrl+Shift+O</b></td><td>Przejdź do symbolu</td></tr>"
+            "<tr><td><b>Ctrl+T</b></td><td>Symbol w projekcie</td></tr>"
+            "<tr><td><b>F12</b></td><td>Przejdź do definicji</td></tr>"
+            "<tr><td><b>Ctrl+]</b></td><td>Para nawiasu</td></tr>"
+            "<tr><td><b>Ctrl+\\</b></td><td>Podziel edytor (drugi widok pliku)</td></tr>"
             "<tr><td><b>Ctrl+Z</b></td><td>Cofnij</td></tr>"
             "<tr><td><b>Ctrl+Y</b></td><td>Ponów</td></tr>"
+            "<tr><td><b>Ctrl+Spacja</b></td><td>Podpowiedzi</td></tr>"
             "<tr><td><b>Ctrl+/</b></td><td>Komentarz</td></tr>"
             "<tr><td><b>Ctrl+D</b></td><td>Duplikuj linię</td></tr>"
             "<tr><td><b>Ctrl+Shift+K</b></td><td>Usuń linię</td></tr>"
+            "<tr><td><b>Ctrl+Shift+[</b></td><td>Zwiń/rozwiń region</td></tr>"
+            "<tr><td><b>Ctrl+K Ctrl+0 / Ctrl+K Ctrl+J</b></td><td>Zwiń / rozwiń wszystko</td></tr>"
             "<tr><td><b>F5</b></td><td>Uruchom</td></tr>"
+            "<tr><td><b>Ctrl+Alt+P</b></td><td>Panel wydajności</td></tr>"
+            "<tr><td><b>F8 / Shift+F8</b></td><td>Następny / poprzedni błąd</td></tr>"
             "</table>")
     
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        # Zmiany z innych programów poza obserwowanymi katalogami (np. commit w innym oknie)
+        if event.type() == QEvent.Type.ActivationChange and self.isActiveWindow():
+            self.git.schedule()
+    
     def closeEvent(self, event):
         # Sprawdź niezapisane pliki
-        modified = []
-        for i in range(self.tabs.count()):
-            widget = self.tabs.widget(i)
-            editor = widget.findChild(AdvancedCodeEditor)
-            if editor and editor.is_modified:
-                modified.append(self.tabs.tabText(i))
+        modified = self.documents.modified()
         
         if modified:
             reply = QMessageBox.question(
@@ -1276,10 +6802,234 @@ class OneCodePro(QMainWindow):
                 event.ignore()
                 return
         
-        # Zakończ proces terminala
+        for editor in self.documents.editors():
+            editor.undo_history.store()
+        
+        # Zakończ proces terminala i wątki robocze
         self.terminal_process.kill()
+        for indexer in list(self._indexers):
+            indexer.requestInterruption()
+            indexer.wait()
+        self.project_symbols.cancel()
+        self.formatter.shutdown()
+        QThreadPool.globalInstance().waitForDone(2000)
+        self.config.flush(wait=True)
         event.accept()
 
+# ================== TRYB WSADOWY ==================
+
+BATCH_PARALLEL_MIN = 8
+# Formatery niedostępne w tym procesie (każdy proces puli ma własny zbiór)
+_batch_unavailable = set()
+
+def decode_text(data, fallback=None):
+    """Bajty pliku -> (tekst z "\\n", kodowanie, znak końca linii).
+    
+    Najpierw UTF-8 (z BOM lub bez); gdy się nie da, kodowanie fallback.
+    ValueError, gdy plik nie jest w UTF-8, a fallback nie podano.
+    """
+    encoding = "utf-8-sig" if data.startswith(codecs.BOM_UTF8) else "utf-8"
+    try:
+        text = data.decode(encoding)
+    except UnicodeDecodeError as e:
+        if not fallback:
+            raise ValueError(f"nie jest w UTF-8 (bajt {e.start}); użyj --normalize") from None
+        text, encoding = data.decode(fallback, errors="replace"), fallback
+    newline = "\r\n" if "\r\n" in text else "\n"
+    return text.replace("\r\n", "\n").replace("\r", "\n"), encoding, newline
+
+def parse_line_range(text):
+    """ "10-20" albo "10" -> (pierwsza, ostatnia) linia, liczone od 1"""
+    first, _, last = text.partition("-")
+    first, last = int(first), int(last or first)
+    if first < 1 or last < first:
+        raise ValueError(text)
+    return first, last
+
+def batch_file(path, options):
+    """Przetwórz jeden plik silnikami edytora (w procesie puli).
+    
+    Kolejność: dekodowanie (--normalize), wyszukiwanie w tekście wejściowym,
+    zamiany, komentowanie linii, formatowanie. Zwraca słownik z polami path,
+    changed, binary, matches, diff i error; plik jest zapisywany tylko gdy się zmienił
+    i nie podano --check.
+    """
+    result = {"path": path, "changed": False, "binary": False, "matches": [], "diff": "", "error": None}
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if looks_binary(data):
+            result["binary"] = True
+            return result
+        text, encoding, newline = decode_text(data, options["source_encoding"] if options["normalize"] else None)
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+    if options["normalize"]:
+        encoding, newline = "utf-8", "\n"
+    flags = re.IGNORECASE if options["ignore_case"] else 0
+    language = language_for(path)
+    
+    if options["search"]:
+        pattern = re.compile(options["search"], flags)
+        for number, line in enumerate(text.split("\n"), 1):
+            for m in pattern.finditer(line):
+                result["matches"].append((number, m.start() + 1, line))
+    
+    new_text = text
+    for pattern, replacement in options["replace"]:
+        new_text = re.sub(pattern, replacement, new_text, flags=flags)
+    
+    tokens = language.comment_tokens()
+    if options["toggle_comment"] and tokens:
+        lines = new_text.split("\n")
+        first, last = options["lines"] or (1, len(lines))
+        first, last = first - 1, min(last, len(lines))
+        lines[first:last] = toggle_comment_lines(lines[first:last], *tokens)
+        new_text = "\n".join(lines)
+    
+    if options["format"] and language.formatter:
+        formatted, error = format_text(language.formatter, new_text, path, _batch_unavailable)
+        if error:
+            result["error"] = error
+            return result
+        new_text = formatted
+    
+    # Bez --normalize nietknięty tekst zostaje bajt w bajt (np. mieszane końce linii)
+    if new_text == text and not options["normalize"]:
+        return result
+    output = new_text.replace("\n", newline).encode(encoding)
+    if output == data:
+        return result
+    result["changed"] = True
+    if options["diff"]:
+        result["diff"] = "".join(difflib.unified_diff(
+            text.splitlines(True), new_text.splitlines(True), path, path))
+    if not options["check"]:
+        try:
+            with open(path, 'wb') as f:
+                f.write(output)
+        except OSError as e:
+            result["error"] = str(e)
+    return result
+
+def batch_symbols(root, rel, cached):
+    return rel, symbol_entry(os.path.join(root, rel), rel, language_for(rel).lexer(), cached)
+
+def _batch_map(function, jobs, *iterables):
+    """map w puli procesów; małe zadania bez kosztu uruchamiania procesów"""
+    items = list(zip(*iterables))
+    if jobs <= 1 or len(items) < BATCH_PARALLEL_MIN:
+        return [function(*item) for item in items]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        chunk = max(1, len(items) // (jobs * 8))
+        return list(pool.map(function, *zip(*items), chunksize=chunk))
+
+def batch_main(argv):
+    """python main.py --batch [opcje] ŚCIEŻKI... - silniki edytora bez okna.
+    
+    Katalogi są przechodzone jak w indeksie plików projektu (bez .git,
+    node_modules itd.), pliki binarne są pomijane. Pliki są przetwarzane
+    równolegle w puli procesów. Kod wyjścia: 0 - w porządku, 1 - z --check
+    są pliki do zmiany, 2 - błędy.
+    """
+    parser = argparse.ArgumentParser(prog="main.py --batch", description=batch_main.__doc__.splitlines()[0])
+    parser.add_argument("--batch", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("paths", nargs="+", metavar="ŚCIEŻKA", help="pliki lub katalogi")
+    parser.add_argument("--search", metavar="WZORZEC", help="wypisz dopasowania (plik:linia:kolumna: tekst)")
+    parser.add_argument("--replace", nargs=2, action="append", default=[], metavar=("WZORZEC", "ZAMIANA"),
+                        help="zamień wszystkie wystąpienia (można podać wiele razy)")
+    parser.add_argument("--literal", action="store_true", help="wzorce jako zwykły tekst, nie regex")
+    parser.add_argument("-i", "--ignore-case", action="store_true", help="bez rozróżniania wielkości liter")
+    parser.add_argument("--toggle-comment", action="store_true", help="przełącz komentarz linii")
+    parser.add_argument("--lines", type=parse_line_range, metavar="OD-DO", help="zakres linii dla --toggle-comment")
+    parser.add_argument("--format", action="store_true", help="formatuj formaterem języka (black, ruff, clang-format)")
+    parser.add_argument("--normalize", action="store_true", help="zapisz jako UTF-8 bez BOM z końcami linii \\n")
+    parser.add_argument("--source-encoding", default="cp1250", metavar="KODOWANIE",
+                        help="kodowanie plików spoza UTF-8 dla --normalize (domyślnie cp1250)")
+    parser.add_argument("--index", action="store_true", help="zbuduj indeks symboli katalogów (pamięć podręczna edytora)")
+    parser.add_argument("--check", action="store_true", help="nie zapisuj; kod 1, gdy pliki by się zmieniły")
+    parser.add_argument("--diff", action="store_true", help="wypisz różnice (unified diff)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="liczba procesów")
+    args = parser.parse_args(argv)
+    
+    try:
+        search = args.search and re.compile(re.escape(args.search) if args.literal else args.search).pattern
+        replace = []
+        for pattern, replacement in args.replace:
+            if args.literal:
+                pattern, replacement = re.escape(pattern), replacement.replace("\\", "\\\\")
+            replace.append((re.compile(pattern).pattern, replacement))
+        codecs.lookup(args.source_encoding)
+    except (re.error, LookupError) as e:
+        parser.error(str(e))
+    options = {
+        "search": search, "replace": replace, "ignore_case": args.ignore_case,
+        "toggle_comment": args.toggle_comment, "lines": args.lines, "format": args.format,
+        "normalize": args.normalize, "source_encoding": args.source_encoding,
+        "check": args.check, "diff": args.diff,
+    }
+    
+    edits = search or replace or args.toggle_comment or args.format or args.normalize
+    if not edits and not args.index:
+        parser.error("podaj operację: --search, --replace, --toggle-comment, --format, --normalize lub --index")
+    
+    start = time.perf_counter()
+    roots, paths, seen = [], [], set()
+    for arg in args.paths:
+        if os.path.isdir(arg):
+            roots.append(os.path.abspath(arg))
+            candidates = [os.path.join(arg, rel) for rel in chain.from_iterable(iter_project_dirs(arg))] if edits else []
+        else:
+            candidates = [arg]
+        for path in candidates:
+            if _norm_path(path) not in seen:
+                seen.add(_norm_path(path))
+                paths.append(path)
+    if args.index and not roots:
+        parser.error("--index wymaga katalogu projektu")
+    
+    results = _batch_map(batch_file, args.jobs, paths, [options] * len(paths)) if edits else []
+    changed = errors = matches = binary = 0
+    for result in results:
+        binary += result["binary"]
+        for line, column, text in result["matches"]:
+            print(f"{result['path']}:{line}:{column}: {text}")
+        matches += len(result["matches"])
+        if result["diff"]:
+            sys.stdout.write(result["diff"])
+        if result["error"]:
+            errors += 1
+            print(f"{result['path']}: {result['error']}", file=sys.stderr)
+        elif result["changed"]:
+            changed += 1
+            if not args.diff:
+                print(f"{'do zmiany' if args.check else 'zmieniono'}: {result['path']}", file=sys.stderr)
+    
+    for root in roots if args.index else ():
+        try:
+            with open(symbol_cache_path(root), 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+        rels = list(chain.from_iterable(iter_project_dirs(root)))
+        entries = _batch_map(batch_symbols, args.jobs, [root] * len(rels), rels, [cached.get(rel) for rel in rels])
+        files = {rel: entry for rel, entry in entries if entry}
+        write_symbol_cache(root, files)
+        symbols = sum(len(entry[2]) for entry in files.values())
+        print(f"Indeks {root}: {len(files)} plików, {symbols} symboli", file=sys.stderr)
+    
+    if not edits:
+        return 0
+    summary = (f"Plików: {len(paths) - binary} (binarnych pominiętych: {binary}), "
+               f"{'do zmiany' if args.check else 'zmienionych'}: {changed}, błędów: {errors}")
+    if search:
+        summary += f", dopasowań: {matches}"
+    print(f"{summary} ({time.perf_counter() - start:.2f} s)", file=sys.stderr)
+    if errors:
+        return 2
+    return 1 if args.check and changed else 0
+
 # ================== MAIN ==================
 
 def main():
@@ -1293,4 +7043,8 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    if "--format-worker" in sys.argv:
+        sys.exit(format_worker_main())
+    if "--batch" in sys.argv:
+        sys.exit(batch_main(sys.argv[1:]))
     main()
\ No newline at end of file
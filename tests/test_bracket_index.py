@@ -0,0 +1,41 @@
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtGui import QTextCursor, QTextDocument
+from PySide6.QtWidgets import QApplication, QPlainTextDocumentLayout
+
+from main import BracketIndex
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def make_document(lines):
+    doc = QTextDocument("\n".join(lines))
+    # Bez układu dokument nie wysyła contentsChange
+    doc.setDocumentLayout(QPlainTextDocumentLayout(doc))
+    return doc
+
+
+def test_equal_length_edit_across_chunk_boundary():
+    lines = [""] * 1000
+    lines[10] = "("
+    lines[900] = ")"
+    doc = make_document(lines)
+    index = BracketIndex(doc)
+    index.ensure()
+    assert index.match(10, 0) == (900, 0)
+
+    # Jeden blok edycji = jeden contentsChange obejmujący linie z dwóch porcji
+    cursor = QTextCursor(doc)
+    cursor.beginEditBlock()
+    for line, text in ((255, "x"), (257, ")")):
+        cursor.setPosition(doc.findBlockByNumber(line).position())
+        cursor.insertText(text)
+    cursor.endEditBlock()
+
+    assert doc.blockCount() == 1000
+    assert index.match(10, 0) == (257, 0)
+    assert index.match(257, 0) == (10, 0)
@@ -0,0 +1,55 @@
+import json
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QThreadPool
+from PySide6.QtWidgets import QApplication
+
+from main import Config
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def test_close_flush_keeps_newer_value_from_other_window(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    first = Config()
+    first.set("font_size", 14)
+    first.flush()
+    # Zapis z tła gotowy, ale jego wynik jeszcze czeka w kolejce zdarzeń
+    QThreadPool.globalInstance().waitForDone(5000)
+    # Drugie okno zapisuje nowszą wartość, zanim pierwsze odbierze wynik swojego zapisu
+    second = Config()
+    second.set("font_size", 16)
+    second.flush(wait=True)
+    first.flush(wait=True)
+    assert first._inflight is None
+    assert json.loads(first.config_path.read_text())["font_size"] == 16
+
+
+def test_close_flush_runs_writer_still_queued(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    pool = QThreadPool.globalInstance()
+    config = Config()
+    config.set("theme", "light")
+    limit = pool.maxThreadCount()
+    pool.setMaxThreadCount(1)
+    blocker = threading.Event()
+    pool.start(blocker.wait)
+    try:
+        config.flush()
+        config.set("font_size", 20)
+        start = time.perf_counter()
+        config.flush(wait=True)
+        # Nie czeka na niezwiązane zadania puli
+        assert time.perf_counter() - start < 1
+    finally:
+        blocker.set()
+        pool.waitForDone(5000)
+        pool.setMaxThreadCount(limit)
+    saved = json.loads(config.config_path.read_text())
+    assert saved["theme"] == "light" and saved["font_size"] == 20
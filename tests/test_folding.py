@@ -0,0 +1,43 @@
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QApplication
+
+from main import AdvancedCodeEditor
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+@pytest.fixture
+def editor(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    editor = AdvancedCodeEditor(str(tmp_path / "f.py"), minimap=False)
+    editor.setPlainText("a = 1\ndef f():\n    x = 1\n    return x\nb = 2")
+    return editor
+
+
+def hidden_lines(editor):
+    doc = editor.document()
+    return [i for i in range(doc.blockCount()) if not doc.findBlockByNumber(i).isVisible()]
+
+
+def test_delete_folded_header_shows_following_line(editor):
+    assert editor.toggle_fold(1)
+    assert hidden_lines(editor) == [2, 3]
+    editor.setTextCursor(QTextCursor(editor.document().findBlockByNumber(1)))
+    editor.delete_line()
+    app.processEvents()
+    assert editor.document().findBlockByNumber(1).text() == "    x = 1"
+    assert hidden_lines(editor) == []
+    assert editor.fold_index.collapsed == {}
+
+
+def test_unfold_all_shows_blocks_outside_known_regions(editor):
+    editor.document().findBlockByNumber(3).setVisible(False)
+    editor.unfold_all()
+    assert hidden_lines(editor) == []
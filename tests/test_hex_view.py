@@ -0,0 +1,31 @@
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+
+from main import HexView
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def test_truncated_file_is_remapped(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(bytes(range(256)) * 256)
+    view = HexView(str(path))
+    view.resize(600, 400)
+    view.show()
+    view.goto(view.size - 1)
+
+    # Obcięcie w miejscu - stara mapa wskazuje teraz za koniec pliku
+    with open(path, "r+b") as f:
+        f.truncate(100)
+    view.viewport().repaint()
+    view.select(50)
+    assert view.size == 100
+    assert view.selected == 50
+    view.goto(10_000)
+    assert view.selected == 99
+    view.close_file()
@@ -0,0 +1,43 @@
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QEvent, Qt
+from PySide6.QtGui import QKeyEvent, QTextCursor
+from PySide6.QtWidgets import QApplication
+
+from main import AdvancedCodeEditor, KeystrokeRecorder
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def type_text(editor, text):
+    for ch in text:
+        for kind in (QEvent.Type.KeyPress, QEvent.Type.KeyRelease):
+            # Jak w Qt (i w benchmark.py --replay): otwarta lista podpowiedzi dostaje klawisze pierwsza
+            target = QApplication.activePopupWidget() or editor
+            QApplication.sendEvent(target, QKeyEvent(kind, ord(ch.upper()), Qt.KeyboardModifier.NoModifier, ch))
+        app.processEvents()
+
+
+def test_records_keys_sent_to_completion_popup(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    editor = AdvancedCodeEditor(str(tmp_path / "f.py"), minimap=False)
+    editor.setPlainText("complete = computer = 1\n")
+    editor.show()
+    cursor = editor.textCursor()
+    cursor.movePosition(QTextCursor.MoveOperation.End)
+    editor.setTextCursor(cursor)
+    editor.activateWindow()
+    editor.setFocus()
+    recorder = KeystrokeRecorder()
+    recorder.start(editor)
+    type_text(editor, "com")
+    assert editor.completer.popup().isVisible()
+    type_text(editor, "xyz")
+    session = recorder.stop()
+    pressed = [e["text"] for e in session["events"] if e["type"] == "press"]
+    assert pressed == list("comxyz")
+    assert editor.toPlainText().endswith("comxyz")
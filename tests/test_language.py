@@ -0,0 +1,37 @@
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import LANGUAGES
+
+
+def language(name):
+    return next(lang for lang in LANGUAGES if lang.name == name)
+
+
+def test_word_openers_need_word_boundary():
+    ruby = language("Ruby")
+    assert ruby.newline_indent("items.each do", 2) == "  "
+    assert ruby.newline_indent("  undo", 2) == "  "
+    assert ruby.newline_indent("# todo", 2) == ""
+    assert ruby.newline_indent("my_do", 2) == ""
+    bash = language("Bash")
+    assert bash.newline_indent("if [ -f x ]; then", 4) == "    "
+    assert bash.newline_indent("# pseudo", 4) == ""
+
+
+def test_punctuation_openers_match_as_suffix():
+    assert language("Ruby").newline_indent("items.map { |x|", 2) == "  "
+    assert language("Bash").newline_indent("main() {", 4) == "    "
+
+
+def test_word_comment_token_matches_whole_word():
+    from main import toggle_comment_lines
+    batch = language("Batch")
+    assert toggle_comment_lines(["REMARK = 1", "REMOVE x"], *batch.comment_tokens()) == \
+        ["REM REMARK = 1", "REM REMOVE x"]
+    assert toggle_comment_lines(["REM echo", "  rem x", "REM"], *batch.comment_tokens()) == \
+        ["echo", "  x", ""]
+    assert toggle_comment_lines(["#x"], "#") == ["x"]
@@ -0,0 +1,19 @@
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import LogTail
+
+
+def test_start_on_line_boundary_keeps_line(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"line0\nline1\nline2\n"[2:])
+    assert LogTail(str(path), initial=6).poll() == (["line2"], None)
+
+
+def test_start_inside_line_skips_partial_line(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"line0\nline1\nline2\n")
+    assert LogTail(str(path), initial=8).poll() == (["line2"], None)
@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import DiagnosticIndex, OutputParser
+
+
+def collect(parser, index, chunks):
+    for chunk in chunks:
+        for diag in parser.feed(chunk):
+            index.add(diag)
+
+
+def test_traceback_frames_are_keyed_with_exception_message():
+    parser, index = OutputParser(), DiagnosticIndex()
+    frame = '  File "/tmp/app.py", line 3, in <module>\n    run()\n'
+    collect(parser, index, [
+        "Traceback (most recent call last):\n" + frame,
+        "ValueError: bad\n",
+        "Traceback (most recent call last):\n" + frame,
+        "KeyError: 'x'\n",
+    ])
+    assert [d.message for d in index.items] == ["ValueError: bad", "KeyError: 'x'"]
+
+
+def test_node_header_is_keyed_with_error_line():
+    parser, index = OutputParser(), DiagnosticIndex()
+    collect(parser, index, [
+        "/tmp/app.js:3\n", "let x = ;\n        ^\n\n", "SyntaxError: Unexpected token ';'\n",
+        "/tmp/app.js:3\n", "TypeError: x is not a function\n",
+    ])
+    assert [(d.line, d.message) for d in index.items] == [
+        (3, "SyntaxError: Unexpected token ';'"), (3, "TypeError: x is not a function")]